@@ -2,21 +2,342 @@
 FastAPI main application for Hand Gesture Maze Controller API
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import gc
+import hmac
+import json
+import logging
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Deque, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST
 from prometheus_fastapi_instrumentator import Instrumentator
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Route
 import uvicorn
 
-from app.models import GestureInput, PredictionResponse, MazeControlResponse
-from app.services.gesture_service import GestureService
-from app.services.monitoring_service import MonitoringService
+from app.models import (
+    GestureInput, GestureBatchInput, PredictionResponse, BatchPredictionResponse, MazeControlResponse
+)
+from app.services.admission_control import AdmissionControlMiddleware, AdmissionController
+from app.services.batching_service import MicroBatcher
+from app.services.gesture_service import GestureService, ModelReloadError, DECISION_MODES
+from app.services.inference_executor import InferenceExecutor
+from app.services.model_reloader import ModelReloader, ReloadInProgress
+from app.services.monitoring_service import MetricsExporter, MonitoringService
+from app.services.parallel_scorer import ParallelScorer
+from app.services.prediction_cache import PredictionCache
+from app.services.profiler import Profiler, ProfilerUnavailable
+from app.services.rate_limiter import RateLimitMiddleware, TokenBucketLimiter, client_key, parse_api_keys
+from app.services.runtime_monitor import RuntimeMonitor, freeze_long_lived
+from app.services.session_store import SessionStore
+from app.services.thread_budget import ThreadBudget
+from app.utils import binary_format, fast_json, log_pipeline, stage_timer
 from app.utils.config import get_settings
 
 # Initialize services
 settings = get_settings()
-gesture_service = GestureService(settings.MODEL_PATH, settings.ENCODER_PATH)
-monitoring_service = MonitoringService()
+logging_pipeline = log_pipeline.configure_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    sample_rates=log_pipeline.parse_sample_rates(settings.LOG_SAMPLE_RATES),
+    queue_size=settings.LOG_QUEUE_SIZE,
+    error_limit=settings.LOG_ERROR_LIMIT,
+)
+logger = logging.getLogger(__name__)
+# Before the model loads, so OpenMP runtimes loaded with it read the limits too
+thread_budget = ThreadBudget(
+    cores=settings.THREAD_BUDGET_CORES,
+    http_workers=settings.WEB_CONCURRENCY,
+    inference_backend=settings.INFERENCE_EXECUTOR,
+    inference_workers=settings.INFERENCE_WORKERS,
+    max_concurrency=settings.INFERENCE_MAX_CONCURRENCY,
+    scoring_threads=settings.SCORING_THREADS,
+    native_threads=settings.NATIVE_THREADS,
+)
+if settings.ENABLE_THREAD_BUDGET:
+    thread_budget.apply()
+gesture_service = GestureService(
+    settings.MODEL_PATH,
+    settings.ENCODER_PATH,
+    use_engine=settings.USE_COMPILED_ENGINE,
+    dag_min_margin=settings.DAG_MIN_MARGIN,
+    artifact_dir=settings.MODEL_ARTIFACT_DIR or None,
+    scorer=ParallelScorer(
+        threads=thread_budget.scoring_threads,
+        chunk_rows=settings.SCORING_CHUNK_ROWS,
+        min_rows=settings.SCORING_MIN_PARALLEL_ROWS,
+    ),
+)
+monitoring_service = MonitoringService(
+    gesture_names=gesture_service.gesture_names(),
+    actions=sorted({*gesture_service.gesture_to_action.values(), "WAIT"}),
+    batch_counters=settings.METRICS_FLUSH_INTERVAL > 0,
+)
+metrics_exporter = MetricsExporter(ttl=settings.METRICS_CACHE_TTL)
+monitoring_service.record_model_load(gesture_service.load_source, gesture_service.load_seconds)
+monitoring_service.set_model_version(gesture_service.model_version, gesture_service.load_source)
+
+def inference_queue_depth() -> int:
+    """Inference jobs queued or running: executor jobs plus the micro-batches still being collected"""
+    waiting = sum(batcher.pending for batcher in micro_batchers.values())
+    return inference_executor.in_flight + -(-waiting // settings.MICRO_BATCH_MAX_SIZE)
+
+admission_controller = AdmissionController(
+    inference_queue_depth,
+    concurrency=settings.INFERENCE_MAX_CONCURRENCY,
+    max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    max_wait=settings.ADMISSION_MAX_WAIT_MS / 1000.0,
+    on_estimate=monitoring_service.set_admission_estimated_wait,
+)
+inference_executor = InferenceExecutor(
+    gesture_service,
+    backend=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_WORKERS,
+    max_concurrency=settings.INFERENCE_MAX_CONCURRENCY,
+    on_queue_wait=monitoring_service.record_queue_wait,
+    on_in_flight=monitoring_service.set_inference_in_flight,
+    on_service_time=admission_controller.record_service_time,
+    ring_rows_per_job=max(settings.MAX_BATCH_SIZE, settings.MICRO_BATCH_MAX_SIZE),
+)
+# One scheduler per decision mode so each flush is a single vectorized call
+micro_batchers = {
+    mode: MicroBatcher(
+        partial(inference_executor.predict_batch, decision_mode=mode),
+        max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+        window_us=settings.MICRO_BATCH_WINDOW_US,
+        on_flush=monitoring_service.record_batch_size,
+        max_concurrent_batches=settings.INFERENCE_MAX_CONCURRENCY,
+    )
+    for mode in DECISION_MODES
+}
+prediction_cache = PredictionCache(
+    max_entries=settings.PREDICTION_CACHE_SIZE,
+    resolution=settings.PREDICTION_CACHE_RESOLUTION,
+    on_hit=monitoring_service.increment_cache_hit,
+    on_miss=monitoring_service.increment_cache_miss,
+    on_eviction=monitoring_service.increment_cache_eviction,
+)
+rate_limiter = TokenBucketLimiter(settings.MAX_REQUESTS_PER_MINUTE, burst=settings.RATE_LIMIT_BURST)
+rate_limit_api_keys = parse_api_keys(settings.RATE_LIMIT_API_KEYS)
+profiler = Profiler(max_seconds=settings.PROFILE_MAX_SECONDS, cooldown=settings.PROFILE_COOLDOWN_SECONDS)
+runtime_monitor = RuntimeMonitor(
+    interval=settings.LOOP_LAG_INTERVAL_MS / 1000.0,
+    on_loop_lag=monitoring_service.record_loop_lag,
+    on_gc_pause=monitoring_service.record_gc_pause,
+)
+stage_sampler = stage_timer.StageSampler(settings.STAGE_TIMING_SAMPLE_RATE)
+session_store = SessionStore(
+    epsilon=settings.SESSION_GATE_EPSILON,
+    ttl_seconds=settings.SESSION_TTL_SECONDS,
+    max_sessions=settings.MAX_SESSIONS,
+)
+
+async def on_model_swap():
+    """Drop results of the replaced model and restart worker processes on the new one"""
+    monitoring_service.set_model_version(gesture_service.model_version, gesture_service.load_source)
+    prediction_cache.clear()
+    session_store.clear()
+    await inference_executor.recycle()
+
+model_reloader = ModelReloader(
+    gesture_service,
+    interval=settings.MODEL_WATCH_INTERVAL,
+    on_swap=on_model_swap,
+    on_reload=monitoring_service.record_model_reload,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background schedulers with the app and stop them on shutdown"""
+    inference_executor.start()
+    if settings.ENABLE_MICRO_BATCHING:
+        for batcher in micro_batchers.values():
+            await batcher.start()
+    metrics_flusher = None
+    if monitoring_service.batch_counters:
+        metrics_flusher = asyncio.create_task(monitoring_service.flush_periodically(settings.METRICS_FLUSH_INTERVAL))
+    if settings.GC_FREEZE_AFTER_STARTUP:
+        freeze_long_lived()
+    # Also counts objects frozen by gunicorn's when_ready before the fork
+    monitoring_service.set_gc_frozen_objects(gc.get_freeze_count())
+    if settings.ENABLE_RUNTIME_MONITOR:
+        runtime_monitor.start()
+    model_reloader.start()
+    yield
+    await model_reloader.stop()
+    await runtime_monitor.stop()
+    if metrics_flusher is not None:
+        metrics_flusher.cancel()
+    for batcher in micro_batchers.values():
+        await batcher.stop()
+    inference_executor.shutdown()
+    gesture_service.scorer.shutdown()
+
+async def infer(landmarks: List[float], decision_mode: str = "full") -> Dict[str, Any]:
+    """Run the model on one frame, merged with concurrent requests when micro-batching is on"""
+    if settings.ENABLE_MICRO_BATCHING:
+        return await micro_batchers[decision_mode].submit(landmarks)
+    return await inference_executor.predict(landmarks, decision_mode)
+
+async def run_prediction(landmarks: List[float], decision_mode: str = "full",
+                         features: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Predict one frame, reusing the cached result for the same normalized pose"""
+    if not settings.ENABLE_PREDICTION_CACHE:
+        result = await infer(landmarks, decision_mode)
+        stage_timer.mark("inference")
+        return result
+    
+    if features is None:
+        features = gesture_service.preprocess_batch([landmarks])[0]
+    key = prediction_cache.key(features, decision_mode)
+    stage_timer.mark("cache_key")
+    result = await prediction_cache.get_or_compute(key, partial(infer, landmarks, decision_mode))
+    stage_timer.mark("inference")
+    return dict(result)
+
+async def run_session_prediction(landmarks: List[float], decision_mode: str,
+                                 session_id: Optional[str] = None) -> Dict[str, Any]:
+    """Predict one /maze-control frame, reusing the session's last result while the hand has not moved"""
+    if session_id is None or not settings.ENABLE_SESSION_GATING:
+        return await run_prediction(landmarks, decision_mode)
+    
+    features = gesture_service.preprocess_batch([landmarks])[0]
+    key = (session_id, decision_mode)
+    stored = session_store.lookup(key, features)
+    monitoring_service.record_session_gate(stored is not None, session_store.skip_rate)
+    stage_timer.mark("session_gate")
+    if stored is not None:
+        return dict(stored)
+    
+    generation = session_store.generation
+    prediction = await run_prediction(landmarks, decision_mode, features)
+    session_store.store(key, features, prediction, generation)
+    monitoring_service.set_session_store_usage(len(session_store), session_store.memory_bytes)
+    return prediction
+
+def confidence_threshold(decision_mode: str) -> float:
+    """
+    The "dag" confidence is the winner's weakest pairwise probability, which
+    runs higher than the calibrated one, so it has a threshold of its own
+    """
+    return settings.DAG_MIN_CONFIDENCE_THRESHOLD if decision_mode == "dag" else settings.MIN_CONFIDENCE_THRESHOLD
+
+def maze_decision(prediction: Dict[str, Any], decision_mode: str = "full") -> Dict[str, Any]:
+    """Apply the confidence threshold and record the resulting maze action"""
+    threshold = confidence_threshold(decision_mode)
+    is_valid = prediction["confidence"] >= threshold
+    action = prediction["maze_action"] if is_valid else "WAIT"
+    
+    # Update maze-specific metrics
+    monitoring_service.increment_maze_action(action)
+    
+    return {
+        "action": action,
+        "gesture": prediction["gesture_name"],
+        "confidence": prediction["confidence"],
+        "is_valid": is_valid,
+        "threshold": threshold
+    }
+
+def build_maze_response(prediction: Dict[str, Any], decision_mode: str = "full") -> MazeControlResponse:
+    return MazeControlResponse(**maze_decision(prediction, decision_mode))
+
+async def run_frames(frames, decision_mode: str = "full") -> List[Dict[str, Any]]:
+    """Predict binary-decoded frames: one frame joins the micro-batch, several form their own batch"""
+    if len(frames) == 1:
+        return [await run_prediction(frames[0], decision_mode)]
+    predictions = await inference_executor.predict_batch(frames, decision_mode)
+    stage_timer.mark("inference")
+    return predictions
+
+def decode_binary_frames(body: bytes):
+    try:
+        frames = binary_format.decode_frames(body, settings.MAX_BATCH_SIZE)
+    except ValueError as e:
+        monitoring_service.increment_error("invalid_binary_input")
+        raise HTTPException(status_code=422, detail=str(e))
+    stage_timer.mark("validate")
+    return frames
+
+async def predict_gesture_binary(request: Request) -> Response:
+    """/predict for application/octet-stream bodies"""
+    frames = decode_binary_frames(await request.body())
+    try:
+        predictions = await run_frames(frames)
+    except Exception as e:
+        monitoring_service.increment_error("prediction_error")
+        raise HTTPException(status_code=500, detail=f"Internal prediction error: {str(e)}")
+    
+    for prediction in predictions:
+        monitoring_service.increment_prediction(prediction["gesture_name"])
+        monitoring_service.record_confidence(prediction["confidence"])
+        monitoring_service.increment_data_quality("valid")
+    
+    return Response(binary_format.encode_predictions(predictions), media_type=binary_format.BINARY_CONTENT_TYPE)
+
+async def maze_control_binary(request: Request) -> Response:
+    """/maze-control for application/octet-stream bodies"""
+    frames = decode_binary_frames(await request.body())
+    calibrated = request.query_params.get("calibrated", "false").lower() == "true"
+    decision_mode = "full" if calibrated else settings.MAZE_DECISION_MODE
+    session_id = request.query_params.get("session_id")
+    try:
+        if len(frames) == 1:
+            predictions = [await run_session_prediction(frames[0], decision_mode, session_id)]
+        else:
+            predictions = await run_frames(frames, decision_mode)
+    except Exception as e:
+        monitoring_service.increment_error("maze_control_error")
+        raise HTTPException(status_code=500, detail=f"Maze control error: {str(e)}")
+    
+    responses = [
+        {**maze_decision(prediction, decision_mode), "prediction_number": prediction["prediction_number"]}
+        for prediction in predictions
+    ]
+    return Response(binary_format.encode_maze_responses(responses), media_type=binary_format.BINARY_CONTENT_TYPE)
+
+binary_handlers = {
+    "/predict": predict_gesture_binary,
+    "/maze-control": maze_control_binary,
+}
+
+class LandmarkRoute(APIRoute):
+    """
+    APIRoute that hands application/octet-stream bodies to the binary handler
+    registered for its path, and everything else to the normal JSON handler.
+    """
+    
+    def get_route_handler(self):
+        json_handler = super().get_route_handler()
+        
+        async def route_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+            binary_handler = binary_handlers.get(self.path)
+            if binary_handler is not None and content_type == binary_format.BINARY_CONTENT_TYPE:
+                return await binary_handler(request)
+            return await json_handler(request)
+        
+        return route_handler
+
+BINARY_BODY_DOC = {
+    "requestBody": {
+        "content": {
+            binary_format.BINARY_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+}
+
+landmark_router = APIRouter(route_class=LandmarkRoute)
 
 # FastAPI app
 app = FastAPI(
@@ -24,7 +345,8 @@ app = FastAPI(
     description="Production API for real-time hand gesture recognition and maze game control",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -44,6 +366,40 @@ origins = [
     "*"
 ]
 
+# Stage timing is innermost so it only measures requests that are actually served
+if settings.ENABLE_STAGE_TIMING:
+    app.add_middleware(
+        stage_timer.StageTimingMiddleware,
+        paths=["/predict", "/predict/batch", "/maze-control"],
+        sampler=stage_sampler,
+        on_stage=monitoring_service.record_stage,
+        server_timing=settings.SERVER_TIMING_HEADER,
+    )
+
+# Admission control runs inside the rate limiter: throttled clients never count against capacity
+if settings.ENABLE_ADMISSION_CONTROL:
+    if settings.INFERENCE_EXECUTOR == "inline":
+        logger.warning("Admission control with the inline executor cannot see requests waiting while "
+                       "inference blocks the event loop; it sheds on micro-batch depth and measured "
+                       "service time only. Use the thread, process or shm executor to shed on queue depth")
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=admission_controller,
+        paths=["/predict", "/maze-control"],
+        on_shed=monitoring_service.increment_admission_shed,
+    )
+
+# Rate limiting runs inside CORS so 429 responses still carry CORS headers
+if settings.ENABLE_RATE_LIMIT:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        paths=["/predict", "/predict/batch", "/maze-control"],
+        api_keys=rate_limit_api_keys,
+        trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+        on_reject=monitoring_service.increment_rate_limited,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -61,7 +417,18 @@ instrumentator = Instrumentator(
     should_instrument_requests_inprogress=True,
     excluded_handlers=[".*admin.*", "/metrics"],
 )
-instrumentator.instrument(app).expose(app, include_in_schema=False)
+instrumentator.instrument(app)
+
+# Served here instead of instrumentator.expose(): batched counters are flushed
+# first and the exposition is reused for METRICS_CACHE_TTL seconds
+if os.getenv(instrumentator.env_var_name, "false").lower() in ("true", "1"):
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Prometheus metrics for all workers"""
+        if metrics_exporter.expired():
+            monitoring_service.flush()
+            await run_in_threadpool(metrics_exporter.refresh)
+        return Response(metrics_exporter.body, headers={"Content-Type": CONTENT_TYPE_LATEST})
 
 # ────────────────────────────────────────────────────────────────────────────────
 # CORS PREFLIGHT HANDLERS - Added to fix OPTIONS request issues
@@ -126,7 +493,7 @@ async def root():
         "service": "Hand Gesture Maze Controller API",
         "status": "running",
         "version": "1.0.0",
-        "endpoints": ["/predict", "/maze-control", "/health", "/docs"],
+        "endpoints": ["/predict", "/predict/batch", "/maze-control", "/ws/maze-control", "/binary-format", "/health", "/docs"],
         "cors_enabled": True,
         "origins_configured": len(origins)
     }
@@ -155,9 +522,19 @@ async def test_cors():
         "cors_test": "success"
     }
 
-@app.post("/predict", response_model=PredictionResponse)
+@app.get("/binary-format")
+async def binary_format_schema():
+    """Layout of the application/octet-stream request and response bodies"""
+    return {
+        **binary_format.describe(),
+        "gestures": gesture_service.gesture_names(),
+    }
+
+@landmark_router.post("/predict", response_model=PredictionResponse, openapi_extra=BINARY_BODY_DOC)
 async def predict_gesture(input_data: GestureInput):
     """Predict hand gesture from MediaPipe landmarks"""
+    # JSON decoding and GestureInput validation both happen before the handler runs
+    stage_timer.mark("validate")
     try:
         if len(input_data.landmarks) != 63:
             monitoring_service.increment_error("invalid_input_length")
@@ -167,7 +544,7 @@ async def predict_gesture(input_data: GestureInput):
             )
         
         # Get prediction
-        prediction = gesture_service.predict(input_data.landmarks)
+        prediction = await run_prediction(input_data.landmarks)
         
         # Update monitoring metrics
         monitoring_service.increment_prediction(prediction["gesture_name"])
@@ -183,30 +560,304 @@ async def predict_gesture(input_data: GestureInput):
         monitoring_service.increment_error("prediction_error")
         raise HTTPException(status_code=500, detail=f"Internal prediction error: {str(e)}")
 
-@app.post("/maze-control", response_model=MazeControlResponse)
-async def maze_control(input_data: GestureInput):
-    """Specialized endpoint for maze game control"""
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_gesture_batch(input_data: GestureBatchInput):
+    """Predict hand gestures for a burst of frames in one vectorized call"""
+    stage_timer.mark("validate")
+    if len(input_data.frames) > settings.MAX_BATCH_SIZE:
+        monitoring_service.increment_error("batch_too_large")
+        raise HTTPException(
+            status_code=422,
+            detail=f"Expected at most {settings.MAX_BATCH_SIZE} frames, got {len(input_data.frames)}"
+        )
+
     try:
-        prediction = gesture_service.predict(input_data.landmarks)
-        
-        # Maze-specific logic
-        is_valid = prediction["confidence"] >= settings.MIN_CONFIDENCE_THRESHOLD
-        action = prediction["maze_action"] if is_valid else "WAIT"
-        
-        # Update maze-specific metrics
-        monitoring_service.increment_maze_action(action)
-        
-        return MazeControlResponse(
-            action=action,
-            gesture=prediction["gesture_name"],
-            confidence=prediction["confidence"],
-            is_valid=is_valid,
-            threshold=settings.MIN_CONFIDENCE_THRESHOLD
+        predictions = await inference_executor.predict_batch(input_data.frames)
+        stage_timer.mark("inference")
+
+        for prediction in predictions:
+            monitoring_service.increment_prediction(prediction["gesture_name"])
+            monitoring_service.record_confidence(prediction["confidence"])
+            monitoring_service.increment_data_quality("valid")
+
+        return BatchPredictionResponse(
+            predictions=[PredictionResponse(**prediction) for prediction in predictions],
+            count=len(predictions)
         )
+
+    except ValueError as e:
+        monitoring_service.increment_error("preprocessing_error")
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        monitoring_service.increment_error("prediction_error")
+        raise HTTPException(status_code=500, detail=f"Internal batch prediction error: {str(e)}")
+
+@landmark_router.post("/maze-control", response_model=MazeControlResponse, openapi_extra=BINARY_BODY_DOC)
+async def maze_control(input_data: GestureInput, calibrated: bool = False, session_id: Optional[str] = None):
+    """
+    Specialized endpoint for maze game control.
+    Pass calibrated=true to always get the full calibrated confidence when
+    MAZE_DECISION_MODE is "dag".
+    Pass a session_id (one per player) to skip the model while the hand has
+    not moved since the session's last frame.
+    """
+    stage_timer.mark("validate")
+    decision_mode = "full" if calibrated else settings.MAZE_DECISION_MODE
+    try:
+        prediction = await run_session_prediction(input_data.landmarks, decision_mode, session_id)
+        return build_maze_response(prediction, decision_mode)
         
     except Exception as e:
         monitoring_service.increment_error("maze_control_error")
         raise HTTPException(status_code=500, detail=f"Maze control error: {str(e)}")
 
+app.include_router(landmark_router)
+
+# ────────────────────────────────────────────────────────────────────────────────
+# FAST ROUTES - opt-in raw Starlette handlers for the hot path (ENABLE_FAST_ROUTES)
+# Same URLs, response bodies and status codes, without Pydantic model construction
+# ────────────────────────────────────────────────────────────────────────────────
+
+response_serializer = fast_json.ResponseSerializer()
+
+def is_binary_request(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type == binary_format.BINARY_CONTENT_TYPE
+
+def parse_fast_landmarks(body: bytes):
+    try:
+        landmarks = fast_json.parse_landmarks(body)
+    except fast_json.LandmarkValidationError as e:
+        return None, Response(fast_json.error_body(e), status_code=422, media_type="application/json")
+    stage_timer.mark("validate")
+    return landmarks, None
+
+async def fast_predict(request: Request) -> Response:
+    """Raw /predict: vectorized validation and a precompiled response writer"""
+    if is_binary_request(request):
+        return await predict_gesture_binary(request)
+    
+    landmarks, error = parse_fast_landmarks(await request.body())
+    if error is not None:
+        return error
+    try:
+        prediction = await run_prediction(landmarks)
+    except Exception as e:
+        monitoring_service.increment_error("prediction_error")
+        return JSONResponse({"detail": f"Internal prediction error: {str(e)}"}, status_code=500)
+    
+    monitoring_service.increment_prediction(prediction["gesture_name"])
+    monitoring_service.record_confidence(prediction["confidence"])
+    monitoring_service.increment_data_quality("valid")
+    return Response(response_serializer.prediction(prediction), media_type="application/json")
+
+async def fast_maze_control(request: Request) -> Response:
+    """Raw /maze-control: vectorized validation and a precompiled response writer"""
+    if is_binary_request(request):
+        return await maze_control_binary(request)
+    
+    landmarks, error = parse_fast_landmarks(await request.body())
+    if error is not None:
+        return error
+    calibrated = request.query_params.get("calibrated", "false").lower() == "true"
+    decision_mode = "full" if calibrated else settings.MAZE_DECISION_MODE
+    try:
+        prediction = await run_session_prediction(landmarks, decision_mode, request.query_params.get("session_id"))
+    except Exception as e:
+        monitoring_service.increment_error("maze_control_error")
+        return JSONResponse({"detail": f"Maze control error: {str(e)}"}, status_code=500)
+    
+    return Response(response_serializer.maze(maze_decision(prediction, decision_mode)), media_type="application/json")
+
+def install_fast_routes(app: FastAPI):
+    """Serve POST /predict and /maze-control from the raw handlers, ahead of the FastAPI routes"""
+    app.router.routes[0:0] = [
+        Route("/predict", fast_predict, methods=["POST"]),
+        Route("/maze-control", fast_maze_control, methods=["POST"]),
+    ]
+
+if settings.ENABLE_FAST_ROUTES:
+    install_fast_routes(app)
+
+def decode_stream_message(message: Dict[str, Any]) -> Tuple[Any, Optional[List[float]], Optional[str]]:
+    """(seq, landmarks, error) for one /ws/maze-control message: a JSON text frame or one binary frame"""
+    seq = None
+    try:
+        if message.get("bytes") is not None:
+            return None, binary_format.decode_frames(message["bytes"], max_frames=1)[0].tolist(), None
+        payload = json.loads(message.get("text") or "")
+        seq = payload.get("seq") if isinstance(payload, dict) else None
+        return seq, GestureInput.model_validate(payload).landmarks, None
+    except (ValueError, ValidationError) as e:
+        # json.JSONDecodeError is a ValueError too
+        return seq, None, str(e)
+
+@app.websocket("/ws/maze-control")
+async def maze_control_stream(websocket: WebSocket):
+    """
+    Continuous maze control over one connection per player.
+    
+    Connect with ?session_id=... to enable delta gating for the stream.
+    Each text message is {"landmarks": [63 floats], "seq": optional id}; a
+    binary message is one frame in the /predict/batch binary format (no seq).
+    Each reply is a MazeControlResponse with the seq echoed back, or
+    {"error", "seq"}. Every message counts against the rate limit, and
+    admission control is checked before each frame is scored.
+    Only the newest pending frame is scored: frames that arrive while the
+    previous one is still being evaluated replace each other and are dropped.
+    """
+    await websocket.accept()
+    calibrated = websocket.query_params.get("calibrated", "false").lower() == "true"
+    decision_mode = "full" if calibrated else settings.MAZE_DECISION_MODE
+    session_id = websocket.query_params.get("session_id")
+    key_type, key = client_key(websocket.scope, rate_limit_api_keys, trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED)
+    
+    pending: Optional[Tuple[Any, List[float]]] = None
+    # Error replies are never dropped, but a client that stops reading only keeps the newest
+    errors: Deque[Dict[str, Any]] = deque(maxlen=64)
+    wake = asyncio.Event()
+    
+    async def send_replies():
+        # The only task that sends, so replies never interleave
+        nonlocal pending
+        while True:
+            await wake.wait()
+            wake.clear()
+            while errors:
+                await websocket.send_json(errors.popleft())
+            if pending is None:
+                continue
+            (seq, landmarks), pending = pending, None
+            
+            reason = admission_controller.check() if settings.ENABLE_ADMISSION_CONTROL else None
+            if reason is not None:
+                monitoring_service.increment_admission_shed(reason)
+                reply = {"error": f"Request shed: {reason.replace('_', ' ')}"}
+            else:
+                try:
+                    prediction = await run_session_prediction(landmarks, decision_mode, session_id)
+                    reply = build_maze_response(prediction, decision_mode).model_dump()
+                except Exception as e:
+                    monitoring_service.increment_error("maze_control_error")
+                    reply = {"error": f"Maze control error: {str(e)}"}
+            
+            reply["seq"] = seq
+            await websocket.send_json(reply)
+    
+    monitoring_service.websocket_opened()
+    sender = asyncio.create_task(send_replies())
+    try:
+        while not sender.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            seq, landmarks, error = decode_stream_message(message)
+            if error is not None:
+                monitoring_service.increment_error("websocket_invalid_frame")
+            elif settings.ENABLE_RATE_LIMIT and not rate_limiter.acquire(key)[0]:
+                monitoring_service.increment_rate_limited(key_type)
+                error = "Rate limit exceeded"
+            
+            if error is not None:
+                errors.append({"error": error, "seq": seq})
+            else:
+                if pending is not None:
+                    monitoring_service.increment_dropped_frames()
+                pending = (seq, landmarks)
+            wake.set()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        # Wait for an in-flight prediction to unwind before the connection is torn down
+        await asyncio.gather(sender, return_exceptions=True)
+        monitoring_service.websocket_closed()
+
+# ────────────────────────────────────────────────────────────────────────────────
+# ADMIN ENDPOINTS - require ADMIN_TOKEN in X-Admin-Token; disabled when it is unset
+# Excluded from the Prometheus request metrics by the instrumentator's ".*admin.*"
+# ────────────────────────────────────────────────────────────────────────────────
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+admin_router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)], include_in_schema=False)
+
+@admin_router.post("/profile")
+async def profile_process(
+    seconds: float = Query(10.0, gt=0),
+    mode: Literal["sampling", "cprofile"] = "sampling",
+    output: Literal["collapsed", "stats"] = "collapsed",
+    include_idle: bool = False,
+    sort: Literal["cumulative", "tottime", "calls"] = "cumulative",
+):
+    """
+    Profile live traffic for `seconds` (capped at PROFILE_MAX_SECONDS), then
+    return the result. mode=sampling samples every thread; output=collapsed
+    returns stacks for flame graphs, output=stats the hottest functions.
+    mode=cprofile traces the event loop thread and returns a pstats report.
+    One session at a time, PROFILE_COOLDOWN_SECONDS apart.
+    """
+    if mode == "cprofile" and output == "collapsed":
+        raise HTTPException(status_code=422, detail="cprofile only produces output=stats")
+    try:
+        if mode == "cprofile":
+            return PlainTextResponse(await profiler.cprofile(seconds, sort))
+        sampler = await profiler.sample(seconds, include_idle)
+    except ProfilerUnavailable as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(max(int(e.retry_after + 0.999), 1))})
+    
+    if output == "collapsed":
+        return PlainTextResponse(sampler.collapsed())
+    return {"samples": sampler.samples, "interval_seconds": sampler.interval, "functions": sampler.top()}
+
+@admin_router.get("/threads")
+async def thread_allocation():
+    """
+    How this worker's cores are divided: the budget's plan, the environment
+    limits, and the BLAS/OpenMP pools actually loaded with their thread counts
+    """
+    report = thread_budget.report()
+    report["enabled"] = settings.ENABLE_THREAD_BUDGET
+    report["executor_threads"] = inference_executor.max_workers
+    report["scorer_threads"] = gesture_service.scorer.threads
+    return report
+
+@admin_router.post("/reload-model")
+async def reload_model():
+    """
+    Load the model files again, warm the new model up on canned frames and
+    check its feature count, then swap it in; requests already running finish
+    on the old model. 409 while another reload runs, 422 when the new model
+    is rejected and the current one keeps serving. Only reaches the worker
+    process that answers: with several workers, rely on MODEL_WATCH_INTERVAL.
+    """
+    try:
+        return await model_reloader.reload()
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ModelReloadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@admin_router.get("/model")
+async def model_status():
+    """The model this worker is serving and the outcome of its last reload"""
+    return {
+        "version": gesture_service.model_version,
+        "source": gesture_service.load_source,
+        "load_seconds": gesture_service.load_seconds,
+        "gestures": gesture_service.gesture_names(),
+        "reloading": model_reloader.reloading,
+        "watch_interval": model_reloader.interval,
+        "last_reload": model_reloader.last_reload,
+    }
+
+app.include_router(admin_router)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -23,6 +23,24 @@ class GestureInput(BaseModel):
             raise ValueError("Landmark coordinates must be normalized between 0 and 1")
         return v
 
+class GestureBatchInput(BaseModel):
+    """Input model for a batch of hand gesture frames"""
+    frames: List[List[float]] = Field(
+        ...,
+        min_length=1,
+        description="Landmark frames, each with 63 MediaPipe values (21 points × 3 coordinates)"
+    )
+
+    @field_validator('frames')
+    @classmethod
+    def validate_frames(cls, v):
+        for i, frame in enumerate(v):
+            if len(frame) != 63:
+                raise ValueError(f"Frame {i}: expected exactly 63 landmarks, got {len(frame)}")
+            if any(x < 0 or x > 1 for x in frame):
+                raise ValueError(f"Frame {i}: landmark coordinates must be normalized between 0 and 1")
+        return v
+
 class PredictionResponse(BaseModel):
     """Response model for gesture prediction"""
     gesture_name: str = Field(..., description="Recognized gesture name")
@@ -30,6 +48,11 @@ class PredictionResponse(BaseModel):
     confidence: float = Field(..., ge=0, le=1, description="Prediction confidence score")
     prediction_number: int = Field(..., description="Numeric prediction for debugging")
 
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch gesture prediction, in input order"""
+    predictions: List[PredictionResponse] = Field(..., description="One prediction per input frame")
+    count: int = Field(..., description="Number of frames predicted")
+
 class MazeControlResponse(BaseModel):
     """Response model for maze game control"""
     action: str = Field(..., description="Maze action command")
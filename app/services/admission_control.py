@@ -0,0 +1,119 @@
+"""
+Admission control for the inference endpoints
+Sheds load with 503 while the inference queue is too deep or too slow, instead of answering late
+"""
+
+import time
+from typing import Callable, Iterable, Optional
+
+from app.utils.asgi import header, send_error
+
+class AdmissionController:
+    """
+    Decide whether a new inference request can still be answered in time.
+
+    Queue depth is read from depth_fn: frames waiting in the micro-batchers
+    plus jobs held by the executor. Each finished job reports its service time,
+    kept as an exponentially weighted moving average. The expected wait for a
+    new request is that service time multiplied by the number of executor
+    rounds ahead of it: (depth // concurrency) + 1.
+
+    A request is shed when the depth limit is reached, when the estimated wait
+    exceeds max_wait, or when the client's deadline has passed or would pass
+    before the estimated wait is over. The estimate after each finished job is
+    reported through on_estimate (seconds).
+    """
+
+    def __init__(
+        self,
+        depth_fn: Callable[[], int],
+        concurrency: int = 1,
+        max_queue_depth: int = 128,
+        max_wait: float = 0.25,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.time,
+        on_estimate: Optional[Callable[[float], None]] = None,
+    ):
+        self.depth_fn = depth_fn
+        self.concurrency = max(concurrency, 1)
+        self.max_queue_depth = max_queue_depth
+        self.max_wait = max_wait
+        self.smoothing = smoothing
+        self.clock = clock
+        self.on_estimate = on_estimate
+        self.service_time = 0.0
+
+    def record_service_time(self, seconds: float):
+        """Fold one finished job's duration into the moving average"""
+        if self.service_time == 0.0:
+            self.service_time = seconds
+        else:
+            self.service_time += self.smoothing * (seconds - self.service_time)
+        if self.on_estimate is not None:
+            self.on_estimate(self.estimated_wait())
+
+    def estimated_wait(self, depth: Optional[int] = None) -> float:
+        """Seconds a request admitted now is expected to take"""
+        depth = self.depth_fn() if depth is None else depth
+        return self.service_time * (depth // self.concurrency + 1)
+
+    def check(self, deadline: Optional[float] = None) -> Optional[str]:
+        """Reason to shed the request, or None to admit it. deadline is a Unix timestamp in seconds"""
+        if deadline is not None and deadline <= self.clock():
+            return "deadline_expired"
+
+        depth = self.depth_fn()
+        if depth >= self.max_queue_depth:
+            return "queue_depth"
+        wait = self.estimated_wait(depth)
+        if wait > self.max_wait:
+            return "estimated_wait"
+        if deadline is not None and self.clock() + wait > deadline:
+            return "deadline_unreachable"
+        return None
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware answering 503 for requests the controller sheds.
+
+    Clients may send a deadline header holding the Unix time in milliseconds
+    after which the answer is useless to them. Requests are shed before the
+    body is read, so rejecting one costs almost nothing.
+    """
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        paths: Iterable[str],
+        deadline_header: str = "x-request-deadline",
+        on_shed: Optional[Callable[[str], None]] = None,
+    ):
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+        self.deadline_header = deadline_header.lower().encode()
+        self.on_shed = on_shed
+
+    def deadline(self, scope) -> Optional[float]:
+        value = header(scope, self.deadline_header)
+        if value is None:
+            return None
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self.controller.check(self.deadline(scope))
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.on_shed is not None:
+            self.on_shed(reason)
+        await send_error(send, 503, f"Request shed: {reason.replace('_', ' ')}", [(b"retry-after", b"1")])
@@ -0,0 +1,166 @@
+"""
+Micro-batching scheduler for gesture inference
+Merges concurrent single-frame requests into one vectorized model call
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Union
+
+from app.utils import stage_timer
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Queue single-frame requests and flush them as one batch.
+
+    A batch is flushed when it reaches max_batch_size or when window_us
+    microseconds have passed since its first frame arrived, whichever comes
+    first. batch_fn receives the queued items in arrival order and must
+    return one result per item; each caller gets back its own result.
+
+    batch_fn may be a coroutine function (e.g. an executor that runs the
+    model off the loop). Up to max_concurrent_batches flushes may then be in
+    flight at once; while they are all busy, new frames keep queueing and
+    are merged into the next, larger batch.
+
+    Stages that batch_fn marks are timed once per flush and copied to the
+    stage timer of every sampled caller in the batch, after a "batch_wait"
+    stage covering its time in the queue.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Union[Sequence[Any], Awaitable[Sequence[Any]]]],
+        max_batch_size: int = 32,
+        window_us: int = 500,
+        on_flush: Optional[Callable[[int], None]] = None,
+        max_concurrent_batches: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.window = max(window_us, 0) / 1_000_000
+        self.on_flush = on_flush
+        self.max_concurrent_batches = max(max_concurrent_batches, 1)
+        self._is_async = asyncio.iscoroutinefunction(batch_fn)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._flushes: set = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of frames waiting for the next flush"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start the flush loop on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._flushes = set()
+        self._worker = loop.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop, failing any frames still queued"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        for flush in list(self._flushes):
+            flush.cancel()
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one frame and wait for its result"""
+        # Started lazily so callers outside the app lifespan still work
+        await self.start()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future, stage_timer.current()))
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for the first frame, then gather more until the size or time limit"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            batch = await self._collect()
+            flush = self._loop.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flush_done)
+
+    def _flush_done(self, flush: asyncio.Task):
+        self._flushes.discard(flush)
+        self._slots.release()
+
+    async def _flush(self, batch: list):
+        # Callers that gave up (e.g. client disconnected) are not scored
+        batch = [entry for entry in batch if not entry[1].done()]
+        if not batch:
+            return
+
+        if self.on_flush is not None:
+            self.on_flush(len(batch))
+        # This task's context was copied from whichever request started the loop
+        timers = [timer for _, _, timer in batch if timer is not None]
+        batch_timer = stage_timer.StageTimer() if timers else None
+        stage_timer.use(batch_timer)
+
+        try:
+            items = [item for item, _, _ in batch]
+            results = await self.batch_fn(items) if self._is_async else self.batch_fn(items)
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch function returned {len(results)} results for {len(batch)} items")
+        except asyncio.CancelledError:
+            # A flush cancelled by stop() must not leave its callers waiting
+            self._fail(batch, RuntimeError("Micro-batcher stopped"))
+            raise
+        except Exception as e:
+            logger.error("Micro-batch of %d failed: %s", len(batch), e)
+            self._fail(batch, e)
+            return
+
+        for timer in timers:
+            timer.absorb(batch_timer)
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(batch: list, error: Exception):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
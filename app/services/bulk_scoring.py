@@ -0,0 +1,230 @@
+"""
+Offline bulk scoring of recorded landmark frames
+Streams CSV / Parquet / NDJSON in fixed-size chunks, so memory use does not grow with the input
+
+    python -m app.services.bulk_scoring frames.csv predictions.parquet [--chunk-size 8192] [--keep id,label]
+
+Landmarks are read from columns x1,y1,z1 ... x21,y21,z21 when present, or from a
+"landmarks" list column (the API's request format) otherwise. Each chunk is preprocessed as one (N, 21, 3) array
+and scored in cache-sized pieces on a thread pool (--threads).
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.services.gesture_service import DECISION_MODES, GestureService
+from app.services.parallel_scorer import ParallelScorer
+
+logger = logging.getLogger(__name__)
+
+LANDMARK_COLUMNS = [f"{axis}{i}" for i in range(1, 22) for axis in "xyz"]
+FORMATS = ("csv", "parquet", "ndjson")
+OUTPUT_COLUMNS = ["gesture_name", "maze_action", "confidence", "prediction_number"]
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson", "json"):
+        return "ndjson"
+    if extension in ("parquet", "pq"):
+        return "parquet"
+    if extension == "csv":
+        return "csv"
+    raise ValueError(f"Cannot tell the format of {path}; pass --input-format/--output-format ({', '.join(FORMATS)})")
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Parquet files need pyarrow: pip install pyarrow")
+
+def read_chunks(path: str, chunk_size: int, fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Yield the file as DataFrames of at most chunk_size rows"""
+    fmt = fmt or detect_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == "ndjson":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif fmt == "parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+
+def landmark_matrix(chunk: pd.DataFrame) -> np.ndarray:
+    """The chunk's landmarks as a float32 (N, 63) array"""
+    if all(column in chunk.columns for column in LANDMARK_COLUMNS):
+        return chunk[LANDMARK_COLUMNS].to_numpy(dtype=np.float32)
+    if "landmarks" in chunk.columns:
+        frames = np.array(chunk["landmarks"].tolist(), dtype=np.float32)
+        if frames.ndim != 2 or frames.shape[1] != 63:
+            raise ValueError(f"Expected 63 values per 'landmarks' entry, got shape {frames.shape}")
+        return frames
+    # Guessing from column positions would score id or label columns as coordinates
+    missing = [column for column in LANDMARK_COLUMNS if column not in chunk.columns]
+    raise ValueError(f"Expected landmark columns {LANDMARK_COLUMNS[0]},{LANDMARK_COLUMNS[1]},{LANDMARK_COLUMNS[2]}"
+                     f" ... {LANDMARK_COLUMNS[-1]} or a 'landmarks' column; missing {len(missing)} of them "
+                     f"(first: {missing[0]}). Rename the input columns to match")
+
+def score_frames(service: GestureService, frames: np.ndarray, decision_mode: str = "full") -> pd.DataFrame:
+    """
+    Score an (N, 63) array with one model call. Rows with missing or
+    non-finite values get no gesture and a NaN confidence.
+    """
+    valid = np.isfinite(frames).all(axis=1)
+    frames = np.where(valid[:, None], frames, 0.0)
+    features = service.preprocess_batch(frames)
+
+    if service.engine is not None:
+        engine = service.engine
+        labels, confidences = service.engine_predict(features, decision_mode)
+        result = pd.DataFrame({
+            "gesture_name": np.asarray(engine.class_names, dtype=object)[labels],
+            "maze_action": np.asarray(engine.class_actions, dtype=object)[labels],
+            "confidence": np.asarray(confidences, dtype=np.float64),
+            "prediction_number": np.asarray(engine.class_numbers)[labels],
+        })
+    else:
+        result = pd.DataFrame(service.predict_batch(frames, decision_mode), columns=OUTPUT_COLUMNS)
+
+    if not valid.all():
+        result.loc[~valid, ["gesture_name", "maze_action"]] = None
+        result.loc[~valid, "confidence"] = np.nan
+        result.loc[~valid, "prediction_number"] = -1
+    return result
+
+class ChunkWriter:
+    """Appends DataFrames to a CSV, NDJSON or Parquet file one chunk at a time"""
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{self.fmt}', expected one of {FORMATS}")
+        if self.fmt == "parquet":
+            _require_pyarrow()
+        self._file = None
+        self._parquet = None
+
+    def write(self, chunk: pd.DataFrame):
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+            return
+
+        first = self._file is None
+        if first:
+            self._file = open(self.path, "w", newline="")
+        if self.fmt == "csv":
+            chunk.to_csv(self._file, header=first, index=False)
+        elif len(chunk):
+            # to_json writes missing values as null, unlike json.dumps
+            self._file.write(chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._file is not None:
+            self._file.close()
+
+def score_file(
+    service: GestureService,
+    input_path: str,
+    output_path: str,
+    chunk_size: int = 8192,
+    decision_mode: str = "full",
+    keep: Sequence[str] = (),
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    on_chunk: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, float]:
+    """
+    Stream input_path through the model into output_path. Only one chunk is
+    held in memory at a time. Output rows follow input order and hold the
+    `keep` columns followed by the prediction columns.
+    on_chunk(chunk_rows, total_rows) is called after each chunk is written.
+    """
+    if decision_mode not in DECISION_MODES:
+        raise ValueError(f"Unknown decision mode '{decision_mode}', expected one of {DECISION_MODES}")
+
+    started = time.perf_counter()
+    rows = chunks = 0
+    writer = ChunkWriter(output_path, output_format)
+    try:
+        for chunk in read_chunks(input_path, chunk_size, input_format):
+            missing = [column for column in keep if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"Columns to keep not found in input: {missing}")
+
+            predictions = score_frames(service, landmark_matrix(chunk), decision_mode)
+            if keep:
+                predictions = pd.concat([chunk[list(keep)].reset_index(drop=True), predictions], axis=1)
+            writer.write(predictions)
+
+            rows += len(chunk)
+            chunks += 1
+            if on_chunk is not None:
+                on_chunk(len(chunk), rows)
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "chunks": chunks, "seconds": seconds, "rows_per_second": rows / seconds if seconds else 0.0}
+
+def main(argv: Optional[Sequence[str]] = None):
+    from app.utils.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Score recorded landmark frames in bounded memory")
+    parser.add_argument("input", help="CSV, Parquet or NDJSON file of landmark frames")
+    parser.add_argument("output", help="Where to write predictions (CSV, Parquet or NDJSON)")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="Rows read and written per chunk")
+    parser.add_argument("--threads", type=int, default=0, help="Scoring threads (0 = one per available core)")
+    parser.add_argument("--score-chunk-rows", type=int, default=settings.SCORING_CHUNK_ROWS,
+                        help="Rows per model call; each thread holds a score-chunk-rows x support vectors kernel")
+    parser.add_argument("--decision-mode", choices=DECISION_MODES, default="full")
+    parser.add_argument("--keep", default="", help="Comma-separated input columns to copy to the output")
+    parser.add_argument("--input-format", choices=FORMATS)
+    parser.add_argument("--output-format", choices=FORMATS)
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    parser.add_argument("--encoder", default=settings.ENCODER_PATH)
+    parser.add_argument("--artifact-dir", default=settings.MODEL_ARTIFACT_DIR,
+                        help="Compiled model artifact cache ('' to load the pickles)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    scorer = ParallelScorer(threads=args.threads, chunk_rows=args.score_chunk_rows)
+    service = GestureService(args.model, args.encoder, artifact_dir=args.artifact_dir or None, scorer=scorer)
+    if not service.health_check():
+        raise SystemExit(f"Could not load the model from {args.model}")
+
+    def progress(chunk_rows: int, total_rows: int):
+        logger.info("Scored %d rows", total_rows)
+
+    summary = score_file(
+        service, args.input, args.output,
+        chunk_size=args.chunk_size,
+        decision_mode=args.decision_mode,
+        keep=[column.strip() for column in args.keep.split(",") if column.strip()],
+        input_format=args.input_format,
+        output_format=args.output_format,
+        on_chunk=progress,
+    )
+    scorer.shutdown()
+    print(json.dumps(summary))
+
+if __name__ == "__main__":
+    main()
@@ -6,20 +6,77 @@ FIXED preprocessing to match training
 
 import joblib
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import logging
+import threading
+import time
+from functools import partial
+
+from app.services import model_artifact
+from app.services.parallel_scorer import ParallelScorer
+from app.services.svm_engine import SVMEngine
+from app.utils import log_pipeline, stage_timer
+from app.utils.landmark_features import normalize_landmarks
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "full": every 1-vs-1 pair + calibrated probabilities
+# "dag":  decision-DAG over n_classes - 1 pairs, calibrated only when the margin is small
+DECISION_MODES = ("full", "dag")
+
+# preprocess_landmarks output: 21 landmarks x (x, y)
+N_FEATURES = 42
+
+# Canned frames a reloaded model is warmed up and checked on before it is swapped in
+WARMUP_FRAMES = 32
+
+class ModelReloadError(RuntimeError):
+    """The model files on disk did not pass the checks; the current model keeps serving"""
+
+class LoadedModel:
+    """
+    One load of the model files: the sklearn objects and/or the compiled engine,
+    how they were loaded and the version (the source pickles' hash prefix).
+    Never modified once built, so a request that took a reference keeps a
+    consistent model while a reload swaps in the next one.
+    """
+
+    def __init__(self, model=None, label_encoder=None, engine: Optional[SVMEngine] = None,
+                 source: Optional[str] = None, version: Optional[str] = None, load_seconds: float = 0.0):
+        self.model = model
+        self.label_encoder = label_encoder
+        self.engine = engine
+        self.source = source
+        self.version = version
+        self.load_seconds = load_seconds
+
+    @property
+    def healthy(self) -> bool:
+        if self.engine is not None:
+            return True
+        return self.model is not None and self.label_encoder is not None
+
+    @property
+    def n_features(self) -> Optional[int]:
+        """Input features the model expects, when it says"""
+        if self.engine is not None:
+            return self.engine.n_features
+        return getattr(self.model, 'n_features_in_', None)
+
 class GestureService:
     """Service for hand gesture prediction with CORRECT preprocessing"""
     
-    def __init__(self, model_path: str, encoder_path: str):
+    def __init__(self, model_path: str, encoder_path: str, use_engine: bool = True,
+                 dag_min_margin: float = 0.5, artifact_dir: Optional[str] = None,
+                 scorer: Optional[ParallelScorer] = None):
         self.model_path = model_path
         self.encoder_path = encoder_path
-        self.model = None
-        self.label_encoder = None
+        self.use_engine = use_engine
+        self.dag_min_margin = dag_min_margin
+        self.artifact_dir = artifact_dir
+        # Splits large engine batches into chunks, on a thread pool when it has more than one thread
+        self.scorer = scorer
+        self._reload_lock = threading.Lock()
         
         # Gesture to maze action mapping
         self.gesture_to_action = {
@@ -39,25 +96,139 @@ class GestureService:
             'two_up': 'TWO',        
         }
         
-        self._load_models()
+        # Replaced as a whole by reload(); readers take one reference per call
+        self._loaded = self._load()
+    
+    # The model currently serving, for callers outside the predict methods
+    @property
+    def model(self):
+        return self._loaded.model
+    
+    @property
+    def label_encoder(self):
+        return self._loaded.label_encoder
+    
+    @property
+    def engine(self) -> Optional[SVMEngine]:
+        return self._loaded.engine
+    
+    @property
+    def load_source(self) -> Optional[str]:
+        """How the model was loaded: from the "artifact" or the "pickle" files"""
+        return self._loaded.source
+    
+    @property
+    def load_seconds(self) -> float:
+        return self._loaded.load_seconds
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        """First 16 hex digits of the SHA-256 of the model and encoder files"""
+        return self._loaded.version
+    
+    def _load(self, digest: Optional[str] = None) -> LoadedModel:
+        """Load the model files as they are on disk now"""
+        started = time.perf_counter()
+        if digest is None:
+            try:
+                digest = model_artifact.source_hash(self.model_path, self.encoder_path)
+            except OSError as e:
+                logger.error(f"Error reading model files: {e}")
+        
+        loaded = None
+        if self.use_engine and self.artifact_dir and digest:
+            loaded = self._load_artifact(digest)
+        if loaded is None:
+            loaded = self._load_models()
+        loaded.version = digest[:16] if digest else None
+        loaded.load_seconds = time.perf_counter() - started
+        return loaded
     
-    def _load_models(self):
+    def _load_artifact(self, digest: str) -> Optional[LoadedModel]:
+        """Load the memory-mapped engine artifact, compiling it on first use; None to fall back to pickles"""
+        try:
+            path = model_artifact.ensure_artifact(self.model_path, self.encoder_path, self.artifact_dir, digest)
+            engine = model_artifact.load_artifact(path, self.gesture_to_action)
+        except Exception as e:
+            logger.error(f"Error loading model artifact, using pickles: {e}")
+            return None
+        
+        logger.info(f"Model artifact loaded from {path} ({len(engine.support_vectors)} support vectors)")
+        return LoadedModel(engine=engine, source="artifact")
+    
+    def _load_models(self) -> LoadedModel:
         """Load the trained model and label encoder using joblib"""
         try:
-            self.model = joblib.load(self.model_path)
+            model = joblib.load(self.model_path)
             logger.info(f"Model loaded with joblib from {self.model_path}")
             
-            self.label_encoder = joblib.load(self.encoder_path)
+            label_encoder = joblib.load(self.encoder_path)
             logger.info(f"Label encoder loaded with joblib from {self.encoder_path}")
             
             # Check model input requirements
-            if hasattr(self.model, 'n_features_in_'):
-                logger.info(f"Model expects {self.model.n_features_in_} features")
+            if hasattr(model, 'n_features_in_'):
+                logger.info(f"Model expects {model.n_features_in_} features")
             
         except Exception as e:
             logger.error(f"Error loading models: {e}")
-            self.model = None
-            self.label_encoder = None
+            return LoadedModel(source="pickle")
+        
+        # Compile the SVM into the NumPy engine; other models keep the sklearn path
+        engine = None
+        if self.use_engine and SVMEngine.supports(model):
+            try:
+                engine = SVMEngine.from_sklearn(model, label_encoder, self.gesture_to_action)
+                logger.info(f"Compiled SVM engine with {len(engine.support_vectors)} support vectors")
+            except Exception as e:
+                logger.error(f"Error compiling SVM engine, using sklearn: {e}")
+        return LoadedModel(model, label_encoder, engine, source="pickle")
+    
+    def reload(self) -> bool:
+        """
+        Load the model files again, warm the new model up and check it, then
+        swap it in with one reference assignment. Calls already running finish
+        on the model they started with. Returns False when the files have not
+        changed; raises ModelReloadError, keeping the current model, when the
+        new one fails a check. Blocks for the whole load: run it off the event loop.
+        """
+        with self._reload_lock:
+            try:
+                digest = model_artifact.source_hash(self.model_path, self.encoder_path)
+            except OSError as e:
+                raise ModelReloadError(f"Cannot read the model files: {e}") from e
+            current = self._loaded
+            if current.healthy and current.version == digest[:16]:
+                return False
+            
+            candidate = self._load(digest)
+            self._check_candidate(candidate)
+            self._loaded = candidate
+        logger.info(f"Swapped in model {candidate.version} from {candidate.source} "
+                    f"(was {current.version}, loaded in {candidate.load_seconds:.3f}s)")
+        return True
+    
+    def _check_candidate(self, candidate: LoadedModel):
+        """Reject a model that did not load, expects other features, or misbehaves on canned frames"""
+        if not candidate.healthy:
+            raise ModelReloadError("The new model files could not be loaded")
+        if candidate.n_features is not None and candidate.n_features != N_FEATURES:
+            raise ModelReloadError(f"The new model expects {candidate.n_features} features, "
+                                   f"preprocessing produces {N_FEATURES}")
+        
+        # The first calls also fault in the memory-mapped arrays and size the scratch buffers
+        frames = np.random.default_rng(0).uniform(0.2, 0.8, size=(WARMUP_FRAMES, 63))
+        features = self.preprocess_batch(frames)
+        for decision_mode in DECISION_MODES:
+            try:
+                results = self._score(candidate, features, decision_mode)
+                results += self._score(candidate, features[:1], decision_mode)
+            except Exception as e:
+                raise ModelReloadError(f"The new model failed on the warm-up frames: {e}") from e
+            if len(results) != WARMUP_FRAMES + 1:
+                raise ModelReloadError(f"The new model returned {len(results)} results "
+                                       f"for {WARMUP_FRAMES + 1} warm-up frames")
+            if not all(0.0 <= result['confidence'] <= 1.0 for result in results):
+                raise ModelReloadError("The new model returned confidences outside [0, 1]")
     
     def preprocess_landmarks(self, landmarks: List[float]) -> np.ndarray:
         """
@@ -69,34 +240,62 @@ class GestureService:
         if len(landmarks) != 63:
             raise ValueError(f"Expected 63 landmarks, got {len(landmarks)}")
 
-        # (a) Turn into a (21,3) array
-        landmarks_array = np.array(landmarks, dtype=np.float32).reshape(21, 3)
-
-        # (b) Drop the z‐coordinate, keep only x,y
-        xy_coordinates = landmarks_array[:, :2]  # shape = (21,2)
-
-        # (c) Recenter so that landmark #1 (index 0) is the origin
-        wrist = xy_coordinates[0, :]             # this is (x1, y1)
-        rel_coords = xy_coordinates - wrist       # now wrist is at (0,0)
+        # Same kernel as training, on a one-frame (1,63) view
+        frame = np.asarray(landmarks, dtype=np.float32).reshape(1, 63)
+        return normalize_landmarks(frame)[0]
+    
+    def preprocess_batch(self, landmarks_batch: Sequence[Sequence[float]],
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized version of preprocess_landmarks for many frames at once.
+        Input: (N, 63) landmark frames
+        Output: (N, 42) float32 features, written to `out` when given
+        """
+        frames = np.asarray(landmarks_batch, dtype=np.float32)
+        return normalize_landmarks(frames, out=out)
 
-        # (d) Compute scale = Euclidean distance from wrist to mid‐finger tip (#12 → index 11)
-        mid_tip = rel_coords[11, :]               # rel_coords[11] is (x12_, y12_) 
-        scale = np.linalg.norm(mid_tip)
-        if scale == 0:
-            scale = 1.0  # avoid division by zero
+    def gesture_names(self) -> List[str]:
+        """Gesture names indexed by prediction_number"""
+        loaded = self._loaded
+        if loaded.engine is not None:
+            return [name for _, name in sorted(zip(loaded.engine.class_numbers, loaded.engine.class_names))]
+        if loaded.label_encoder is not None:
+            return [str(name) for name in loaded.label_encoder.classes_]
+        return []
+    
+    def engine_predict(self, input_data: np.ndarray, decision_mode: str = "full",
+                       engine: Optional[SVMEngine] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (labels, confidences) for preprocessed features from the compiled
+        engine, split across the scorer's threads when one is configured
+        """
+        if engine is None:
+            engine = self.engine
+        if self.scorer is not None:
+            call = partial(self._engine_call, decision_mode=decision_mode, engine=engine)
+            return self.scorer.score(call, input_data)
+        return self._engine_call(input_data, decision_mode, engine)
 
-        # (e) Normalize all points by that distance
-        normalized = rel_coords / scale           # shape = (21,2)
+    def _engine_call(self, input_data: np.ndarray, decision_mode: str, engine: Optional[SVMEngine] = None):
+        if engine is None:
+            engine = self.engine
+        if decision_mode == "dag":
+            return engine.predict_dag(input_data, self.dag_min_margin)
+        return engine.predict(input_data)
 
-        # (f) Flatten back to 42 features
-        processed = normalized.flatten()           # shape = (42,)
+    def _log_predictions(self, results: List[Dict[str, Any]], decision_mode: str):
+        """Log a sampled fraction of model calls (LOG_SAMPLE_RATES "prediction")"""
+        if results:
+            log_pipeline.log_event(logger, "prediction", "Predicted %s", results[0]['gesture_name'],
+                                   confidence=results[0]['confidence'], frames=len(results), decision_mode=decision_mode)
 
-        logger.info(f"Preprocessed 63→42 features (dropped z, recentered, normalized)")
-        return processed
-    
-    def predict(self, landmarks: List[float]) -> Dict[str, Any]:
-        """Predict gesture with CORRECT preprocessing"""
-        if not self.model or not self.label_encoder:
+    def predict(self, landmarks: List[float], decision_mode: str = "full") -> Dict[str, Any]:
+        """
+        Predict gesture with CORRECT preprocessing.
+        decision_mode="dag" uses the decision-DAG shortcut when the SVM engine is loaded.
+        """
+        loaded = self._loaded
+        if not loaded.healthy:
             raise RuntimeError("Model not loaded properly")
         
         try:
@@ -105,33 +304,90 @@ class GestureService:
             
             # Reshape for model prediction (1, 42)
             input_data = processed_landmarks.reshape(1, -1)
+            stage_timer.mark("preprocess")
             
-            logger.info(f"Input shape: {input_data.shape}")
+            if loaded.engine is not None:
+                result = self._score(loaded, input_data, decision_mode)[0]
+                self._log_predictions([result], decision_mode)
+                return result
             
             # Make prediction
-            prediction = self.model.predict(input_data)[0]
-            prediction_proba = self.model.predict_proba(input_data)[0]
+            prediction = loaded.model.predict(input_data)[0]
+            prediction_proba = loaded.model.predict_proba(input_data)[0]
+            stage_timer.mark("svm")
             
             # Get gesture name
-            gesture_name = self.label_encoder.inverse_transform([prediction])[0]
+            gesture_name = loaded.label_encoder.inverse_transform([prediction])[0]
             
             # Get confidence
             confidence = float(np.max(prediction_proba))
             
             # Get maze action
             maze_action = self.gesture_to_action.get(gesture_name, 'WAIT')
+            stage_timer.mark("decode")
             
-            return {
+            result = {
                 'gesture_name': gesture_name,
                 'maze_action': maze_action,
                 'confidence': confidence,
                 'prediction_number': int(prediction)
             }
+            self._log_predictions([result], decision_mode)
+            return result
             
         except Exception as e:
-            logger.error(f"Prediction error: {e}")
+            logger.error("Prediction error: %s", e)
             raise RuntimeError(f"Prediction failed: {str(e)}")
     
+    def predict_batch(self, landmarks_batch: Sequence[Sequence[float]],
+                      decision_mode: str = "full") -> List[Dict[str, Any]]:
+        """Predict gestures for many frames with a single probability call"""
+        loaded = self._loaded
+        if not loaded.healthy:
+            raise RuntimeError("Model not loaded properly")
+
+        try:
+            input_data = self.preprocess_batch(landmarks_batch)
+            stage_timer.mark("preprocess")
+            results = self._score(loaded, input_data, decision_mode)
+            self._log_predictions(results, decision_mode)
+            return results
+
+        except Exception as e:
+            logger.error("Batch prediction error: %s", e)
+            raise RuntimeError(f"Batch prediction failed: {str(e)}")
+
+    def _score(self, loaded: LoadedModel, input_data: np.ndarray, decision_mode: str) -> List[Dict[str, Any]]:
+        """Run one loaded model on (N, 42) features"""
+        if loaded.engine is not None:
+            labels, confidences = self.engine_predict(input_data, decision_mode, loaded.engine)
+            stage_timer.mark("svm")
+            results = loaded.engine.to_results(labels, confidences)
+            stage_timer.mark("decode")
+            return results
+
+        # Labels from predict(), like the single-frame path: for an SVC the
+        # voted label and the most probable class can differ. predict_proba
+        # only supplies the confidence
+        predictions = loaded.model.predict(input_data)
+        confidences = loaded.model.predict_proba(input_data).max(axis=1)
+        stage_timer.mark("svm")
+
+        gesture_names = loaded.label_encoder.inverse_transform(predictions)
+
+        results = [
+            {
+                'gesture_name': gesture_name,
+                'maze_action': self.gesture_to_action.get(gesture_name, 'WAIT'),
+                'confidence': float(confidence),
+                'prediction_number': int(prediction)
+            }
+            for gesture_name, confidence, prediction
+            in zip(gesture_names, confidences, predictions)
+        ]
+        stage_timer.mark("decode")
+        return results
+
     def health_check(self) -> bool:
         """Check if the service is healthy"""
-        return self.model is not None and self.label_encoder is not None
\ No newline at end of file
+        return self._loaded.healthy
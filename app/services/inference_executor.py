@@ -0,0 +1,258 @@
+"""
+Executor layer that runs CPU-bound gesture inference off the asyncio event loop
+"""
+
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.gesture_service import GestureService
+from app.services.shm_pool import RingInferencePool
+from app.utils import stage_timer
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_BACKENDS = ("inline", "thread", "process", "shm")
+
+# Per-process service used by the process backend, created by _init_worker
+_worker_service: Optional[GestureService] = None
+
+def _init_worker(model_path: str, encoder_path: str, use_engine: bool, dag_min_margin: float,
+                 artifact_dir: Optional[str], ready=None):
+    """Load the model once in each worker process, then release `ready` if given"""
+    global _worker_service
+    _worker_service = GestureService(model_path, encoder_path, use_engine, dag_min_margin, artifact_dir)
+    if ready is not None:
+        ready.release()
+
+def _noop():
+    pass
+
+def _wait_for_workers(pool: ProcessPoolExecutor, ready, workers: int, timeout: float):
+    """Block until `workers` processes of pool have loaded the model"""
+    # Processes are spawned as jobs are submitted; one job per worker starts them all
+    jobs = [pool.submit(_noop) for _ in range(workers)]
+    deadline = time.monotonic() + timeout
+    loaded = 0
+    while loaded < workers:
+        if ready.acquire(timeout=0.1):
+            loaded += 1
+            continue
+        for job in jobs:
+            if job.done() and job.exception() is not None:
+                raise RuntimeError(f"Inference worker failed to start: {job.exception()}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Inference workers did not load the model within {timeout}s")
+
+def _timed_call(fn: Callable, *args) -> Tuple[float, Any]:
+    """Run fn and return the monotonic time it started alongside its result"""
+    started = time.monotonic()
+    stage_timer.mark("queue")
+    return started, fn(*args)
+
+def _worker_predict_batch(frames: Sequence[Sequence[float]],
+                          decision_mode: str) -> Tuple[float, List[Dict[str, Any]]]:
+    return _timed_call(_worker_service.predict_batch, frames, decision_mode)
+
+class InferenceExecutor:
+    """
+    Run GestureService inference on a thread or process pool with bounded concurrency.
+
+    Backends:
+      - inline:  call the service directly on the event loop (previous behavior)
+      - thread:  ThreadPoolExecutor sharing the loaded model; NumPy/BLAS release the GIL
+      - process: ProcessPoolExecutor, each worker loads its own copy of the model
+      - shm:     RingInferencePool, worker processes fed through a shared-memory
+                 ring buffer, so frames and results are never pickled
+
+    At most max_concurrency jobs are handed to the pool at a time; the rest wait
+    on the loop. The time a job spends waiting before it starts running is
+    reported through on_queue_wait (seconds), and the time it then takes to
+    run through on_service_time (seconds); inline calls report their service
+    time only.
+    """
+
+    def __init__(
+        self,
+        gesture_service: GestureService,
+        backend: str = "thread",
+        max_workers: int = 2,
+        max_concurrency: Optional[int] = None,
+        on_queue_wait: Optional[Callable[[float], None]] = None,
+        on_in_flight: Optional[Callable[[int], None]] = None,
+        on_service_time: Optional[Callable[[float], None]] = None,
+        ring_rows_per_job: int = 256,
+    ):
+        if backend not in EXECUTOR_BACKENDS:
+            raise ValueError(f"Unknown executor backend '{backend}', expected one of {EXECUTOR_BACKENDS}")
+        self.gesture_service = gesture_service
+        self.backend = backend
+        self.max_workers = max(max_workers, 1)
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.on_queue_wait = on_queue_wait
+        self.on_in_flight = on_in_flight
+        self.on_service_time = on_service_time
+        self.ring_rows_per_job = ring_rows_per_job
+
+        self._pool: Optional[Executor] = None
+        self._ring_pool: Optional[RingInferencePool] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Jobs admitted to the executor that have not finished yet"""
+        return self._in_flight
+
+    def _new_process_pool(self, ready=None) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(
+                self.gesture_service.model_path,
+                self.gesture_service.encoder_path,
+                self.gesture_service.use_engine,
+                self.gesture_service.dag_min_margin,
+                self.gesture_service.artifact_dir,
+                ready,
+            ),
+        )
+
+    def _new_ring_pool(self) -> RingInferencePool:
+        # One job slot per admitted job, so a slot is always free once admitted
+        return RingInferencePool(
+            self.gesture_service,
+            workers=self.max_workers,
+            n_jobs=self.max_concurrency,
+            rows_per_job=self.ring_rows_per_job,
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.backend == "process":
+                self._pool = self._new_process_pool()
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            logger.info(f"Started {self.backend} inference pool with {self.max_workers} workers")
+        return self._pool
+
+    def _get_ring_pool(self) -> RingInferencePool:
+        if self._ring_pool is None:
+            self._ring_pool = self._new_ring_pool()
+        return self._ring_pool
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to one loop; recreate for a new one
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _set_in_flight(self, delta: int):
+        self._in_flight += delta
+        if self.on_in_flight is not None:
+            self.on_in_flight(self._in_flight)
+
+    def start(self):
+        """Create the worker pool now instead of on the first request"""
+        if self.backend == "shm":
+            self._get_ring_pool().start()
+        elif self.backend != "inline":
+            self._get_pool()
+
+    def _run_inline(self, fn: Callable, *args) -> Any:
+        # Blocks the loop, so nothing ever queues here; the service time still
+        # feeds admission control's estimate for the requests that pile up meanwhile
+        started = time.monotonic()
+        result = fn(*args)
+        if self.on_service_time is not None:
+            self.on_service_time(time.monotonic() - started)
+        return result
+
+    async def predict_batch(self, frames: Sequence[Sequence[float]],
+                            decision_mode: str = "full") -> List[Dict[str, Any]]:
+        """Predict a batch of frames without blocking the event loop"""
+        if self.backend == "inline":
+            return self._run_inline(self.gesture_service.predict_batch, frames, decision_mode)
+
+        submitted = time.monotonic()
+        self._set_in_flight(1)
+        try:
+            async with self._get_semaphore():
+                if self.backend == "shm":
+                    started, results = await self._get_ring_pool().predict_batch(frames, decision_mode)
+                else:
+                    if self.backend == "process":
+                        call = (_worker_predict_batch, frames, decision_mode)
+                    else:
+                        # Run in the caller's context so a sampled request's stage timer sees the model stages
+                        call = (contextvars.copy_context().run, _timed_call,
+                                self.gesture_service.predict_batch, frames, decision_mode)
+                    loop = asyncio.get_running_loop()
+                    started, results = await loop.run_in_executor(self._get_pool(), *call)
+        finally:
+            self._set_in_flight(-1)
+
+        if self.on_queue_wait is not None:
+            self.on_queue_wait(max(started - submitted, 0.0))
+        if self.on_service_time is not None:
+            self.on_service_time(max(time.monotonic() - started, 0.0))
+        return results
+
+    async def predict(self, landmarks: Sequence[float], decision_mode: str = "full") -> Dict[str, Any]:
+        """Predict a single frame without blocking the event loop"""
+        if self.backend == "inline":
+            return self._run_inline(self.gesture_service.predict, landmarks, decision_mode)
+        return (await self.predict_batch([landmarks], decision_mode))[0]
+
+    async def recycle(self, timeout: float = 60.0):
+        """
+        Replace the worker processes so that they load the model files again,
+        after GestureService.reload(). The new workers are started and load
+        the model while the old ones keep serving; once all of them are ready
+        new jobs go to them and the old ones finish what they were given. If
+        the new workers fail to start within timeout the old ones are kept and
+        RuntimeError is raised. The inline and thread backends share the
+        service's model and need nothing.
+        """
+        if self.backend == "process" and self._pool is not None:
+            ready = multiprocessing.Semaphore(0)
+            pool = self._new_process_pool(ready)
+            try:
+                await asyncio.to_thread(_wait_for_workers, pool, ready, self.max_workers, timeout)
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            old, self._pool = self._pool, pool
+            # Without cancel_futures, jobs already queued still run on the old workers
+            old.shutdown(wait=False)
+        elif self.backend == "shm" and self._ring_pool is not None:
+            pool = self._new_ring_pool()
+            try:
+                await asyncio.to_thread(pool.start)
+                await asyncio.to_thread(pool.wait_ready, timeout)
+            except BaseException:
+                await asyncio.to_thread(pool.shutdown)
+                raise
+            old, self._ring_pool = self._ring_pool, pool
+            await old.drain()
+        else:
+            return
+        logger.info(f"Recycled {self.backend} inference workers for the reloaded model")
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._ring_pool is not None:
+            self._ring_pool.shutdown()
+            self._ring_pool = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,151 @@
+"""
+Precompiled model artifact: the SVM engine's arrays as .npy files plus a JSON manifest
+Loads with np.load(mmap_mode='r') and never imports sklearn or unpickles an estimator
+
+Build ahead of time (e.g. in the Docker image):
+    python -m app.services.model_artifact [--model PATH] [--encoder PATH] [--out DIR]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.services.svm_engine import SVMEngine
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+# SVMEngine constructor arguments stored as one .npy file each. The derived
+# pair_coef and sv_sq_norms are stored too, so memory-mapped pages hold every
+# large array and are shared by all processes that load the same artifact
+ARRAY_FIELDS = ("support_vectors", "dual_coef", "intercept", "n_support", "prob_a", "prob_b",
+                "class_numbers", "mean", "scale", "pair_coef", "sv_sq_norms")
+
+def source_hash(model_path: str, encoder_path: str) -> str:
+    """SHA-256 over both source pickles; an artifact is only reused for the same inputs"""
+    digest = hashlib.sha256()
+    for path in (model_path, encoder_path):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+def artifact_path(cache_dir: str, digest: str) -> str:
+    return os.path.join(cache_dir, f"{digest[:16]}-v{ARTIFACT_VERSION}")
+
+def compile_artifact(model_path: str, encoder_path: str, out_dir: str, digest: Optional[str] = None) -> str:
+    """Unpickle the sklearn model once and write its engine arrays to out_dir"""
+    import joblib
+
+    model = joblib.load(model_path)
+    label_encoder = joblib.load(encoder_path)
+    # Actions are applied from GestureService's mapping at load time
+    engine = SVMEngine.from_sklearn(model, label_encoder, {})
+
+    arrays = {
+        "support_vectors": engine.support_vectors,
+        "dual_coef": engine.dual_coef,
+        "intercept": engine.intercept,
+        "n_support": np.diff(engine.sv_starts),
+        "prob_a": engine.prob_a,
+        "prob_b": engine.prob_b,
+        "class_numbers": np.asarray(engine.class_numbers, dtype=np.int64),
+        "mean": engine.mean,
+        "scale": engine.scale,
+        "pair_coef": engine.pair_coef,
+        "sv_sq_norms": engine.sv_sq_norms,
+    }
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "source_hash": digest or source_hash(model_path, encoder_path),
+        "source": {"model": os.path.basename(model_path), "encoder": os.path.basename(encoder_path)},
+        "gamma": engine.gamma,
+        "n_features": engine.n_features,
+        "class_names": engine.class_names,
+        "arrays": {},
+    }
+
+    # Written to a temporary directory and renamed, so readers never see half an artifact
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".artifact-", dir=parent)
+    try:
+        for name in ARRAY_FIELDS:
+            array = arrays[name]
+            if array is None:
+                continue
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+            manifest["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        with open(os.path.join(staging, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(staging, out_dir)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.exists(os.path.join(out_dir, MANIFEST_NAME)):
+            raise
+        # Another process published the same artifact first
+    logger.info(f"Compiled model artifact {out_dir}")
+    return out_dir
+
+def ensure_artifact(model_path: str, encoder_path: str, cache_dir: str, digest: Optional[str] = None) -> str:
+    """Path of the artifact for these pickles, compiling it on the first run"""
+    digest = digest or source_hash(model_path, encoder_path)
+    path = artifact_path(cache_dir, digest)
+    if not os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        compile_artifact(model_path, encoder_path, path, digest)
+    return path
+
+def load_artifact(path: str, gesture_to_action: Dict[str, str], mmap: bool = True) -> SVMEngine:
+    """Build an SVMEngine from an artifact directory; arrays are memory-mapped read-only"""
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {manifest.get('version')}")
+
+    mmap_mode = "r" if mmap else None
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        for name in manifest["arrays"]
+    }
+    class_names = manifest["class_names"]
+    return SVMEngine(
+        support_vectors=arrays["support_vectors"],
+        dual_coef=arrays["dual_coef"],
+        intercept=arrays["intercept"],
+        n_support=arrays["n_support"],
+        gamma=manifest["gamma"],
+        prob_a=arrays["prob_a"],
+        prob_b=arrays["prob_b"],
+        class_numbers=arrays["class_numbers"],
+        class_names=class_names,
+        class_actions=[gesture_to_action.get(name, 'WAIT') for name in class_names],
+        mean=arrays.get("mean"),
+        scale=arrays.get("scale"),
+        pair_coef=arrays["pair_coef"],
+        sv_sq_norms=arrays["sv_sq_norms"],
+    )
+
+def main():
+    from app.utils.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Compile the gesture model into a memory-mappable artifact")
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    parser.add_argument("--encoder", default=settings.ENCODER_PATH)
+    parser.add_argument("--out", default=settings.MODEL_ARTIFACT_DIR, help="Artifact cache directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(ensure_artifact(args.model, args.encoder, args.out))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Zero-downtime model reloads: on request, or when the model files on disk change
+The new model is loaded, warmed up and checked off the event loop, then swapped in atomically
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.services.gesture_service import GestureService, ModelReloadError
+
+logger = logging.getLogger(__name__)
+
+class ReloadInProgress(RuntimeError):
+    """Another reload is still loading or checking a model"""
+
+class ModelReloader:
+    """
+    Runs GestureService.reload() one at a time on a worker thread, and
+    optionally polls the model and encoder files to trigger it.
+
+    The watcher compares each file's (mtime, size) every `interval` seconds
+    and reloads once a change has stayed the same for one more poll, so a
+    file that is still being copied is not loaded half-written. Replace the
+    files with a rename (e.g. `cp new.pkl x.tmp && mv x.tmp best_hand_gesture.pkl`)
+    to make the swap safe regardless.
+
+    After a swap, on_swap runs on the event loop (clear caches, recycle
+    worker processes); on_reload gets the outcome ("swapped", "unchanged"
+    or "rejected") and the seconds the reload took.
+    """
+
+    def __init__(
+        self,
+        gesture_service: GestureService,
+        interval: float = 0.0,
+        on_swap: Optional[Callable[[], Awaitable[None]]] = None,
+        on_reload: Optional[Callable[[str, float], None]] = None,
+    ):
+        self.gesture_service = gesture_service
+        self.interval = interval
+        self.on_swap = on_swap
+        self.on_reload = on_reload
+        self.last_reload: Optional[Dict[str, Any]] = None
+        self._reloading = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def reloading(self) -> bool:
+        return self._reloading
+
+    def signature(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        """(mtime_ns, size) of the model and encoder files, None for a missing one"""
+        paths = (self.gesture_service.model_path, self.gesture_service.encoder_path)
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    async def reload(self, trigger: str = "admin") -> Dict[str, Any]:
+        """
+        Reload the model now. Returns a summary of the reload; raises
+        ReloadInProgress when one is already running and ModelReloadError
+        when the new model is rejected and the current one kept.
+        """
+        if self._reloading:
+            raise ReloadInProgress("A model reload is already in progress")
+        self._reloading = True
+        service = self.gesture_service
+        previous = service.model_version
+        started = time.perf_counter()
+        try:
+            try:
+                swapped = await asyncio.to_thread(service.reload)
+            except ModelReloadError as e:
+                self._finish("rejected", trigger, previous, started, error=str(e))
+                raise
+            if swapped and self.on_swap is not None:
+                try:
+                    await self.on_swap()
+                except Exception as e:
+                    # The new model is already serving in this process
+                    logger.error(f"Error after swapping in model {service.model_version}: {e}")
+            return self._finish("swapped" if swapped else "unchanged", trigger, previous, started)
+        finally:
+            self._reloading = False
+
+    def _finish(self, outcome: str, trigger: str, previous: Optional[str], started: float,
+                error: Optional[str] = None) -> Dict[str, Any]:
+        seconds = time.perf_counter() - started
+        if self.on_reload is not None:
+            self.on_reload(outcome, seconds)
+        self.last_reload = {
+            "outcome": outcome,
+            "trigger": trigger,
+            "version": self.gesture_service.model_version,
+            "previous_version": previous,
+            "source": self.gesture_service.load_source,
+            "seconds": seconds,
+            "finished_at": time.time(),
+        }
+        if error is not None:
+            self.last_reload["error"] = error
+        return self.last_reload
+
+    def start(self):
+        """Start watching the model files on the running loop; a no-op when interval is 0"""
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch(self):
+        loaded = self.signature()
+        seen = loaded
+        while True:
+            await asyncio.sleep(self.interval)
+            current = self.signature()
+            if current != seen:
+                seen = current  # still changing; wait for it to settle
+                continue
+            if current == loaded or None in current:
+                continue
+            try:
+                await self.reload(trigger="watch")
+            except ReloadInProgress:
+                continue  # an admin reload is loading the same files; look again next poll
+            except ModelReloadError as e:
+                logger.error(f"Rejected the changed model files, keeping model "
+                             f"{self.gesture_service.model_version}: {e}")
+            except Exception as e:
+                logger.error(f"Model reload failed: {e}")
+            # Rejected files are not retried until they change again
+            loaded = current
@@ -1,14 +1,118 @@
 """
 Custom monitoring metrics for gesture recognition API
+Multi-worker deployments set PROMETHEUS_MULTIPROC_DIR so /metrics aggregates every worker
 """
 
-from prometheus_client import Counter, Histogram, Gauge, Info
-from datetime import datetime
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, Gauge, Info, REGISTRY, generate_latest, multiprocess
+
+# Error types recorded by the API, bound when the service starts
+ERROR_TYPES = (
+    "invalid_input_length", "preprocessing_error", "prediction_error", "batch_too_large",
+    "invalid_binary_input", "maze_control_error", "websocket_invalid_frame",
+)
+DATA_QUALITY_TYPES = ("valid", "invalid_length", "invalid_range", "malformed")
+
+def is_multiprocess() -> bool:
+    """Whether prometheus_client is writing metrics to PROMETHEUS_MULTIPROC_DIR"""
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+class LocalCount:
+    """Increments held in the worker until flush() adds them to the Prometheus child"""
+    
+    __slots__ = ("child", "pending")
+    
+    def __init__(self, child):
+        self.child = child
+        self.pending = 0.0
+    
+    def inc(self, amount: float = 1.0):
+        self.pending += amount
+    
+    def flush(self):
+        if self.pending:
+            pending, self.pending = self.pending, 0.0
+            self.child.inc(pending)
+
+class BoundCounter:
+    """
+    Label children of a one-label Counter, resolved once per label value.
+    
+    Known values are bound up front, so their series exist from startup and
+    an increment is a dict lookup instead of a labels() call. With batched set,
+    increments accumulate in LocalCounts until flush(); flush() must run on the
+    thread that increments (the event loop), so no increment is lost.
+    """
+    
+    def __init__(self, counter: Counter, values: Iterable[str] = (), batched: bool = False):
+        self.counter = counter
+        self.batched = batched
+        self.children = {}
+        for value in values:
+            self.bind(value)
+    
+    def bind(self, value: str):
+        child = self.counter.labels(value)
+        child = self.children[value] = LocalCount(child) if self.batched else child
+        return child
+    
+    def inc(self, value: str):
+        child = self.children.get(value)
+        if child is None:
+            child = self.bind(value)
+        child.inc()
+    
+    def flush(self):
+        if self.batched:
+            for child in self.children.values():
+                child.flush()
+
+class MetricsExporter:
+    """
+    Prometheus text exposition, regenerated at most once every ttl seconds.
+    
+    Serializing every metric (and in multiprocess mode, reading every worker's
+    files) costs milliseconds; scrapes within ttl of each other share one body.
+    """
+    
+    def __init__(self, ttl: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.body: Optional[bytes] = None
+        self._rendered_at = 0.0
+    
+    def expired(self) -> bool:
+        return self.body is None or self.clock() - self._rendered_at >= self.ttl
+    
+    def refresh(self) -> bytes:
+        registry = REGISTRY
+        if is_multiprocess():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        self.body = generate_latest(registry)
+        self._rendered_at = self.clock()
+        return self.body
+    
+    def render(self) -> bytes:
+        return self.refresh() if self.expired() else self.body
 
 class MonitoringService:
-    """Service for collecting custom application metrics"""
+    """
+    Service for collecting custom application metrics.
+    
+    The per-request counters (predictions, maze actions, data quality, errors)
+    have their label children bound up front for the given gesture names and
+    actions. With batch_counters set their increments stay in the process
+    until flush(), which flush_periodically() calls from the event loop.
+    """
     
-    def __init__(self):
+    def __init__(self, gesture_names: Iterable[str] = (), actions: Iterable[str] = (),
+                 batch_counters: bool = False):
         # MODEL-RELATED METRICS
         self.gesture_predictions = Counter(
             'gesture_predictions_total',
@@ -22,6 +126,27 @@ class MonitoringService:
             buckets=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
         )
         
+        self.model_load_seconds = Gauge(
+            'model_load_seconds',
+            'Time taken to load the model at startup',
+            ['source'],  # artifact, pickle
+            multiprocess_mode='max'
+        )
+        
+        self.model_reload_seconds = Histogram(
+            'model_reload_seconds',
+            'Time taken to load, warm up and check a reloaded model',
+            ['outcome'],  # swapped, unchanged, rejected
+            buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+        )
+        
+        self.model_version_info = Gauge(
+            'model_version_info',
+            'Model version each worker is serving (1) and versions it has replaced (0)',
+            ['version', 'source'],  # first 16 hex digits of the model files' SHA-256; artifact, pickle
+            multiprocess_mode='liveall'
+        )
+        
         # DATA-RELATED METRICS
         self.input_data_quality = Counter(
             'input_data_quality_total',
@@ -42,59 +167,301 @@ class MonitoringService:
             ['action']  # UP, DOWN, LEFT, RIGHT, STOP, WAIT
         )
         
-        # System info
-        self.app_info = Info(
-            'hand_gesture_api_info',
-            'Information about the hand gesture API'
+        self.rate_limited_requests = Counter(
+            'rate_limited_requests_total',
+            'Requests rejected with 429 by the per-client rate limiter',
+            ['key_type']  # api_key, ip
+        )
+        
+        self.admission_shed = Counter(
+            'admission_shed_total',
+            'Requests rejected with 503 by admission control',
+            ['reason']  # queue_depth, estimated_wait, deadline_expired, deadline_unreachable
+        )
+        
+        self.admission_estimated_wait = Gauge(
+            'admission_estimated_wait_seconds',
+            'Expected time to answer a newly admitted inference request',
+            multiprocess_mode='max'
+        )
+        
+        # INFERENCE SCHEDULING METRICS
+        self.inference_batch_size = Histogram(
+            'inference_batch_size',
+            'Number of frames per micro-batched model call',
+            buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256]
+        )
+        
+        self.inference_queue_wait = Histogram(
+            'inference_queue_wait_seconds',
+            'Time inference jobs wait for a free executor worker',
+            buckets=[0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+        )
+        
+        self.inference_in_flight = Gauge(
+            'inference_in_flight',
+            'Inference jobs submitted to the executor and not yet finished',
+            multiprocess_mode='livesum'
+        )
+        
+        # STREAMING METRICS
+        self.websocket_connections = Gauge(
+            'websocket_connections',
+            'Open /ws/maze-control connections',
+            multiprocess_mode='livesum'
+        )
+        
+        self.websocket_frames_dropped = Counter(
+            'websocket_frames_dropped_total',
+            'Streamed frames superseded by a newer frame before being scored'
+        )
+        
+        # PREDICTION CACHE METRICS
+        self.prediction_cache_hits = Counter(
+            'prediction_cache_hits_total',
+            'Predictions answered from the cache or merged into an identical in-flight lookup'
+        )
+        
+        self.prediction_cache_misses = Counter(
+            'prediction_cache_misses_total',
+            'Predictions that had to run the model'
+        )
+        
+        self.prediction_cache_evictions = Counter(
+            'prediction_cache_evictions_total',
+            'Cached predictions evicted to keep the cache within its size limit'
+        )
+        
+        # SESSION DELTA-GATING METRICS
+        self.session_gate_frames = Counter(
+            'session_gate_frames_total',
+            'Session /maze-control frames by outcome of the delta gate',
+            ['outcome']  # skipped, inferred
         )
-        self.app_info.info({
+        
+        self.session_gate_skip_ratio = Gauge(
+            'session_gate_skip_ratio',
+            'Fraction of session frames answered without running the model',
+            multiprocess_mode='liveall'
+        )
+        
+        self.session_store_sessions = Gauge(
+            'session_store_sessions',
+            'Sessions currently held by the delta-gating store',
+            multiprocess_mode='livesum'
+        )
+        
+        self.session_store_memory = Gauge(
+            'session_store_memory_bytes',
+            'Memory used by the delta-gating store arrays',
+            multiprocess_mode='livesum'
+        )
+        
+        # REQUEST STAGE METRICS
+        self.request_stage_seconds = Histogram(
+            'request_stage_seconds',
+            'Time spent in each stage of sampled inference requests',
+            ['stage'],  # receive, validate, parse, cache_key, session_gate, queue, preprocess, svm, decode, inference, serialize
+            buckets=[0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                     0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0]
+        )
+        
+        # RUNTIME METRICS
+        self.event_loop_lag = Histogram(
+            'event_loop_lag_seconds',
+            'How late the event loop ran a scheduled wake-up',
+            buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+        )
+        
+        self.gc_pause_seconds = Histogram(
+            'gc_pause_seconds',
+            'Duration of garbage collections by generation',
+            ['generation'],  # 0, 1, 2
+            buckets=[0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25]
+        )
+        
+        self.gc_collected_objects = Counter(
+            'gc_collected_objects_total',
+            'Unreachable objects found by garbage collections',
+            ['generation']
+        )
+        
+        self.gc_frozen_objects = Gauge(
+            'gc_frozen_objects',
+            'Objects moved to the permanent generation by gc.freeze()',
+            multiprocess_mode='max'
+        )
+        
+        # System info
+        info = {
             'version': '1.0.0',
             'model_type': 'gesture_recognition',
             'use_case': 'maze_game_controller'
-        })
+        }
+        self.batch_counters = batch_counters
+        self._prediction_counts = BoundCounter(self.gesture_predictions, gesture_names, batch_counters)
+        self._maze_action_counts = BoundCounter(self.maze_actions, actions, batch_counters)
+        self._data_quality_counts = BoundCounter(self.input_data_quality, DATA_QUALITY_TYPES, batch_counters)
+        self._error_counts = BoundCounter(self.api_errors, ERROR_TYPES, batch_counters)
+        self._stage_histograms = {}
+        self._model_version = None
+        self._gc_children = {
+            generation: (self.gc_pause_seconds.labels(str(generation)), self.gc_collected_objects.labels(str(generation)))
+            for generation in range(3)
+        }
+        
+        if is_multiprocess():
+            # Info is not supported in multiprocess mode; a labelled gauge exposes the same sample
+            self.app_info = Gauge(
+                'hand_gesture_api_info',
+                'Information about the hand gesture API',
+                list(info),
+                multiprocess_mode='max'
+            )
+            self.app_info.labels(**info).set(1)
+        else:
+            self.app_info = Info(
+                'hand_gesture_api_info',
+                'Information about the hand gesture API'
+            )
+            self.app_info.info(info)
     
     def increment_prediction(self, gesture_name: str):
         """Record a gesture prediction (MODEL METRIC)"""
-        self.gesture_predictions.labels(gesture_name=gesture_name).inc()
+        self._prediction_counts.inc(gesture_name)
     
     def record_confidence(self, confidence: float):
         """Record prediction confidence score (MODEL METRIC)"""
         self.prediction_confidence.observe(confidence)
     
+    def record_model_load(self, source: str, seconds: float):
+        """Record how the model was loaded and how long it took (MODEL METRIC)"""
+        self.model_load_seconds.labels(source=source).set(seconds)
+    
+    def record_model_reload(self, outcome: str, seconds: float):
+        """Record a model reload and how long it took (MODEL METRIC)"""
+        self.model_reload_seconds.labels(outcome=outcome).observe(seconds)
+    
+    def set_model_version(self, version: Optional[str], source: Optional[str]):
+        """Mark the model version now serving, and the one it replaced as not serving (MODEL METRIC)"""
+        labels = (version or "unknown", source or "none")
+        if self._model_version is not None and self._model_version != labels:
+            self.model_version_info.labels(*self._model_version).set(0)
+        self.model_version_info.labels(*labels).set(1)
+        self._model_version = labels
+    
     def increment_data_quality(self, quality_type: str):
         """Record data quality indicators (DATA METRIC)"""
-        self.input_data_quality.labels(quality_type=quality_type).inc()
+        self._data_quality_counts.inc(quality_type)
     
     def increment_error(self, error_type: str):
         """Record API errors (SERVER METRIC)"""
-        self.api_errors.labels(error_type=error_type).inc()
+        self._error_counts.inc(error_type)
     
     def increment_maze_action(self, action: str):
         """Record maze game actions (SERVER METRIC)"""
-        self.maze_actions.labels(action=action).inc()
+        self._maze_action_counts.inc(action)
     
-    def get_timestamp(self) -> str:
-        """Get current timestamp for health checks"""
-        return datetime.utcnow().isoformat()
-        self.gesture_predictions.labels(gesture_name=gesture_name).inc()
+    def increment_rate_limited(self, key_type: str):
+        """Record a request rejected by the rate limiter (SERVER METRIC)"""
+        self.rate_limited_requests.labels(key_type=key_type).inc()
     
-    def record_confidence(self, confidence: float):
-        """Record prediction confidence score (MODEL METRIC)"""
-        self.prediction_confidence.observe(confidence)
+    def increment_admission_shed(self, reason: str):
+        """Record a request shed by admission control (SERVER METRIC)"""
+        self.admission_shed.labels(reason=reason).inc()
     
-    def increment_data_quality(self, quality_type: str):
-        """Record data quality indicators (DATA METRIC)"""
-        self.input_data_quality.labels(quality_type=quality_type).inc()
+    def set_admission_estimated_wait(self, seconds: float):
+        """Set the estimated wait for newly admitted requests (SERVER METRIC)"""
+        self.admission_estimated_wait.set(seconds)
     
-    def increment_error(self, error_type: str):
-        """Record API errors (SERVER METRIC)"""
-        self.api_errors.labels(error_type=error_type).inc()
+    def record_batch_size(self, size: int):
+        """Record how many frames one micro-batch flushed (SERVER METRIC)"""
+        self.inference_batch_size.observe(size)
     
-    def increment_maze_action(self, action: str):
-        """Record maze game actions (SERVER METRIC)"""
-        self.maze_actions.labels(action=action).inc()
+    def record_queue_wait(self, seconds: float):
+        """Record how long an inference job waited for the executor (SERVER METRIC)"""
+        self.inference_queue_wait.observe(seconds)
+    
+    def set_inference_in_flight(self, count: int):
+        """Track inference jobs currently held by the executor (SERVER METRIC)"""
+        self.inference_in_flight.set(count)
+    
+    def websocket_opened(self):
+        """Track an opened streaming connection (SERVER METRIC)"""
+        self.websocket_connections.inc()
+    
+    def websocket_closed(self):
+        """Track a closed streaming connection (SERVER METRIC)"""
+        self.websocket_connections.dec()
+    
+    def increment_dropped_frames(self):
+        """Record a streamed frame dropped for a newer one (SERVER METRIC)"""
+        self.websocket_frames_dropped.inc()
+    
+    def increment_cache_hit(self):
+        """Record a prediction served without running the model (SERVER METRIC)"""
+        self.prediction_cache_hits.inc()
+    
+    def increment_cache_miss(self):
+        """Record a prediction that missed the cache (SERVER METRIC)"""
+        self.prediction_cache_misses.inc()
+    
+    def increment_cache_eviction(self):
+        """Record an LRU eviction from the prediction cache (SERVER METRIC)"""
+        self.prediction_cache_evictions.inc()
+    
+    def record_session_gate(self, skipped: bool, skip_ratio: float):
+        """Record whether a session frame skipped inference (SERVER METRIC)"""
+        self.session_gate_frames.labels(outcome="skipped" if skipped else "inferred").inc()
+        self.session_gate_skip_ratio.set(skip_ratio)
+    
+    def set_session_store_usage(self, sessions: int, memory_bytes: int):
+        """Track the size of the delta-gating store (SERVER METRIC)"""
+        self.session_store_sessions.set(sessions)
+        self.session_store_memory.set(memory_bytes)
+    
+    def record_stage(self, stage: str, seconds: float):
+        """Record the duration of one request stage (SERVER METRIC)"""
+        child = self._stage_histograms.get(stage)
+        if child is None:
+            child = self._stage_histograms[stage] = self.request_stage_seconds.labels(stage=stage)
+        child.observe(seconds)
+    
+    def record_loop_lag(self, seconds: float):
+        """Record how late the event loop woke up (SERVER METRIC)"""
+        self.event_loop_lag.observe(seconds)
+    
+    def record_gc_pause(self, generation: int, seconds: float, collected: int):
+        """Record one garbage collection (SERVER METRIC)"""
+        pause, collected_objects = self._gc_children[generation]
+        pause.observe(seconds)
+        collected_objects.inc(collected)
+    
+    def set_gc_frozen_objects(self, count: int):
+        """Track objects excluded from garbage collection by gc.freeze() (SERVER METRIC)"""
+        self.gc_frozen_objects.set(count)
+    
+    @staticmethod
+    def mark_process_dead(pid: int):
+        """Drop a finished worker's live gauges in multiprocess mode (SERVER METRIC)"""
+        if is_multiprocess():
+            multiprocess.mark_process_dead(pid)
+    
+    def flush(self):
+        """Add batched counter increments to the Prometheus metrics"""
+        for counts in (self._prediction_counts, self._maze_action_counts,
+                       self._data_quality_counts, self._error_counts):
+            counts.flush()
+    
+    async def flush_periodically(self, interval: float):
+        """Flush batched counters every interval seconds until cancelled"""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.flush()
+        finally:
+            self.flush()
     
     def get_timestamp(self) -> str:
         """Get current timestamp for health checks"""
-        from datetime import datetime, timezone
         return datetime.now(timezone.utc).isoformat()
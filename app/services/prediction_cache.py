@@ -0,0 +1,109 @@
+"""
+Prediction result cache keyed on quantized, normalized landmark features
+Repeated frames of a hand held still are answered without running the model
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction results with single-flight lookups.
+
+    Keys are the 42 normalized features (wrist-centred, scaled by hand size)
+    rounded to a grid of `resolution`, so the same pose hits the cache
+    wherever it is in the frame and however far it is from the camera.
+    Concurrent lookups of a key that is still being computed wait for that
+    one computation instead of starting their own.
+
+    clear() starts a new generation: computations already running when it
+    is called still answer their own callers but are not stored, so a
+    result from a replaced model never lands in the cleared cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        resolution: float = 0.01,
+        on_hit: Optional[Callable[[], None]] = None,
+        on_miss: Optional[Callable[[], None]] = None,
+        on_eviction: Optional[Callable[[], None]] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        if resolution <= 0:
+            raise ValueError(f"resolution must be positive, got {resolution}")
+        self.max_entries = max_entries
+        self.resolution = resolution
+        self.on_hit = on_hit
+        self.on_miss = on_miss
+        self.on_eviction = on_eviction
+
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, features: np.ndarray, decision_mode: str = "full") -> Hashable:
+        """Cache key for one (42,) feature vector"""
+        cells = np.rint(np.asarray(features, dtype=np.float64) / self.resolution).astype(np.int32)
+        return decision_mode, cells.tobytes()
+
+    def clear(self):
+        """Drop all cached results and stop in-flight computations from storing theirs"""
+        self._entries.clear()
+        self._pending.clear()
+        self.generation += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result for key, computing it at most once at a time"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._notify(self.on_hit)
+            return self._entries[key]
+
+        pending = self._pending.get(key)
+        if pending is not None and not pending.done():
+            # Shielded so one waiter giving up does not cancel the others
+            self._notify(self.on_hit)
+            return await asyncio.shield(pending)
+
+        self._notify(self.on_miss)
+        generation = self.generation
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await compute()
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else RuntimeError("Prediction cancelled")
+            future.set_exception(error)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+        future.set_result(result)
+        if generation == self.generation:
+            self._store(key, result)
+        return result
+
+    def _store(self, key: Hashable, result: Any):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._notify(self.on_eviction)
+
+    @staticmethod
+    def _notify(callback: Optional[Callable[[], None]]):
+        if callback is not None:
+            callback()
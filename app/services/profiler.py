@@ -0,0 +1,156 @@
+"""
+On-demand CPU profiling of the live process
+Bounded sessions with a cooldown: a stack sampler over every thread, or cProfile on the event loop thread
+"""
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+# (file name, function) of leaf frames that mean a thread is blocked, not running
+IDLE_FRAMES = frozenset({
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+    ("connection.py", "_recv_bytes"),
+    ("connection.py", "wait"),
+})
+
+class ProfilerUnavailable(RuntimeError):
+    """A session is running or the cooldown has not expired; retry_after is in seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _frame_name(frame) -> Tuple[str, str]:
+    return os.path.basename(frame.f_code.co_filename), frame.f_code.co_name
+
+class StackSampler:
+    """
+    Samples the Python stack of every other thread every `interval` seconds.
+
+    Stacks are counted in collapsed form, root first, prefixed with the
+    thread name. Samples of threads blocked in a wait are skipped unless
+    include_idle is set.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if not self.include_idle and _frame_name(frame) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append("%s:%s" % _frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format, for flamegraph.pl or speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 30) -> List[Dict[str, object]]:
+        """Functions by samples on top of the stack (self) and anywhere in it (total)"""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return [
+            {"function": name, "self": own[name], "total": count}
+            for name, count in total.most_common(limit)
+        ]
+
+class Profiler:
+    """
+    Runs one profiling session at a time, at most max_seconds long and no
+    sooner than cooldown seconds after the previous one ended.
+
+    "sampling" sees every thread, including inference workers, at a fixed cost
+    per sample. "cprofile" traces every call, but only on the event loop thread
+    where the session is awaited; expect it to slow requests down while it runs.
+    """
+
+    def __init__(self, max_seconds: float = 30.0, cooldown: float = 300.0, sample_interval: float = 0.005,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_seconds = max_seconds
+        self.cooldown = cooldown
+        self.sample_interval = sample_interval
+        self.clock = clock
+        self._running = False
+        self._ended_at: Optional[float] = None
+
+    def _reserve(self):
+        if self._running:
+            raise ProfilerUnavailable("A profiling session is already running", self.max_seconds)
+        if self._ended_at is not None:
+            remaining = self._ended_at + self.cooldown - self.clock()
+            if remaining > 0:
+                raise ProfilerUnavailable(f"Profiler cooling down for {remaining:.0f}s", remaining)
+        self._running = True
+
+    def _release(self):
+        self._running = False
+        self._ended_at = self.clock()
+
+    async def sample(self, seconds: float, include_idle: bool = False) -> StackSampler:
+        """Sample every thread for `seconds` (capped at max_seconds)"""
+        self._reserve()
+        sampler = StackSampler(self.sample_interval, include_idle)
+        try:
+            sampler.start()
+            await asyncio.sleep(min(seconds, self.max_seconds))
+        finally:
+            sampler.stop()
+            self._release()
+        return sampler
+
+    async def cprofile(self, seconds: float, sort: str = "cumulative", limit: int = 50) -> str:
+        """Trace the event loop thread for `seconds`; returns the pstats report"""
+        self._reserve()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            await asyncio.sleep(min(seconds, self.max_seconds))
+        finally:
+            profile.disable()
+            self._release()
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
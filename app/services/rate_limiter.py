@@ -0,0 +1,142 @@
+"""
+Per-client rate limiting for the inference endpoints
+Token bucket stored as one float per client, enforced as ASGI middleware before any parsing
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, FrozenSet, Iterable, Optional, Tuple
+
+from app.utils.asgi import send_error
+
+class TokenBucketLimiter:
+    """
+    Token bucket per client key, in its GCRA form.
+
+    Each client's whole bucket is one float, its theoretical arrival time
+    (TAT): the moment its bucket would be full again. A request is allowed
+    when it would not push the TAT more than `burst` emission intervals past
+    now. Every check is O(1). A bucket whose TAT has passed is full, so
+    forgetting it changes nothing: entries are kept in last-update order and
+    expired ones are dropped from the front, plus the oldest once
+    max_clients is reached.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        burst: Optional[int] = None,
+        max_clients: int = 100000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if requests_per_minute < 1:
+            raise ValueError(f"requests_per_minute must be at least 1, got {requests_per_minute}")
+        self.interval = 60.0 / requests_per_minute
+        self.burst = max(burst or requests_per_minute, 1)
+        self.max_clients = max(max_clients, 1)
+        self.clock = clock
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def acquire(self, key: str) -> Tuple[bool, float]:
+        """Take one token for key; returns (allowed, seconds until a token is available)"""
+        now = self.clock()
+        self._evict(now)
+
+        tat = max(self._tat.get(key, now), now) + self.interval
+        excess = tat - now - self.burst * self.interval
+        if excess > 1e-9:
+            return False, excess
+
+        self._tat[key] = tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.max_clients:
+            self._tat.popitem(last=False)
+        return True, 0.0
+
+    def reset(self):
+        """Forget every client"""
+        self._tat.clear()
+
+    def _evict(self, now: float):
+        # Amortized O(1): each entry is removed at most once
+        while self._tat:
+            key, tat = next(iter(self._tat.items()))
+            if tat > now:
+                break
+            del self._tat[key]
+
+def parse_api_keys(value: str) -> FrozenSet[str]:
+    """API keys from a comma-separated setting such as "key1,key2" """
+    return frozenset(key.strip() for key in value.split(",") if key.strip())
+
+def client_key(scope, api_keys: FrozenSet[str] = frozenset(), api_key_header: bytes = b"x-api-key",
+               trust_forwarded: bool = False) -> Tuple[str, str]:
+    """
+    (key type, key) for an HTTP or WebSocket scope: "api_key" for a key in
+    api_keys, otherwise "ip". Any other key is ignored, so clients cannot get
+    a fresh bucket per request by sending made-up keys.
+    """
+    forwarded = None
+    for name, value in scope.get("headers", ()):
+        if name == api_key_header:
+            key = value.decode("latin-1")
+            if key in api_keys:
+                return "api_key", "key:" + key
+        elif name == b"x-forwarded-for" and trust_forwarded:
+            forwarded = value.decode("latin-1").split(",")[0].strip()
+    if forwarded:
+        return "ip", forwarded
+    client = scope.get("client")
+    return "ip", client[0] if client else "unknown"
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware returning 429 with Retry-After for over-limit clients.
+
+    Only HTTP requests whose path is in `paths` are limited. Clients are keyed
+    by the API key header when it holds one of `api_keys`, otherwise by IP
+    address (the first X-Forwarded-For hop when trust_forwarded is set). The check runs before
+    the body is read, so rejected requests never reach validation or inference.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: TokenBucketLimiter,
+        paths: Iterable[str],
+        api_keys: Iterable[str] = (),
+        api_key_header: str = "x-api-key",
+        trust_forwarded: bool = False,
+        on_reject: Optional[Callable[[str], None]] = None,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.paths = frozenset(paths)
+        self.api_keys = frozenset(api_keys)
+        self.api_key_header = api_key_header.lower().encode()
+        self.trust_forwarded = trust_forwarded
+        self.on_reject = on_reject
+
+    def client_key(self, scope) -> Tuple[str, str]:
+        """(key type, key) for the request: "api_key" or "ip" """
+        return client_key(scope, self.api_keys, self.api_key_header, self.trust_forwarded)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        key_type, key = self.client_key(scope)
+        allowed, retry_after = self.limiter.acquire(key)
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        if self.on_reject is not None:
+            self.on_reject(key_type)
+        await send_error(send, 429, "Rate limit exceeded",
+                         [(b"retry-after", str(max(math.ceil(retry_after), 1)).encode())])
@@ -0,0 +1,91 @@
+"""
+Event-loop lag and garbage collection pause monitoring
+Explains latency spikes that request volume does not: blocked loops and stop-the-world collections
+"""
+
+import asyncio
+import gc
+import logging
+import time
+from collections import deque
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class RuntimeMonitor:
+    """
+    Background task measuring event-loop scheduling lag, plus a gc.callbacks hook timing collections.
+
+    Every interval the task sleeps for `interval` and reports how much later
+    than that it woke up: the time the loop spent running something else
+    without yielding. The GC hook only appends (generation, seconds, collected)
+    to a deque, since a collection can start inside any code, including code
+    holding a metrics lock; the task reports the pauses from the event loop.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        on_loop_lag: Optional[Callable[[float], None]] = None,
+        on_gc_pause: Optional[Callable[[int, float, int], None]] = None,
+    ):
+        self.interval = interval
+        self.on_loop_lag = on_loop_lag
+        self.on_gc_pause = on_gc_pause
+        self.max_lag = 0.0
+        self._gc_started = 0.0
+        self._gc_pauses: deque = deque(maxlen=10000)
+        self._task: Optional[asyncio.Task] = None
+
+    def _gc_callback(self, phase: str, info: dict):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        else:
+            self._gc_pauses.append((info["generation"], time.perf_counter() - self._gc_started, info["collected"]))
+
+    def start(self):
+        """Install the GC hook and start the lag task on the running loop"""
+        if self._gc_callback not in gc.callbacks:
+            gc.callbacks.append(self._gc_callback)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.report_gc_pauses()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - scheduled - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, lag)
+            if self.on_loop_lag is not None:
+                self.on_loop_lag(lag)
+            self.report_gc_pauses()
+
+    def report_gc_pauses(self):
+        """Pass the collections timed since the last call to on_gc_pause"""
+        pauses = self._gc_pauses
+        while pauses:
+            generation, seconds, collected = pauses.popleft()
+            if self.on_gc_pause is not None:
+                self.on_gc_pause(generation, seconds, collected)
+
+def freeze_long_lived() -> int:
+    """
+    Collect once, then move every object alive now (the loaded model, services,
+    routes) to the permanent generation so later collections skip them.
+    Returns the number of frozen objects.
+    """
+    gc.collect()
+    gc.freeze()
+    frozen = gc.get_freeze_count()
+    logger.info("Froze %d long-lived objects", frozen)
+    return frozen
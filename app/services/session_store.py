@@ -0,0 +1,140 @@
+"""
+Per-session store of the last normalized pose and its prediction
+Lets /maze-control skip the model while a player's hand has not moved
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+import numpy as np
+
+class SessionStore:
+    """
+    Last feature vector and result per session, TTL-evicted.
+
+    Features live in one growable float32 array (one row per session) so the
+    store stays compact and its memory use is known exactly. Sessions are
+    kept in least-recently-seen order; idle ones are dropped after
+    ttl_seconds, and the oldest is dropped when max_sessions is reached.
+
+    A frame within `epsilon` (Euclidean distance between normalized feature
+    vectors) of the stored one reuses the stored result. The stored vector is
+    not replaced on a skip, so slow drift still triggers a new prediction.
+
+    clear() bumps `generation`; a caller that read the generation before
+    predicting passes it to store() so a prediction that straddled the
+    clear is dropped instead of stored.
+    """
+
+    def __init__(
+        self,
+        epsilon: float = 0.05,
+        ttl_seconds: float = 30.0,
+        max_sessions: int = 10000,
+        n_features: int = 42,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_sessions < 1:
+            raise ValueError(f"max_sessions must be at least 1, got {max_sessions}")
+        self.epsilon = epsilon
+        self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+
+        capacity = min(64, max_sessions)
+        self._slots: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._features = np.zeros((capacity, n_features), dtype=np.float32)
+        self._seen = np.zeros(capacity, dtype=np.float64)
+        self._results: List[Any] = [None] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+
+        self.generation = 0
+        self.lookups = 0
+        self.skips = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def skip_rate(self) -> float:
+        """Fraction of lookups answered from the store"""
+        return self.skips / self.lookups if self.lookups else 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the feature, timestamp and result-reference arrays"""
+        return self._features.nbytes + self._seen.nbytes + 8 * len(self._results)
+
+    def lookup(self, key: Hashable, features: np.ndarray) -> Optional[Any]:
+        """Stored result for key if features are within epsilon of the stored ones, else None"""
+        now = self.clock()
+        self._expire(now)
+        self.lookups += 1
+
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        delta = np.asarray(features, dtype=np.float32) - self._features[slot]
+        if float(np.dot(delta, delta)) > self.epsilon * self.epsilon:
+            return None
+
+        self._seen[slot] = now
+        self._slots.move_to_end(key)
+        self.skips += 1
+        return self._results[slot]
+
+    def store(self, key: Hashable, features: np.ndarray, result: Any,
+              generation: Optional[int] = None):
+        """
+        Remember the features and result of the latest prediction for key.
+        Nothing is stored when generation is given and the store has been
+        cleared since.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        now = self.clock()
+        self._expire(now)
+
+        slot = self._slots.get(key)
+        if slot is None:
+            if len(self._slots) >= self.max_sessions:
+                self._release(self._slots.popitem(last=False)[1])
+            slot = self._allocate()
+            self._slots[key] = slot
+
+        self._features[slot] = features
+        self._results[slot] = result
+        self._seen[slot] = now
+        self._slots.move_to_end(key)
+
+    def clear(self):
+        """Forget every session, e.g. once their stored results came from a replaced model"""
+        for slot in self._slots.values():
+            self._release(slot)
+        self._slots.clear()
+        self.generation += 1
+
+    def _expire(self, now: float):
+        cutoff = now - self.ttl
+        while self._slots:
+            key, slot = next(iter(self._slots.items()))
+            if self._seen[slot] >= cutoff:
+                break
+            del self._slots[key]
+            self._release(slot)
+
+    def _release(self, slot: int):
+        self._results[slot] = None
+        self._free.append(slot)
+
+    def _allocate(self) -> int:
+        if not self._free:
+            # Grow by doubling, up to max_sessions rows
+            old = len(self._results)
+            new = min(old * 2, self.max_sessions)
+            self._features = np.concatenate([self._features, np.zeros_like(self._features[:new - old])])
+            self._seen = np.concatenate([self._seen, np.zeros(new - old)])
+            self._results.extend([None] * (new - old))
+            self._free.extend(range(new - 1, old - 1, -1))
+        return self._free.pop()
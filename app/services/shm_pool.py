@@ -0,0 +1,443 @@
+"""
+Inference worker processes fed through a shared-memory ring buffer
+Frames and results cross the process boundary as raw arrays; only 4-byte job ids go through pipes
+"""
+
+import asyncio
+import atexit
+import logging
+import multiprocessing
+import struct
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.gesture_service import DECISION_MODES, GestureService
+
+logger = logging.getLogger(__name__)
+
+FRAME_VALUES = 63
+JOB_ID = struct.Struct('<i')
+STOP = -1   # to a worker: exit
+READY = -2  # from a worker: model loaded
+
+# meta columns: frame count, decision mode index, status (0 ok, 1 failed), worker the job was sent to
+META_COUNT, META_MODE, META_STATUS, META_WORKER = range(4)
+
+class RingLayout:
+    """
+    Array views over one shared-memory block.
+
+    The ring holds n_jobs job slots of rows_per_job frames each:
+      frames       float32 (n_jobs, rows_per_job, 63)  written by the API process
+      labels       int32   (n_jobs, rows_per_job)      written by a worker
+      confidences  float64 (n_jobs, rows_per_job)      written by a worker
+      started      float64 (n_jobs,)                   time.monotonic() when a worker picked the job up
+      meta         int32   (n_jobs, 4)                 count, mode, status, worker
+    """
+
+    def __init__(self, n_jobs: int, rows_per_job: int):
+        self.n_jobs = n_jobs
+        self.rows_per_job = rows_per_job
+        self.fields = [
+            ("frames", np.float32, (n_jobs, rows_per_job, FRAME_VALUES)),
+            ("labels", np.int32, (n_jobs, rows_per_job)),
+            ("confidences", np.float64, (n_jobs, rows_per_job)),
+            ("started", np.float64, (n_jobs,)),
+            ("meta", np.int32, (n_jobs, 4)),
+        ]
+        self.offsets = {}
+        offset = 0
+        for name, dtype, shape in self.fields:
+            offset = (offset + 7) // 8 * 8
+            self.offsets[name] = offset
+            offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self.size = offset
+
+    def views(self, buffer) -> Dict[str, np.ndarray]:
+        return {
+            name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=self.offsets[name])
+            for name, dtype, shape in self.fields
+        }
+
+def _ring_worker(shm_name: str, n_jobs: int, rows_per_job: int, service_args: Tuple, tasks, done):
+    """Worker process: take job ids from its own pipe, score the frames in place, report the job id back"""
+    service = GestureService(*service_args)
+    if service.engine is None:
+        raise RuntimeError("Ring inference workers need the compiled SVM engine")
+
+    # Spawned children share the API process's resource tracker, which
+    # unlinks the block if the API process dies without shutting the pool down
+    shm = SharedMemory(name=shm_name)
+    ring = RingLayout(n_jobs, rows_per_job).views(shm.buf)
+    features = np.empty((rows_per_job, 42), np.float32)
+    done.send_bytes(JOB_ID.pack(READY))
+
+    try:
+        while True:
+            try:
+                job = JOB_ID.unpack(tasks.recv_bytes())[0]
+            except EOFError:
+                break  # the API process is gone
+            if job == STOP:
+                break
+
+            ring["started"][job] = time.monotonic()
+            count, mode = ring["meta"][job, META_COUNT], ring["meta"][job, META_MODE]
+            try:
+                batch = service.preprocess_batch(ring["frames"][job, :count], out=features[:count])
+                labels, confidences = service.engine_predict(batch, DECISION_MODES[mode])
+                ring["labels"][job, :count] = labels
+                ring["confidences"][job, :count] = confidences
+                ring["meta"][job, META_STATUS] = 0
+            except Exception as e:
+                logger.error(f"Ring inference job failed: {e}")
+                ring["meta"][job, META_STATUS] = 1
+
+            done.send_bytes(JOB_ID.pack(job))
+    finally:
+        del ring
+        shm.close()
+
+class _RingWorker:
+    """One inference process and the API process's ends of its two pipes"""
+
+    def __init__(self, index: int, process, tasks, done):
+        self.index = index
+        self.process = process
+        self.tasks = tasks
+        self.done = done
+        self.ready = False  # has loaded the model
+        self.alive = True   # its exit has not been handled; jobs only go to live workers
+        self.jobs = 0       # jobs sent to it and not reported back yet
+
+class RingInferencePool:
+    """
+    Pool of inference processes that read frames from, and write results to,
+    a multiprocessing.shared_memory ring buffer.
+
+    The API process copies a batch into a free job slot and sends the slot's
+    id over the pipe of the least busy worker, recording that worker in the
+    slot's meta row. The worker runs GestureService's engine on the frames in
+    place, writes labels and confidences next to them and sends the id back.
+    A supervisor thread in the API process turns completed ids into results
+    for the waiting coroutines and watches each worker's process sentinel:
+    when a worker dies, the jobs it held fail and it is replaced. A worker
+    that dies before it has loaded the model is not restarted, so a broken
+    model or configuration does not turn into a crash loop. No lock is shared
+    with the workers, so a killed worker cannot wedge the others.
+
+    Workers are spawned (not forked) and load the model themselves, from the
+    memory-mapped artifact when configured. The pool belongs to one API
+    process: under gunicorn, WEB_CONCURRENCY API processes each run their
+    own `workers` inference processes (the thread budget counts them all).
+    """
+
+    def __init__(self, gesture_service: GestureService, workers: int = 2, n_jobs: int = 4,
+                 rows_per_job: int = 256):
+        if gesture_service.engine is None:
+            raise ValueError("The shared-memory pool requires the compiled SVM engine")
+        self.gesture_service = gesture_service
+        self.engine = gesture_service.engine
+        self.workers = max(workers, 1)
+        self.layout = RingLayout(max(n_jobs, 1), max(rows_per_job, 1))
+        self.restarts = 0  # workers replaced after dying
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._service_args: Optional[Tuple] = None
+        self._shm: Optional[SharedMemory] = None
+        self._ring: Optional[Dict[str, np.ndarray]] = None
+        self._workers: List[_RingWorker] = []
+        self._supervisor: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self._lock = threading.Lock()
+        self._free = list(range(self.layout.n_jobs - 1, -1, -1))
+        self._slot_waiters: deque = deque()
+        self._pending: Dict[int, Tuple[asyncio.Future, asyncio.AbstractEventLoop]] = {}
+        self._active = 0  # predict_batch calls that have not returned
+
+    @property
+    def started(self) -> bool:
+        return self._shm is not None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a batch is still being scored, or waiting for a job slot"""
+        return self._active > 0
+
+    def start(self):
+        """Create the ring and spawn the workers"""
+        if self.started:
+            return
+        service = self.gesture_service
+        self._service_args = (service.model_path, service.encoder_path, True,
+                              service.dag_min_margin, service.artifact_dir)
+        self._shm = SharedMemory(create=True, size=self.layout.size)
+        self._ring = self.layout.views(self._shm.buf)
+        self._stopping = False
+        try:
+            for index in range(self.workers):
+                self._workers.append(self._spawn(index))
+        except BaseException:
+            self.shutdown()
+            raise
+        # Free the block even if the app exits without shutting the pool down
+        atexit.register(self.shutdown)
+
+        self._supervisor = threading.Thread(target=self._supervise, name="ring-results", daemon=True)
+        self._supervisor.start()
+        logger.info(f"Started {self.workers} ring inference workers "
+                    f"({self.layout.n_jobs} jobs x {self.layout.rows_per_job} frames, {self.layout.size} bytes)")
+
+    def _spawn(self, index: int) -> _RingWorker:
+        task_reader, tasks = self._ctx.Pipe(duplex=False)
+        done, done_writer = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_ring_worker,
+            args=(self._shm.name, self.layout.n_jobs, self.layout.rows_per_job, self._service_args,
+                  task_reader, done_writer),
+            name=f"ring-inference-{index}",
+            daemon=True,
+        )
+        process.start()
+        # Only the worker keeps these ends, so each side sees EOF when the other exits
+        task_reader.close()
+        done_writer.close()
+        return _RingWorker(index, process, tasks, done)
+
+    async def predict_batch(self, frames: Sequence[Sequence[float]],
+                            decision_mode: str = "full") -> Tuple[float, List[Dict[str, Any]]]:
+        """Score frames on the worker pool; returns (time a worker started, results)"""
+        self.start()
+        frames = np.asarray(frames, dtype=np.float32)
+        if frames.ndim != 2 or frames.shape[1] != FRAME_VALUES:
+            raise ValueError(f"Expected frames of {FRAME_VALUES} landmarks, got shape {frames.shape}")
+
+        rows = self.layout.rows_per_job
+        self._active += 1
+        try:
+            chunks = await asyncio.gather(*(
+                self._run_job(frames[i:i + rows], decision_mode) for i in range(0, len(frames), rows)
+            ))
+        finally:
+            self._active -= 1
+        started = min(chunk_started for chunk_started, _ in chunks) if chunks else time.monotonic()
+        return started, [result for _, results in chunks for result in results]
+
+    async def _run_job(self, frames: np.ndarray, decision_mode: str) -> Tuple[float, List[Dict[str, Any]]]:
+        job = await self._acquire_slot()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        ring = self._ring
+        ring["frames"][job, :len(frames)] = frames
+        ring["meta"][job, META_COUNT] = len(frames)
+        ring["meta"][job, META_MODE] = DECISION_MODES.index(decision_mode)
+        # Registered under the lock the supervisor holds while it collects a dead worker's jobs
+        with self._lock:
+            worker = min((w for w in self._workers if w.alive), key=lambda w: w.jobs, default=None)
+            if worker is not None:
+                worker.jobs += 1
+                ring["meta"][job, META_WORKER] = worker.index
+                self._pending[job] = (future, loop)
+        if worker is None:
+            self._release_slot(job)
+            raise RuntimeError("Ring inference workers have exited")
+
+        try:
+            worker.tasks.send_bytes(JOB_ID.pack(job))
+        except OSError:
+            pass  # the worker has died; the supervisor fails the job when it handles the exit
+        # The slot is released by the supervisor once the worker is done with it,
+        # even if this caller has given up in the meantime
+        return await asyncio.shield(future)
+
+    async def _acquire_slot(self) -> int:
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            waiter = asyncio.get_running_loop().create_future()
+            self._slot_waiters.append((waiter, asyncio.get_running_loop()))
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            # Cancelled after _hand_over gave us a slot but before we resumed
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot(waiter.result())
+            raise
+
+    def _release_slot(self, job: int):
+        with self._lock:
+            while self._slot_waiters:
+                waiter, loop = self._slot_waiters.popleft()
+                if not waiter.done() and not loop.is_closed():
+                    loop.call_soon_threadsafe(_hand_over, waiter, job, self)
+                    return
+            self._free.append(job)
+
+    def _supervise(self):
+        """Supervisor thread: collect reported job ids and handle workers that exit"""
+        while True:
+            with self._lock:
+                workers = [worker for worker in self._workers if worker.alive]
+            if not workers:
+                break
+            sources = {}
+            for worker in workers:
+                sources[worker.process.sentinel] = worker
+                if not worker.done.closed:
+                    sources[worker.done] = worker
+
+            for source in wait(list(sources)):
+                worker = sources[source]
+                if source is worker.done:
+                    if not worker.done.closed:
+                        self._read_reports(worker)
+                elif worker.alive:
+                    self._worker_exited(worker)
+
+    def _read_reports(self, worker: _RingWorker):
+        """Handle every id the worker has sent so far"""
+        try:
+            while worker.done.poll():
+                job = JOB_ID.unpack(worker.done.recv_bytes())[0]
+                if job == READY:
+                    worker.ready = True
+                else:
+                    self._complete(worker, job)
+        except (EOFError, OSError):
+            worker.done.close()
+
+    def _complete(self, worker: _RingWorker, job: int):
+        ring = self._ring
+        count = int(ring["meta"][job, META_COUNT])
+        if ring["meta"][job, META_STATUS] == 0:
+            outcome = (float(ring["started"][job]),
+                       self.engine.to_results(ring["labels"][job, :count].copy(),
+                                              ring["confidences"][job, :count].copy()))
+            error = None
+        else:
+            outcome, error = None, RuntimeError("Ring inference worker failed on this batch")
+
+        with self._lock:
+            worker.jobs -= 1
+            future, loop = self._pending.pop(job)
+        self._release_slot(job)
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(_settle, future, outcome, error)
+
+    def _worker_exited(self, worker: _RingWorker):
+        """Fail the jobs a dead worker held and start a replacement"""
+        if not worker.done.closed:
+            self._read_reports(worker)  # results it sent before exiting
+        worker.process.join()
+        code = worker.process.exitcode
+        restart = worker.ready
+        with self._lock:
+            worker.alive = False
+            lost = [(job, self._pending.pop(job)) for job in list(self._pending)
+                    if self._ring["meta"][job, META_WORKER] == worker.index]
+            stopping = self._stopping
+            if restart and not stopping:
+                # Spawned under the lock, so no job finds the pool without a live worker
+                try:
+                    self._workers[worker.index] = self._spawn(worker.index)
+                    self.restarts += 1
+                except Exception as e:
+                    logger.error(f"Could not restart ring inference worker {worker.index}: {e}")
+        worker.tasks.close()
+
+        error = RuntimeError("Ring inference pool stopped" if stopping else
+                             f"Ring inference worker {worker.index} exited (code {code}) while scoring this batch")
+        for job, (future, loop) in lost:
+            self._release_slot(job)
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_settle, future, None, error)
+        if stopping:
+            return
+        if restart:
+            logger.error(f"Ring inference worker {worker.index} exited with code {code}; "
+                         f"failed {len(lost)} jobs, restarted it")
+        else:
+            logger.error(f"Ring inference worker {worker.index} exited with code {code} "
+                         f"before loading the model; not restarting it")
+
+    def wait_ready(self, timeout: float = 60.0):
+        """Block until every worker has loaded the model; RuntimeError if one exits first or time runs out"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                workers = list(self._workers)
+            if any(not worker.alive and not worker.ready for worker in workers):
+                raise RuntimeError("A ring inference worker exited before loading the model")
+            if all(worker.ready for worker in workers):
+                return
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Ring inference workers did not load the model within {timeout}s")
+            time.sleep(0.01)
+
+    async def drain(self, timeout: float = 30.0):
+        """Let the batches already handed to the pool finish (up to timeout), then shut it down"""
+        deadline = time.monotonic() + timeout
+        while self.busy and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await asyncio.to_thread(self.shutdown)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the workers, fail outstanding jobs and free the shared memory"""
+        if not self.started:
+            return
+        atexit.unregister(self.shutdown)
+        with self._lock:
+            self._stopping = True
+            workers = list(self._workers)
+        for worker in workers:
+            try:
+                worker.tasks.send_bytes(JOB_ID.pack(STOP))
+            except OSError:
+                pass
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join(timeout)
+        if self._supervisor is not None:
+            self._supervisor.join(timeout)
+            self._supervisor = None
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, loop in pending.values():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_settle, future, None, RuntimeError("Ring inference pool stopped"))
+        for worker in workers:
+            worker.tasks.close()
+            worker.done.close()
+
+        self._ring = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        self._workers = []
+        self._free = list(range(self.layout.n_jobs - 1, -1, -1))
+
+def _settle(future: asyncio.Future, outcome: Any, error: Optional[Exception]):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(outcome)
+
+def _hand_over(waiter: asyncio.Future, job: int, pool: RingInferencePool):
+    """Give a freed slot to a waiting coroutine, or back to the pool if it gave up"""
+    if waiter.done():
+        pool._release_slot(job)
+    else:
+        waiter.set_result(job)
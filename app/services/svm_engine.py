@@ -0,0 +1,370 @@
+"""
+Compiled NumPy inference engine for the production RBF-SVM pipeline
+Evaluates StandardScaler + SVC(kernel='rbf', probability=True) in one kernel pass
+"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# libsvm clips pairwise Platt probabilities to this range before coupling
+MIN_PAIRWISE_PROB = 1e-7
+
+# Up to this many rows the decision DAG walks each row on Python floats:
+# one lockstep step of NumPy calls costs more than a whole scalar walk
+SCALAR_DAG_ROWS = 16
+
+class SVMEngine:
+    """
+    Single-pass replacement for sklearn's SVC predict + predict_proba.
+
+    All parameters are extracted once at load time. Per batch the RBF kernel
+    against every support vector is one matrix product, the 1-vs-1 decision
+    values are a second one, and both the voted label (same as SVC.predict)
+    and the Platt-coupled probabilities (same as SVC.predict_proba) are
+    derived from those decision values.
+    """
+
+    def __init__(
+        self,
+        support_vectors: np.ndarray,
+        dual_coef: np.ndarray,
+        intercept: np.ndarray,
+        n_support: np.ndarray,
+        gamma: float,
+        prob_a: np.ndarray,
+        prob_b: np.ndarray,
+        class_numbers: Sequence[int],
+        class_names: Sequence[str],
+        class_actions: Sequence[str],
+        mean: Optional[np.ndarray] = None,
+        scale: Optional[np.ndarray] = None,
+        pair_coef: Optional[np.ndarray] = None,
+        sv_sq_norms: Optional[np.ndarray] = None,
+    ):
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=np.float64)
+        self.gamma = float(gamma)
+        self.n_classes = len(n_support)
+        self.n_features = self.support_vectors.shape[1]
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+
+        # Index tables: class index -> prediction number / gesture name / maze action
+        self.class_numbers = [int(c) for c in class_numbers]
+        self.class_names = [str(c) for c in class_names]
+        self.class_actions = list(class_actions)
+
+        # Pair p = (i, j), i < j, in libsvm order
+        k = self.n_classes
+        self.pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+        self.pair_i = np.array([i for i, _ in self.pairs], dtype=np.intp)
+        self.pair_j = np.array([j for _, j in self.pairs], dtype=np.intp)
+        self.pair_index = np.full((k, k), -1, dtype=np.intp)
+        self.pair_index[self.pair_i, self.pair_j] = np.arange(len(self.pairs))
+
+        self.sv_starts = np.concatenate([[0], np.cumsum(n_support)]).astype(np.intp)
+        if sv_sq_norms is None:
+            sv_sq_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        self.sv_sq_norms = sv_sq_norms
+
+        # Dense (n_SV, n_pairs) coefficient matrix: column p holds the dual
+        # coefficients of the support vectors of classes i and j for that pair
+        # (precomputed arrays may be passed in, e.g. memory-mapped from a model artifact)
+        self.dual_coef = dual_coef = np.asarray(dual_coef, dtype=np.float64)
+        if pair_coef is None:
+            pair_coef = np.zeros((len(self.support_vectors), len(self.pairs)))
+            for p, (i, j) in enumerate(self.pairs):
+                si = slice(self.sv_starts[i], self.sv_starts[i + 1])
+                sj = slice(self.sv_starts[j], self.sv_starts[j + 1])
+                pair_coef[si, p] = dual_coef[j - 1, si]
+                pair_coef[sj, p] = dual_coef[i, sj]
+        self.pair_coef = pair_coef
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.prob_a = np.asarray(prob_a, dtype=np.float64)
+        self.prob_b = np.asarray(prob_b, dtype=np.float64)
+
+        # Per class c, the coefficients of c's support vectors against each of
+        # the other classes (dual_coef's layout: opponent o is row o - 1 when
+        # o > c, else row o), and where pair (i, j) finds its two halves in
+        # the stacked (N, k * (k - 1)) product of the kernel with them
+        self._class_sv = [slice(self.sv_starts[c], self.sv_starts[c + 1]) for c in range(k)]
+        self._class_coef = [np.ascontiguousarray(dual_coef[:, sv].T) for sv in self._class_sv]
+        self._half_i = self.pair_i * (k - 1) + self.pair_j - 1
+        self._half_j = self.pair_j * (k - 1) + self.pair_i
+        self._pair_index_rows = self.pair_index.tolist()
+        self._prob_ab = list(zip(self.prob_a.tolist(), self.prob_b.tolist()))
+
+        # Vote matrices: a positive decision votes for i, otherwise for j
+        self.vote_i = np.zeros((len(self.pairs), k))
+        self.vote_j = np.zeros((len(self.pairs), k))
+        self.vote_i[np.arange(len(self.pairs)), self.pair_i] = 1.0
+        self.vote_j[np.arange(len(self.pairs)), self.pair_j] = 1.0
+
+    @staticmethod
+    def supports(model: Any) -> bool:
+        """Whether a fitted sklearn estimator can be compiled into an SVMEngine"""
+        return SVMEngine._split_pipeline(model) is not None
+
+    @staticmethod
+    def _split_pipeline(model: Any) -> Optional[Tuple[Any, Any]]:
+        """Return (scaler or None, svc) for a supported model, otherwise None"""
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.svm import SVC
+
+        scaler = None
+        svc = model
+        if isinstance(model, Pipeline):
+            steps = [step for _, step in model.steps if step is not None and step != 'passthrough']
+            if len(steps) == 2 and isinstance(steps[0], StandardScaler):
+                scaler = steps[0]
+            elif len(steps) != 1:
+                return None
+            svc = steps[-1]
+
+        if not isinstance(svc, SVC) or svc.kernel != 'rbf' or not svc.probability:
+            return None
+        if getattr(svc, '_sparse', False) or getattr(svc, 'break_ties', False):
+            return None
+        return scaler, svc
+
+    @classmethod
+    def from_sklearn(cls, model: Any, label_encoder: Any, gesture_to_action: Dict[str, str]) -> "SVMEngine":
+        """Extract the engine parameters from a fitted sklearn pipeline"""
+        split = cls._split_pipeline(model)
+        if split is None:
+            raise ValueError(f"Unsupported model for SVMEngine: {type(model).__name__}")
+        scaler, svc = split
+
+        # The private attributes hold libsvm's raw signs (the public ones are
+        # flipped for binary problems)
+        dual_coef = getattr(svc, '_dual_coef_', svc.dual_coef_)
+        intercept = getattr(svc, '_intercept_', svc.intercept_)
+        class_names = label_encoder.inverse_transform(svc.classes_)
+
+        return cls(
+            support_vectors=svc.support_vectors_,
+            dual_coef=dual_coef,
+            intercept=intercept,
+            n_support=svc._n_support,
+            gamma=svc._gamma,
+            prob_a=svc.probA_,
+            prob_b=svc.probB_,
+            class_numbers=svc.classes_,
+            class_names=class_names,
+            class_actions=[gesture_to_action.get(name, 'WAIT') for name in class_names],
+            mean=None if scaler is None or not scaler.with_mean else scaler.mean_,
+            scale=None if scaler is None or not scaler.with_std else scaler.scale_,
+        )
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        """Apply the pipeline's StandardScaler, returning float64 for the kernel"""
+        # Scale in the input's float dtype like StandardScaler does, so float32
+        # features round exactly as they do in the sklearn pipeline
+        x = np.array(features, ndmin=2)
+        if x.dtype not in (np.float32, np.float64):
+            x = x.astype(np.float64)
+        if x.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {x.shape[1]}")
+        if self.mean is not None:
+            x -= self.mean
+        if self.scale is not None:
+            x /= self.scale
+        return x.astype(np.float64, copy=False)
+
+    def kernel(self, x: np.ndarray) -> np.ndarray:
+        """RBF kernel of scaled inputs against all support vectors, (N, n_SV)"""
+        x_sq_norms = np.einsum('ij,ij->i', x, x)
+        k = x @ self.support_vectors.T
+        k *= 2.0
+        k -= x_sq_norms[:, None]
+        k -= self.sv_sq_norms[None, :]
+        np.minimum(k, 0.0, out=k)  # squared distances are never negative
+        k *= self.gamma
+        return np.exp(k, out=k)
+
+    def decision_values(self, features: np.ndarray) -> np.ndarray:
+        """One-vs-one decision values, (N, n_pairs), same as decision_function_shape='ovo'"""
+        return self.kernel(self.transform(features)) @ self.pair_coef + self.intercept
+
+    def vote(self, decision: np.ndarray) -> np.ndarray:
+        """Class index per row by 1-vs-1 voting; ties go to the lower index like libsvm"""
+        positive = decision > 0
+        votes = positive @ self.vote_i + (~positive) @ self.vote_j
+        return votes.argmax(axis=1)
+
+    @staticmethod
+    def _platt(decision: np.ndarray, prob_a: np.ndarray, prob_b: np.ndarray) -> np.ndarray:
+        f = decision * prob_a + prob_b
+        e = np.exp(-np.abs(f))
+        prob = np.where(f >= 0, e / (1.0 + e), 1.0 / (1.0 + e))
+        return np.clip(prob, MIN_PAIRWISE_PROB, 1.0 - MIN_PAIRWISE_PROB)
+
+    def pairwise_probabilities(self, decision: np.ndarray) -> np.ndarray:
+        """Platt-scaled probability that class i beats class j for every pair"""
+        return self._platt(decision, self.prob_a, self.prob_b)
+
+    def couple(self, pairwise: np.ndarray) -> np.ndarray:
+        """
+        Multi-class probabilities from pairwise ones (Wu, Lin & Weng 2004),
+        the same fixed-point iteration libsvm runs, vectorized over the batch.
+        """
+        n, k = len(pairwise), self.n_classes
+        r = np.zeros((n, k, k))
+        r[:, self.pair_i, self.pair_j] = pairwise
+        r[:, self.pair_j, self.pair_i] = 1.0 - pairwise
+
+        q = -r.transpose(0, 2, 1) * r
+        diag = np.arange(k)
+        q[:, diag, diag] = np.einsum('nji,nji->ni', r, r)
+        q_diag = q[:, diag, diag]
+
+        p = np.full((n, k), 1.0 / k)
+        eps = 0.005 / k
+        active = np.ones(n, dtype=bool)
+
+        for _ in range(max(100, k)):
+            qp = np.einsum('ntj,nj->nt', q, p)
+            pqp = np.einsum('nt,nt->n', p, qp)
+            # Rows stop updating once converged, exactly like the per-row loop
+            active &= np.abs(qp - pqp[:, None]).max(axis=1) >= eps
+            if not active.any():
+                break
+            for t in range(k):
+                diff = np.where(active, (pqp - qp[:, t]) / q_diag[:, t], 0.0)
+                p[:, t] += diff
+                scale = 1.0 + diff
+                pqp = (pqp + diff * (diff * q_diag[:, t] + 2.0 * qp[:, t])) / (scale * scale)
+                qp += diff[:, None] * q[:, t, :]
+                qp /= scale[:, None]
+                p /= scale[:, None]
+
+        return p
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities, same as SVC.predict_proba"""
+        return self.couple(self.pairwise_probabilities(self.decision_values(features)))
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Voted class index and max probability per row from a single kernel pass"""
+        return self._predict_decision(self.decision_values(features))
+
+    def _predict_decision(self, decision: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        labels = self.vote(decision)
+        proba = self.couple(self.pairwise_probabilities(decision))
+        return labels, proba.max(axis=1)
+
+    def class_decision_values(self, kernel: np.ndarray) -> np.ndarray:
+        """
+        Same (N, n_pairs) decision values as decision_values(), from a precomputed
+        kernel. Each class's support vectors are multiplied only with their own
+        n_classes - 1 coefficient columns, instead of the dense pair_coef matrix
+        where most entries of every column are zero: n_classes - 1 products per
+        support vector instead of n_pairs. Summation order differs, so values
+        can differ from decision_values() in the last bits.
+        """
+        halves = np.empty((len(kernel), self.n_classes * (self.n_classes - 1)))
+        width = self.n_classes - 1
+        for c, (sv, coef) in enumerate(zip(self._class_sv, self._class_coef)):
+            np.matmul(kernel[:, sv], coef, out=halves[:, c * width:(c + 1) * width])
+        return halves[:, self._half_i] + halves[:, self._half_j] + self.intercept
+
+    def dag_walk(self, decision: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Decision-DAG over (N, n_pairs) decision values, all rows in lockstep.
+
+        Candidates start as every class; each step compares the first and the
+        last remaining candidate of every row and drops the loser, so every
+        row takes n_classes - 1 steps. Returns the winning class index, its
+        weakest pairwise Platt probability (the DAG confidence) and its
+        weakest winning |decision| (the margin).
+        """
+        n = len(decision)
+        if n <= SCALAR_DAG_ROWS:
+            return self._dag_walk_rows(decision)
+        rows = np.arange(n)
+        lo = np.zeros(n, dtype=np.intp)
+        hi = np.full(n, self.n_classes - 1, dtype=np.intp)
+        # Weakest win so far of the current first / last candidate: the smallest
+        # |decision| and the largest Platt logit against it (Platt probabilities
+        # fall as the logit rises, so they are computed once, at the end)
+        lo_margin, hi_margin = np.full(n, np.inf), np.full(n, np.inf)
+        lo_logit, hi_logit = np.full(n, -np.inf), np.full(n, -np.inf)
+
+        for _ in range(self.n_classes - 1):
+            pair = self.pair_index[lo, hi]
+            value = decision[rows, pair]
+            logit = value * self.prob_a[pair] + self.prob_b[pair]
+
+            # The winner keeps its weakest win; the replacement starts fresh
+            lo_wins = value > 0
+            lo_margin = np.where(lo_wins, np.minimum(lo_margin, value), np.inf)
+            lo_logit = np.where(lo_wins, np.maximum(lo_logit, logit), -np.inf)
+            hi_margin = np.where(lo_wins, np.inf, np.minimum(hi_margin, -value))
+            hi_logit = np.where(lo_wins, -np.inf, np.maximum(hi_logit, -logit))
+            hi -= lo_wins
+            lo += ~lo_wins
+
+        confidences = self._platt(np.maximum(lo_logit, hi_logit), 1.0, 0.0)
+        return lo, confidences, np.minimum(lo_margin, hi_margin)
+
+    def _dag_walk_rows(self, decision: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """dag_walk one row at a time on Python floats, for small batches"""
+        pair_index, prob_ab = self._pair_index_rows, self._prob_ab
+        labels, logits, margins = [], [], []
+        for values in decision.tolist():
+            lo, hi = 0, self.n_classes - 1
+            lo_margin = hi_margin = math.inf
+            lo_logit = hi_logit = -math.inf
+            while lo < hi:
+                pair = pair_index[lo][hi]
+                value = values[pair]
+                prob_a, prob_b = prob_ab[pair]
+                logit = value * prob_a + prob_b
+                if value > 0:
+                    lo_margin, lo_logit = min(lo_margin, value), max(lo_logit, logit)
+                    hi, hi_margin, hi_logit = hi - 1, math.inf, -math.inf
+                else:
+                    hi_margin, hi_logit = min(hi_margin, -value), max(hi_logit, -logit)
+                    lo, lo_margin, lo_logit = lo + 1, math.inf, -math.inf
+            labels.append(lo)
+            logits.append(max(lo_logit, hi_logit))
+            margins.append(min(lo_margin, hi_margin))
+        return (np.array(labels, dtype=np.intp), self._platt(np.array(logits), 1.0, 0.0),
+                np.array(margins))
+
+    def predict_dag(self, features: np.ndarray, min_margin: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decision-DAG evaluation: the winner of n_classes - 1 pairwise
+        comparisons per row, without the multi-class probability coupling.
+
+        The confidence is the winner's weakest pairwise Platt probability; it
+        runs higher than predict()'s calibrated probability. Rows whose winner
+        came through a comparison with |decision| below min_margin get
+        predict()'s voted label and calibrated probability, from the same
+        decision values.
+        """
+        decision = self.class_decision_values(self.kernel(self.transform(features)))
+        labels, confidences, margins = self.dag_walk(decision)
+
+        uncertain = np.flatnonzero(margins < min_margin)
+        if len(uncertain):
+            labels[uncertain], confidences[uncertain] = self._predict_decision(decision[uncertain])
+        return labels, confidences
+
+    def to_results(self, labels: np.ndarray, confidences: np.ndarray) -> List[Dict[str, Any]]:
+        """Build GestureService result dicts from the precomputed index tables"""
+        names, actions, numbers = self.class_names, self.class_actions, self.class_numbers
+        return [
+            {
+                'gesture_name': names[label],
+                'maze_action': actions[label],
+                'confidence': confidence,
+                'prediction_number': numbers[label]
+            }
+            for label, confidence in zip(labels.tolist(), confidences.tolist())
+        ]
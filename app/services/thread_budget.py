@@ -0,0 +1,151 @@
+"""
+CPU thread budget for the whole server
+Divides the cores among HTTP worker processes, inference and scoring threads, and native BLAS/OpenMP pools
+"""
+
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Read by OpenBLAS, MKL, BLIS and OpenMP runtimes when they load, e.g. in spawned inference workers
+NATIVE_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "BLIS_NUM_THREADS")
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """The container's CPU quota in cores (cgroup v2, then v1), or None when unlimited"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+def available_cores() -> int:
+    """Cores this process may run on: its CPU affinity, capped by the container's CPU quota"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        cores = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    if quota is not None:
+        cores = min(cores, math.ceil(quota))
+    return max(1, cores)
+
+class ThreadBudget:
+    """
+    Plans how many threads each pool gets so that all of them together fit the cores.
+
+    Each of http_workers processes gets an equal share of the cores. Inside a
+    worker, inference jobs (max_concurrency at once) and scoring threads call
+    into BLAS at the same time, so the share is divided between them and each
+    native pool gets what is left per caller. With the "process" and "shm"
+    executors the inference workers are processes of their own, and each of
+    them is one caller.
+
+    Zero for scoring_threads or native_threads means "fill from the budget";
+    explicit values are kept, and over-subscription is reported, not corrected.
+    """
+
+    def __init__(
+        self,
+        cores: int = 0,
+        http_workers: int = 1,
+        inference_backend: str = "thread",
+        inference_workers: int = 1,
+        max_concurrency: int = 1,
+        scoring_threads: int = 1,
+        native_threads: int = 0,
+    ):
+        self.cores = cores or available_cores()
+        self.cores_source = "setting" if cores else "detected"
+        self.http_workers = max(1, http_workers)
+        self.inference_backend = inference_backend
+        self.inference_workers = inference_workers
+        self.cores_per_worker = max(1, self.cores // self.http_workers)
+
+        self.scoring_threads = scoring_threads or self.cores_per_worker
+        if inference_backend in ("process", "shm"):
+            native_callers = inference_workers
+        elif inference_backend == "inline":
+            native_callers = 1
+        else:
+            native_callers = max(max_concurrency, 1)
+        self.native_callers = max(native_callers, self.scoring_threads)
+        self.native_threads = native_threads or max(1, self.cores_per_worker // self.native_callers)
+        self.applied: Optional[str] = None
+
+    @property
+    def planned_threads(self) -> int:
+        """Threads that can be busy in native code at once, across all workers"""
+        return self.http_workers * self.native_callers * self.native_threads
+
+    def apply(self) -> str:
+        """
+        Limit native pools to native_threads: the environment variables for
+        runtimes loaded later (and for spawned inference processes), and
+        threadpoolctl for the ones already loaded. Returns how the loaded
+        pools were limited: "threadpoolctl" or "env" when it is not installed.
+        """
+        for name in NATIVE_THREAD_ENV_VARS:
+            os.environ[name] = str(self.native_threads)
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            logger.warning("threadpoolctl not installed; native thread limits only apply to pools loaded from now on")
+            self.applied = "env"
+        else:
+            threadpool_limits(limits=self.native_threads)
+            self.applied = "threadpoolctl"
+
+        if self.planned_threads > self.cores:
+            logger.warning(
+                "Thread budget oversubscribed: %d workers x %d native callers x %d native threads on %d cores",
+                self.http_workers, self.native_callers, self.native_threads, self.cores,
+            )
+        return self.applied
+
+    @staticmethod
+    def native_pools() -> List[Dict[str, Any]]:
+        """BLAS/OpenMP pools loaded in this process, as threadpoolctl sees them"""
+        try:
+            from threadpoolctl import threadpool_info
+        except ImportError:
+            return []
+        return [
+            {key: pool.get(key) for key in ("user_api", "internal_api", "num_threads", "version", "filepath")}
+            for pool in threadpool_info()
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """The plan and the thread counts in effect in this process"""
+        return {
+            "pid": os.getpid(),
+            "cores": self.cores,
+            "cores_source": self.cores_source,
+            "cgroup_cpu_limit": cgroup_cpu_limit(),
+            "http_workers": self.http_workers,
+            "cores_per_worker": self.cores_per_worker,
+            "inference": {"backend": self.inference_backend, "workers": self.inference_workers},
+            "scoring_threads": self.scoring_threads,
+            "native_callers": self.native_callers,
+            "native_threads": self.native_threads,
+            "planned_threads": self.planned_threads,
+            "oversubscribed": self.planned_threads > self.cores,
+            "applied": self.applied,
+            "env": {name: os.environ.get(name) for name in NATIVE_THREAD_ENV_VARS},
+            "native_pools": self.native_pools(),
+        }
@@ -71,4 +71,31 @@ async function getPredictedLabel(processed_landmarks) {
     console.error("❌ API Error:", error);
     return null;
   }
-}
\ No newline at end of file
+}
+
+// Streaming alternative: one WebSocket per player instead of a fetch per frame.
+// The server only scores the newest pending frame, so sending at camera rate is safe.
+function connectMazeControlStream(onAction) {
+  const ws = new WebSocket("ws://localhost:8001/ws/maze-control");
+  let seq = 0;
+
+  ws.onmessage = (event) => {
+    const data = JSON.parse(event.data);
+    if (data.error) {
+      console.error("❌ Stream error:", data.error);
+      return;
+    }
+    onAction(data.is_valid ? data.action : null, data);
+  };
+
+  return {
+    sendFrame(processed_landmarks) {
+      if (ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ landmarks: processed_landmarks, seq: seq++ }));
+      }
+    },
+    close() {
+      ws.close();
+    }
+  };
+}
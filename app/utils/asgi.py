@@ -0,0 +1,27 @@
+"""
+Small helpers for pure ASGI middleware
+"""
+
+import json
+from typing import Iterable, Optional, Tuple
+
+def header(scope, name: bytes) -> Optional[str]:
+    """First value of a request header (name in lowercase bytes), or None"""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+async def send_error(send, status: int, detail: str, headers: Iterable[Tuple[bytes, bytes]] = ()):
+    """Send a complete {"detail": ...} JSON error response"""
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
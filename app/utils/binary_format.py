@@ -0,0 +1,91 @@
+"""
+Compact binary wire format for landmark frames and predictions
+Used by /predict and /maze-control with Content-Type: application/octet-stream
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+BINARY_CONTENT_TYPE = "application/octet-stream"
+
+# Request: one or more frames back to back, 63 little-endian float32 each
+FRAME_DTYPE = np.dtype('<f4')
+FRAME_VALUES = 63
+FRAME_BYTES = FRAME_VALUES * FRAME_DTYPE.itemsize  # 252
+
+# Fixed action table; action_code in responses indexes this tuple
+MAZE_ACTIONS = (
+    'UP', 'DOWN', 'LEFT', 'RIGHT', 'STOP', 'WAIT', 'PAUSE',
+    'OK', 'ACTION', 'MUTE', 'FOUR', 'THREE', 'TWO',
+)
+ACTION_CODES = {action: code for code, action in enumerate(MAZE_ACTIONS)}
+
+# Response records, 8 bytes each, one per frame in request order.
+# prediction_number indexes the label encoder classes (see GET /binary-format)
+PREDICTION_RECORD = np.dtype([
+    ('prediction_number', '<i2'),
+    ('action_code', 'u1'),
+    ('reserved', 'u1'),
+    ('confidence', '<f4'),
+])
+MAZE_RECORD = np.dtype([
+    ('prediction_number', '<i2'),
+    ('action_code', 'u1'),
+    ('is_valid', 'u1'),
+    ('confidence', '<f4'),
+])
+
+def decode_frames(body: bytes, max_frames: int) -> np.ndarray:
+    """
+    Read a binary request body straight into an (N, 63) float32 array.
+    Validation is vectorized: size, frame count, and the 0-1 range (NaN fails it).
+    """
+    if not body or len(body) % FRAME_BYTES != 0:
+        raise ValueError(f"Expected a multiple of {FRAME_BYTES} bytes (63 float32 per frame), got {len(body)}")
+
+    frames = np.frombuffer(body, dtype=FRAME_DTYPE).reshape(-1, FRAME_VALUES)
+    if len(frames) > max_frames:
+        raise ValueError(f"Expected at most {max_frames} frames, got {len(frames)}")
+    if not np.all((frames >= 0) & (frames <= 1)):
+        raise ValueError("Landmark coordinates must be normalized between 0 and 1")
+    return frames
+
+def encode_frames(frames: Sequence[Sequence[float]]) -> bytes:
+    """Client-side helper: pack frames into a binary request body"""
+    return np.asarray(frames, dtype=FRAME_DTYPE).reshape(-1, FRAME_VALUES).tobytes()
+
+def encode_predictions(predictions: List[Dict[str, Any]]) -> bytes:
+    """Pack /predict results into PREDICTION_RECORD bytes"""
+    records = np.zeros(len(predictions), dtype=PREDICTION_RECORD)
+    for record, prediction in zip(records, predictions):
+        record['prediction_number'] = prediction['prediction_number']
+        record['action_code'] = ACTION_CODES.get(prediction['maze_action'], ACTION_CODES['WAIT'])
+        record['confidence'] = prediction['confidence']
+    return records.tobytes()
+
+def encode_maze_responses(responses: List[Dict[str, Any]]) -> bytes:
+    """Pack /maze-control results (prediction_number, action, is_valid, confidence) into MAZE_RECORD bytes"""
+    records = np.zeros(len(responses), dtype=MAZE_RECORD)
+    for record, response in zip(records, responses):
+        record['prediction_number'] = response['prediction_number']
+        record['action_code'] = ACTION_CODES.get(response['action'], ACTION_CODES['WAIT'])
+        record['is_valid'] = response['is_valid']
+        record['confidence'] = response['confidence']
+    return records.tobytes()
+
+def describe() -> Dict[str, Any]:
+    """Machine-readable description of the binary layout"""
+    return {
+        "content_type": BINARY_CONTENT_TYPE,
+        "frame": {"dtype": FRAME_DTYPE.str, "values": FRAME_VALUES, "bytes": FRAME_BYTES},
+        "prediction_record": {
+            "fields": [[name, PREDICTION_RECORD.fields[name][0].str] for name in PREDICTION_RECORD.names],
+            "bytes": PREDICTION_RECORD.itemsize,
+        },
+        "maze_record": {
+            "fields": [[name, MAZE_RECORD.fields[name][0].str] for name in MAZE_RECORD.names],
+            "bytes": MAZE_RECORD.itemsize,
+        },
+        "actions": list(MAZE_ACTIONS),
+    }
@@ -13,14 +13,103 @@ class Settings:
         # Model paths
         self.MODEL_PATH = os.getenv("MODEL_PATH", "model/best_hand_gesture.pkl")
         self.ENCODER_PATH = os.getenv("ENCODER_PATH", "model/label_encoder.pkl")
+        self.USE_COMPILED_ENGINE = os.getenv("USE_COMPILED_ENGINE", "true").lower() == "true"
+        
+        # Precompiled, memory-mapped engine artifact cached per source pickle hash ("" to disable)
+        self.MODEL_ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", "model/compiled")
+        
+        # Seconds between checks of the model files for changes, which are hot-reloaded (0 disables)
+        self.MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+        
+        # /maze-control decision mode: "full" (all 1-vs-1 pairs) or "dag" (early-exit DAG)
+        self.MAZE_DECISION_MODE = os.getenv("MAZE_DECISION_MODE", "full").lower()
+        self.DAG_MIN_MARGIN = float(os.getenv("DAG_MIN_MARGIN", "0.5"))
         
         # API settings
         self.MIN_CONFIDENCE_THRESHOLD = float(os.getenv("MIN_CONFIDENCE_THRESHOLD", "0.7"))
+        # Threshold for "dag" confidences (weakest pairwise probability), which run higher
+        # than calibrated ones; 0 = MIN_CONFIDENCE_THRESHOLD
+        self.DAG_MIN_CONFIDENCE_THRESHOLD = float(os.getenv("DAG_MIN_CONFIDENCE_THRESHOLD", "0")) or self.MIN_CONFIDENCE_THRESHOLD
         self.MAX_REQUESTS_PER_MINUTE = int(os.getenv("MAX_REQUESTS_PER_MINUTE", "60"))
+        self.MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "256"))
+        self.ENABLE_FAST_ROUTES = os.getenv("ENABLE_FAST_ROUTES", "false").lower() == "true"
+        
+        # Per-client token bucket on the inference endpoints (MAX_REQUESTS_PER_MINUTE refill).
+        # Off by default: the maze frontend posts up to 60 frames a second (3600 a minute)
+        self.ENABLE_RATE_LIMIT = os.getenv("ENABLE_RATE_LIMIT", "false").lower() == "true"
+        self.RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "0")) or self.MAX_REQUESTS_PER_MINUTE
+        self.RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+        self.RATE_LIMIT_API_KEYS = os.getenv("RATE_LIMIT_API_KEYS", "")  # key1,key2: X-API-Key values with their own bucket
+        
+        # Admission control: 503 once the inference queue is too deep or too slow
+        self.ENABLE_ADMISSION_CONTROL = os.getenv("ENABLE_ADMISSION_CONTROL", "true").lower() == "true"
+        self.ADMISSION_MAX_QUEUE_DEPTH = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "64"))
+        self.ADMISSION_MAX_WAIT_MS = float(os.getenv("ADMISSION_MAX_WAIT_MS", "250"))
+        
+        # Per-stage latency of a sampled fraction of inference requests
+        self.ENABLE_STAGE_TIMING = os.getenv("ENABLE_STAGE_TIMING", "true").lower() == "true"
+        self.STAGE_TIMING_SAMPLE_RATE = float(os.getenv("STAGE_TIMING_SAMPLE_RATE", "0.1"))
+        self.SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() == "true"
+        
+        # Micro-batching of concurrent single-frame requests
+        self.ENABLE_MICRO_BATCHING = os.getenv("ENABLE_MICRO_BATCHING", "true").lower() == "true"
+        self.MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+        self.MICRO_BATCH_WINDOW_US = int(os.getenv("MICRO_BATCH_WINDOW_US", "500"))
+        
+        # Prediction cache keyed on normalized features rounded to CACHE_RESOLUTION
+        self.ENABLE_PREDICTION_CACHE = os.getenv("ENABLE_PREDICTION_CACHE", "true").lower() == "true"
+        self.PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+        self.PREDICTION_CACHE_RESOLUTION = float(os.getenv("PREDICTION_CACHE_RESOLUTION", "0.01"))
+        
+        # Per-session delta gating on /maze-control?session_id=...
+        self.ENABLE_SESSION_GATING = os.getenv("ENABLE_SESSION_GATING", "true").lower() == "true"
+        self.SESSION_GATE_EPSILON = float(os.getenv("SESSION_GATE_EPSILON", "0.05"))
+        self.SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "30"))
+        self.MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "10000"))
+        
+        # Inference executor: inline (on the event loop), thread or process pool
+        self.INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+        self.INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+        self.INFERENCE_MAX_CONCURRENCY = int(os.getenv("INFERENCE_MAX_CONCURRENCY", "0")) or self.INFERENCE_WORKERS
+        
+        # Large engine batches are scored in SCORING_CHUNK_ROWS chunks, on SCORING_THREADS threads
+        # (0 = this worker's share of the cores) once a batch has SCORING_MIN_PARALLEL_ROWS rows (0 = two chunks)
+        self.SCORING_THREADS = int(os.getenv("SCORING_THREADS", "1"))
+        self.SCORING_CHUNK_ROWS = int(os.getenv("SCORING_CHUNK_ROWS", "512"))
+        self.SCORING_MIN_PARALLEL_ROWS = int(os.getenv("SCORING_MIN_PARALLEL_ROWS", "0"))
+        
+        # Thread budget: cores split among WEB_CONCURRENCY worker processes, inference and
+        # scoring threads, and BLAS/OpenMP pools (NATIVE_THREADS per pool, 0 = from the budget)
+        self.ENABLE_THREAD_BUDGET = os.getenv("ENABLE_THREAD_BUDGET", "true").lower() == "true"
+        self.THREAD_BUDGET_CORES = int(os.getenv("THREAD_BUDGET_CORES", "0"))  # 0 = affinity and cgroup quota
+        self.NATIVE_THREADS = int(os.getenv("NATIVE_THREADS", "0"))
+        self.WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))  # exported by gunicorn.conf.py
+        
+        # Logging: records are queued and written by a background thread
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+        self.LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # text or json
+        self.LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "prediction=0.01")  # event=rate,...
+        self.LOG_ERROR_LIMIT = int(os.getenv("LOG_ERROR_LIMIT", "10"))  # per message per minute, 0 = unlimited
+        self.LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        
+        # Event-loop lag and GC pause monitoring
+        self.ENABLE_RUNTIME_MONITOR = os.getenv("ENABLE_RUNTIME_MONITOR", "true").lower() == "true"
+        self.LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+        # gc.freeze() everything alive after startup (the model, services) so collections skip it
+        self.GC_FREEZE_AFTER_STARTUP = os.getenv("GC_FREEZE_AFTER_STARTUP", "false").lower() == "true"
+        
+        # Admin endpoints (/admin/*) need this token in X-Admin-Token; unset disables them
+        self.ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+        self.PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+        self.PROFILE_COOLDOWN_SECONDS = float(os.getenv("PROFILE_COOLDOWN_SECONDS", "300"))
         
         # Monitoring
         self.ENABLE_METRICS = os.getenv("ENABLE_METRICS", "true").lower() == "true"
         self.METRICS_PORT = int(os.getenv("METRICS_PORT", "8000"))
+        # Per-request counters are batched in each worker and flushed this often (0 = every increment)
+        self.METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+        # /metrics output is reused for scrapes within this many seconds
+        self.METRICS_CACHE_TTL = float(os.getenv("METRICS_CACHE_TTL", "1.0"))
 
 @lru_cache()
 def get_settings():
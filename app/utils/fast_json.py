@@ -0,0 +1,117 @@
+"""
+Pydantic-free JSON parsing and serialization for the fast /predict and /maze-control routes
+Keeps the public contract of GestureInput / PredictionResponse / MazeControlResponse;
+only rejected bodies go through GestureInput, so 422 bodies match FastAPI's exactly
+"""
+
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from app.models import GestureInput
+from app.utils import stage_timer
+
+LANDMARK_COUNT = 63
+
+class LandmarkValidationError(ValueError):
+    """Invalid request body; errors are FastAPI's 422 detail entries for the same body"""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(errors[0]["msg"])
+        self.errors = errors
+
+def _validation_error(payload: Any) -> LandmarkValidationError:
+    """
+    The exact 422 detail FastAPI sends for a rejected body. Only invalid
+    bodies pay for Pydantic: the payload is validated again with GestureInput.
+    """
+    try:
+        GestureInput.model_validate(payload, from_attributes=True)  # as FastAPI validates bodies
+    except ValidationError as e:
+        return LandmarkValidationError(jsonable_encoder([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors()
+        ]))
+    # GestureInput lets NaN through; the fast route rejects it like an out-of-range value
+    return LandmarkValidationError([{
+        "type": "value_error",
+        "loc": ["body", "landmarks"],
+        "msg": "Value error, Landmark coordinates must be normalized between 0 and 1",
+        "input": payload["landmarks"],
+        "ctx": {"error": {}},
+    }])
+
+def parse_landmarks(body: bytes) -> np.ndarray:
+    """
+    Parse {"landmarks": [63 floats]} into a float32 array.
+    Length, type, range and NaN checks run on the whole array at once.
+    """
+    if not body:
+        # FastAPI validates an empty body as a missing one
+        error = _validation_error({})
+        error.errors[0].update(loc=["body"], input=None)
+        raise error
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        # Bytes that are not even text (UnicodeDecodeError) are reported at offset 0
+        raise LandmarkValidationError([{
+            "type": "json_invalid", "loc": ["body", getattr(e, "pos", 0)], "msg": "JSON decode error",
+            "input": {}, "ctx": {"error": getattr(e, "msg", str(e))},
+        }])
+    stage_timer.mark("parse")
+
+    values = payload.get("landmarks") if isinstance(payload, dict) else None
+    if not isinstance(values, list) or len(values) != LANDMARK_COUNT:
+        raise _validation_error(payload)
+    try:
+        landmarks = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError, OverflowError):
+        # Integers too large for a float64 overflow here rather than parse as inf
+        raise _validation_error(payload)
+
+    # NaN fails both comparisons, so it is rejected with out-of-range values
+    if landmarks.ndim != 1 or not np.all((landmarks >= 0) & (landmarks <= 1)):
+        raise _validation_error(payload)
+    return landmarks.astype(np.float32)
+
+def error_body(error: LandmarkValidationError) -> bytes:
+    return json.dumps({"detail": error.errors}).encode()
+
+class ResponseSerializer:
+    """
+    Precompiled JSON writers for the response models.
+    Field order and float formatting match Pydantic's output for the same values;
+    JSON-escaped names are cached so each response is one string format.
+    """
+
+    PREDICTION_TEMPLATE = '{"gesture_name":%s,"maze_action":%s,"confidence":%r,"prediction_number":%d}'
+    MAZE_TEMPLATE = '{"action":%s,"gesture":%s,"confidence":%r,"is_valid":%s,"threshold":%r}'
+
+    def __init__(self):
+        self._quoted: Dict[str, str] = {}
+
+    def _quote(self, value: str) -> str:
+        quoted = self._quoted.get(value)
+        if quoted is None:
+            quoted = self._quoted[value] = json.dumps(str(value))
+        return quoted
+
+    def prediction(self, prediction: Dict[str, Any]) -> bytes:
+        return (self.PREDICTION_TEMPLATE % (
+            self._quote(prediction["gesture_name"]),
+            self._quote(prediction["maze_action"]),
+            float(prediction["confidence"]),
+            prediction["prediction_number"],
+        )).encode()
+
+    def maze(self, decision: Dict[str, Any]) -> bytes:
+        return (self.MAZE_TEMPLATE % (
+            self._quote(decision["action"]),
+            self._quote(decision["gesture"]),
+            float(decision["confidence"]),
+            "true" if decision["is_valid"] else "false",
+            float(decision["threshold"]),
+        )).encode()
@@ -0,0 +1,211 @@
+"""
+Non-blocking, sampled application logging
+Records are queued by the calling thread and formatted and written by a background listener
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Per-event sampling rates, set by configure_logging
+_sample_rates: Dict[str, float] = {}
+
+# The installed pipeline, restarted in forked children
+_active: Optional["LogPipeline"] = None
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "event=rate,event=rate" into a dict"""
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+def sampled(event: str) -> bool:
+    """Whether this occurrence of event should be logged; events without a rate are always logged"""
+    rate = _sample_rates.get(event, 1.0)
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+def log_event(logger: logging.Logger, event: str, msg: str, *args, level: int = logging.INFO, **fields):
+    """
+    Log a sampled event. The sampling check runs before a LogRecord is created,
+    so skipped occurrences cost one dict lookup and one random number.
+    """
+    if logger.isEnabledFor(level) and sampled(event):
+        logger.log(level, msg, *args, extra={"event": event, **fields})
+
+class ErrorRateLimitFilter(logging.Filter):
+    """
+    Let through at most max_per_interval records per (logger, message template)
+    at or above `level` every `interval` seconds. The first record after a
+    suppressed run carries the number of records dropped in `suppressed`.
+    """
+
+    def __init__(self, max_per_interval: int = 10, interval: float = 60.0, level: int = logging.ERROR,
+                 max_keys: int = 1024, clock=time.monotonic):
+        super().__init__()
+        self.max_per_interval = max_per_interval
+        self.interval = interval
+        self.level = level
+        self.max_keys = max_keys
+        self.clock = clock
+        self._windows: Dict[Tuple[str, str], list] = {}  # key -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.max_per_interval <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = self.clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._prune(now)
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.max_per_interval:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+    def _prune(self, now: float):
+        # Messages formatted before logging make a new key per record; forget
+        # finished windows, and everything if that is not enough
+        for key in [key for key, window in self._windows.items() if now - window[0] >= self.interval]:
+            del self._windows[key]
+        if len(self._windows) >= self.max_keys:
+            self._windows.clear()
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never waits: a full queue drops the record and counts it.
+
+    Records are queued as they are; the listener thread does all message
+    formatting, so the caller only pays for the LogRecord and the put.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with any `extra` fields included"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Classic text lines, with any `extra` fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(f"{key}={value}" for key, value in record.__dict__.items() if key not in _RECORD_ATTRS)
+        return f"{line} {extras}" if extras else line
+
+class LogPipeline:
+    """
+    Root logging through a bounded queue drained by a listener thread.
+
+    Threads do not survive fork, so a forked child (e.g. a gunicorn worker
+    forked from a preloading master) gets a fresh queue and listener.
+    """
+
+    def __init__(self, level: int = logging.INFO, fmt: str = "text", queue_size: int = 10000,
+                 error_limit: int = 10, error_interval: float = 60.0):
+        self.queue_size = queue_size
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+        self.output = output
+        self.handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        self.handler.addFilter(ErrorRateLimitFilter(error_limit, error_interval))
+        self.level = level
+        self.listener: Optional[QueueListener] = None
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    def start(self):
+        """Route root logging through this pipeline, replacing a previously installed one"""
+        global _active
+        if _active is not None and _active is not self:
+            _active.stop()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, NonBlockingQueueHandler):
+                root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self._start_listener()
+        _active = self
+
+    def _start_listener(self):
+        self.listener = QueueListener(self.handler.queue, self.output, respect_handler_level=True)
+        self.listener.start()
+
+    def _after_fork(self):
+        self.handler.queue = queue.Queue(self.queue_size)
+        self._start_listener()
+
+    def stop(self):
+        """Flush queued records and stop the listener thread"""
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+        self.listener = None
+
+def _after_fork_in_child():
+    if _active is not None and _active.listener is not None:
+        _active._after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+def configure_logging(level: str = "INFO", fmt: str = "text", sample_rates: Optional[Dict[str, float]] = None,
+                      queue_size: int = 10000, error_limit: int = 10) -> LogPipeline:
+    """Install the queue-based pipeline on the root logger and start its listener"""
+    _sample_rates.clear()
+    _sample_rates.update(sample_rates or {})
+    pipeline = LogPipeline(getattr(logging, level.upper(), logging.INFO), fmt, queue_size, error_limit)
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    return pipeline
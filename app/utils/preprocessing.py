@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from app.utils.landmark_features import normalize_landmarks
+
 def process_hand_landmarks_xy(row: pd.Series) -> np.ndarray:
     """
     Input: pandas Series of length 63 (x1,y1,z1, …, x21,y21,z21).
@@ -9,13 +11,14 @@ def process_hand_landmarks_xy(row: pd.Series) -> np.ndarray:
       2. Re-center by subtracting wrist (row 0)
       3. Normalize by distance to mid‐finger tip (row 11)
       4. Return a flat (42,) vector
+    Computed in float64 by the same kernel the API serves with.
+    """
+    frame = np.asarray(row, dtype=np.float64).reshape(1, 63)
+    return normalize_landmarks(frame, dtype=np.float64)[0]
+
+def process_hand_landmarks_frame(frame: pd.DataFrame) -> np.ndarray:
+    """
+    process_hand_landmarks_xy for a whole DataFrame of 63 landmark columns
+    at once, instead of frame.apply row by row. Returns (N, 42) float64.
     """
-    arr = np.array(row).reshape(21, 3)[:, :2].astype(float)  # (21,2)
-    wrist = arr[0, :].copy()
-    arr = arr - wrist
-    mid_tip = arr[11, :].copy()
-    scale = np.linalg.norm(mid_tip)
-    if scale == 0:
-        scale = 1.0
-    arr = arr / scale
-    return arr.flatten()
+    return normalize_landmarks(frame.to_numpy(dtype=np.float64), dtype=np.float64)
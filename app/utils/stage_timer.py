@@ -0,0 +1,130 @@
+"""
+Per-request stage timers for latency breakdowns
+A sampled request carries a StageTimer in a context variable; code on its path calls mark(stage)
+"""
+
+import random
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Iterable, List, Optional, Tuple
+
+class StageTimer:
+    """
+    Durations of consecutive stages of one request.
+
+    Each mark(stage) records the time since the previous mark (or since the
+    timer was created), so the stages partition the request without overlap.
+    """
+
+    __slots__ = ("stages", "started", "_last")
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self.started = self._last = perf_counter()
+
+    def mark(self, stage: str):
+        now = perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def absorb(self, shared: "StageTimer", waited: str = "batch_wait"):
+        """
+        End the current stage with the stages of work shared with other
+        requests, such as a micro-batch flush: the time until that work
+        started is recorded as `waited`, then its stages as they were timed.
+        """
+        self.stages.append((waited, max(shared.started - self._last, 0.0)))
+        self.stages.extend(shared.stages)
+        self._last = shared._last
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages]
+        entries.append(f"total;dur={self.total * 1000:.3f}")
+        return ", ".join(entries)
+
+_current: ContextVar[Optional[StageTimer]] = ContextVar("stage_timer", default=None)
+
+def current() -> Optional[StageTimer]:
+    """The timer of the request being handled, or None when it is not sampled"""
+    return _current.get()
+
+def use(timer: Optional[StageTimer]):
+    """Make timer the current one for the rest of this context, e.g. a task doing shared work"""
+    _current.set(timer)
+
+def mark(stage: str):
+    """End the current stage of a sampled request; a no-op for everything else"""
+    timer = _current.get()
+    if timer is not None:
+        timer.mark(stage)
+
+class StageSampler:
+    """Decides which requests are timed; rate is the fraction sampled, between 0 and 1"""
+
+    def __init__(self, rate: float = 1.0):
+        self.rate = rate
+
+    def __call__(self) -> bool:
+        return self.rate >= 1.0 or (self.rate > 0.0 and random.random() < self.rate)
+
+class StageTimingMiddleware:
+    """
+    ASGI middleware timing the stages of sampled requests.
+
+    The stage marked when the request body has been received is "receive";
+    the one ending when the response starts is "serialize". Stages in between
+    are marked by the handlers. Each stage is reported through on_stage and,
+    when server_timing is set, listed in a Server-Timing response header.
+    """
+
+    def __init__(
+        self,
+        app,
+        paths: Iterable[str],
+        sampler: Callable[[], bool],
+        on_stage: Optional[Callable[[str, float], None]] = None,
+        server_timing: bool = True,
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.sampler = sampler
+        self.on_stage = on_stage
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths or not self.sampler():
+            await self.app(scope, receive, send)
+            return
+
+        timer = StageTimer()
+
+        async def timed_receive():
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                timer.mark("receive")
+            return message
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                timer.mark("serialize")
+                if self.on_stage is not None:
+                    for stage, seconds in timer.stages:
+                        self.on_stage(stage, seconds)
+                if self.server_timing:
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (b"server-timing", timer.server_timing().encode()),
+                        (b"timing-allow-origin", b"*"),
+                    ]
+            await send(message)
+
+        token = _current.set(timer)
+        try:
+            await self.app(scope, timed_receive, timed_send)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,70 @@
+"""
+Per-request framework overhead of /predict and /maze-control: FastAPI routes vs. fast routes
+
+Inference is replaced by a constant result so only parsing, validation, routing,
+response construction and serialization are measured. Requests are driven
+straight through the ASGI app, without a network or HTTP client in the way.
+
+Usage:
+    python -m benchmarks.bench_fast_route [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import app.main as main
+
+FRAME = [0.5, 0.85, 0.0] + [0.45, 0.75, 0.0] * 20
+BODY = json.dumps({"landmarks": FRAME}).encode()
+PREDICTION = {'gesture_name': 'like', 'maze_action': 'UP', 'confidence': 0.93, 'prediction_number': 4}
+
+async def fixed_prediction(landmarks, decision_mode="full"):
+    return PREDICTION
+
+async def call(path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+    }
+    messages = [{"type": "http.request", "body": BODY, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await main.app(scope, receive, send)
+    return status[0]
+
+async def measure(path: str, requests: int) -> float:
+    for _ in range(200):  # warm up
+        assert await call(path) == 200
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(path)
+    return (time.perf_counter() - started) / requests * 1e6
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    main.run_prediction = fixed_prediction
+
+    before = {path: asyncio.run(measure(path, args.requests)) for path in ("/predict", "/maze-control")}
+    main.install_fast_routes(main.app)
+    after = {path: asyncio.run(measure(path, args.requests)) for path in ("/predict", "/maze-control")}
+
+    print(f"{'endpoint':<16}{'FastAPI (us)':>14}{'fast route (us)':>18}{'speedup':>10}")
+    for path in before:
+        print(f"{path:<16}{before[path]:>14.1f}{after[path]:>18.1f}{before[path] / after[path]:>9.1f}x")
+
+if __name__ == "__main__":
+    main_cli()
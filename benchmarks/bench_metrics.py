@@ -0,0 +1,99 @@
+"""
+Metrics cost per request: labels() on every call vs. pre-bound and batched label children
+
+One request records what /maze-control and /predict record on success: a
+prediction count, a confidence observation, a data quality count and a maze
+action count. Also times /metrics exposition with and without the cache.
+Run with --multiprocess to measure gunicorn's PROMETHEUS_MULTIPROC_DIR mode.
+
+Usage:
+    python -m benchmarks.bench_metrics [--requests 100000] [--multiprocess]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+GESTURES = ["like", "dislike", "one", "rock", "palm", "fist", "peace", "ok"]
+ACTIONS = ["UP", "DOWN", "LEFT", "RIGHT", "STOP", "WAIT", "PAUSE", "OK"]
+
+def per_request_us(record, requests: int) -> float:
+    for i in range(1000):  # warm up
+        record(i)
+    started = time.perf_counter()
+    for i in range(requests):
+        record(i)
+    return (time.perf_counter() - started) / requests * 1e6
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--multiprocess", action="store_true", help="Write metrics to PROMETHEUS_MULTIPROC_DIR")
+    args = parser.parse_args()
+
+    multiproc_dir = None
+    if args.multiprocess:
+        # Must be set before prometheus_client is imported
+        multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="bench_metrics_")
+
+    from app.services.monitoring_service import BoundCounter, MetricsExporter, MonitoringService
+
+    service = MonitoringService(gesture_names=GESTURES, actions=ACTIONS)
+
+    def labels_per_call(i):
+        service.gesture_predictions.labels(gesture_name=GESTURES[i & 7]).inc()
+        service.prediction_confidence.observe(0.9)
+        service.input_data_quality.labels(quality_type="valid").inc()
+        service.maze_actions.labels(action=ACTIONS[i & 7]).inc()
+
+    def bound_recorder(batched: bool):
+        predictions = BoundCounter(service.gesture_predictions, GESTURES, batched)
+        quality = BoundCounter(service.input_data_quality, ["valid"], batched)
+        actions = BoundCounter(service.maze_actions, ACTIONS, batched)
+
+        def record(i):
+            predictions.inc(GESTURES[i & 7])
+            service.prediction_confidence.observe(0.9)
+            quality.inc("valid")
+            actions.inc(ACTIONS[i & 7])
+
+        def flush():
+            for counts in (predictions, quality, actions):
+                counts.flush()
+        return record, flush
+
+    mode = "multiprocess" if args.multiprocess else "single process"
+    print(f"Metrics per request ({mode}, {args.requests} requests)")
+    baseline = per_request_us(labels_per_call, args.requests)
+    print(f"  labels() per call:        {baseline:7.2f} us")
+
+    bound, _ = bound_recorder(batched=False)
+    result = per_request_us(bound, args.requests)
+    print(f"  pre-bound children:       {result:7.2f} us  ({baseline / result:.1f}x)")
+
+    batched, flush = bound_recorder(batched=True)
+    result = per_request_us(batched, args.requests)
+    flush_started = time.perf_counter()
+    flush()
+    flush_us = (time.perf_counter() - flush_started) * 1e6
+    print(f"  pre-bound + batched:      {result:7.2f} us  ({baseline / result:.1f}x; one flush {flush_us:.0f} us)")
+
+    exporter = MetricsExporter(ttl=60)
+    scrapes = 50
+    started = time.perf_counter()
+    for _ in range(scrapes):
+        exporter.refresh()
+    uncached = (time.perf_counter() - started) / scrapes * 1e6
+    started = time.perf_counter()
+    for _ in range(scrapes):
+        exporter.render()
+    cached = (time.perf_counter() - started) / scrapes * 1e6
+    print(f"/metrics exposition: {uncached:.0f} us rendered, {cached:.2f} us cached")
+
+    if multiproc_dir is not None:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main_cli()
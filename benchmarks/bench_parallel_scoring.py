@@ -0,0 +1,60 @@
+"""
+Engine throughput on large batches: one call vs. chunks on 1..N scoring threads
+
+BLAS is limited to one thread while measuring, so each scoring thread gets a
+core of its own and the speedup comes from the thread pool alone.
+
+Usage:
+    python -m benchmarks.bench_parallel_scoring [--rows 8192] [--chunk-rows 512] [--mode full]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+from app.services.gesture_service import DECISION_MODES, GestureService
+from app.services.parallel_scorer import ParallelScorer
+from app.utils.config import get_settings
+
+def rows_per_second(score, features: np.ndarray, repeats: int = 3) -> float:
+    score(features[:64])  # warm up
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        score(features)
+        best = min(best, time.perf_counter() - started)
+    return len(features) / best
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=8192)
+    parser.add_argument("--chunk-rows", type=int, default=512)
+    parser.add_argument("--mode", choices=DECISION_MODES, default="full")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    service = GestureService(settings.MODEL_PATH, settings.ENCODER_PATH, artifact_dir=settings.MODEL_ARTIFACT_DIR or None)
+    frames = np.random.default_rng(0).uniform(0.2, 0.8, size=(args.rows, 63))
+    features = service.preprocess_batch(frames)
+
+    def engine_call(batch):
+        return service._engine_call(batch, args.mode)
+
+    cores = os.cpu_count() or 1
+    print(f"{args.rows} rows, {args.mode} mode, {cores} cores")
+    with threadpool_limits(1):
+        baseline = rows_per_second(engine_call, features)
+        print(f"  one call:              {baseline:9.0f} rows/s")
+        threads = 1
+        while threads <= cores:
+            scorer = ParallelScorer(threads=threads, chunk_rows=args.chunk_rows)
+            result = rows_per_second(lambda batch: scorer.score(engine_call, batch), features)
+            scorer.shutdown()
+            print(f"  {threads:2d} thread(s), chunks: {result:9.0f} rows/s  ({result / baseline:.1f}x)")
+            threads *= 2
+
+if __name__ == "__main__":
+    main_cli()
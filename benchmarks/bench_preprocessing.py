@@ -0,0 +1,60 @@
+"""
+Landmark preprocessing cost per frame: plain NumPy expressions vs. the shared in-place kernel
+
+The plain version is the transform as GestureService used to write it: each
+step allocates a new array. The kernel writes into one output (or a
+preallocated out=) and reuses per-thread scratch buffers. Peak allocation is
+measured with tracemalloc.
+
+Usage:
+    python -m benchmarks.bench_preprocessing [--sizes 1,8,64,512,4096]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.utils.landmark_features import normalize_landmarks
+
+def plain_numpy(frames: np.ndarray) -> np.ndarray:
+    xy = frames.reshape(-1, 21, 3)[:, :, :2]
+    rel = xy - xy[:, :1, :]
+    scale = np.linalg.norm(rel[:, 11, :], axis=1)
+    scale[scale == 0] = 1.0
+    return (rel / scale[:, None, None]).reshape(len(frames), 42)
+
+def measure(transform, frames: np.ndarray):
+    """(microseconds per frame, peak bytes allocated per call)"""
+    calls = max(20, 20000 // len(frames))
+    transform(frames)  # warm up, and grow the scratch buffers
+    started = time.perf_counter()
+    for _ in range(calls):
+        transform(frames)
+    per_frame = (time.perf_counter() - started) / calls / len(frames) * 1e6
+
+    tracemalloc.start()
+    transform(frames)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return per_frame, peak
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,8,64,512,4096", help="Comma-separated batch sizes")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'frames':>7} {'plain us/frame':>15} {'kernel':>8} {'out=':>8} {'plain alloc':>12} {'kernel':>8} {'out=':>8}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        frames = rng.uniform(0.2, 0.8, size=(size, 63)).astype(np.float32)
+        out = np.empty((size, 42), np.float32)
+        plain = measure(plain_numpy, frames)
+        kernel = measure(normalize_landmarks, frames)
+        into = measure(lambda batch: normalize_landmarks(batch, out=out), frames)
+        print(f"{size:>7} {plain[0]:>15.3f} {kernel[0]:>8.3f} {into[0]:>8.3f} "
+              f"{plain[1]:>12} {kernel[1]:>8} {into[1]:>8}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for multi-worker serving
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app (and so the model) is loaded once in the master before forking.
+gc.freeze() then moves every object created so far out of the collector's
+reach, so workers do not dirty those pages and the model stays shared
+copy-on-write. The engine's large arrays are memory-mapped from the model
+artifact, so they are shared through the page cache as well.
+Prometheus multiprocess mode makes /metrics add up counters across workers.
+Workers default to the cores the container may use (affinity and CPU quota).
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+
+from app.services.thread_budget import available_cores
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", available_cores()))
+# The app's thread budget divides the cores by the worker count
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+accesslog = "-"
+
+# Must be set before prometheus_client is imported, i.e. before the app is preloaded
+multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "prometheus_multiproc")
+)
+shutil.rmtree(multiproc_dir, ignore_errors=True)  # stale files from a previous run
+os.makedirs(multiproc_dir, exist_ok=True)
+
+def when_ready(server):
+    """Runs in the master after the app is preloaded, before the workers fork"""
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Froze {gc.get_freeze_count()} preloaded objects for copy-on-write sharing")
+
+def child_exit(server, worker):
+    from app.services.monitoring_service import MonitoringService
+    MonitoringService.mark_process_dead(worker.pid)
@@ -12,3 +12,59 @@ def simple_data():
 def sample_list():
     """Simple list for testing"""
     return [1, 2, 3, 4, 5]
+
+@pytest.fixture
+def sample_landmarks():
+    """63 MediaPipe landmark values (21 points × 3 coordinates) from the README example"""
+    return [
+        0.50, 0.85, 0.0, 0.45, 0.75, 0.0, 0.42, 0.65, 0.0, 0.40, 0.50, 0.0,
+        0.38, 0.35, 0.0, 0.55, 0.70, 0.0, 0.58, 0.60, 0.0, 0.60, 0.65, 0.0,
+        0.62, 0.70, 0.0, 0.60, 0.72, 0.0, 0.63, 0.62, 0.0, 0.65, 0.68, 0.0,
+        0.67, 0.73, 0.0, 0.64, 0.74, 0.0, 0.66, 0.64, 0.0, 0.68, 0.70, 0.0,
+        0.70, 0.75, 0.0, 0.67, 0.76, 0.0, 0.68, 0.66, 0.0, 0.69, 0.72, 0.0,
+        0.70, 0.77, 0.0
+    ]
+
+@pytest.fixture
+def random_frames():
+    """Batch of random landmark frames in the normalized 0-1 range"""
+    import numpy as np
+    rng = np.random.default_rng(42)
+    return rng.uniform(0.2, 0.8, size=(32, 63)).tolist()
+
+@pytest.fixture(scope="session")
+def sklearn_service():
+    """GestureService loaded from the pickles, so the sklearn model is available as a reference"""
+    from app.utils.config import get_settings
+    from app.services.gesture_service import GestureService
+    settings = get_settings()
+    return GestureService(settings.MODEL_PATH, settings.ENCODER_PATH)
+
+class FakeClock:
+    """Stand-in for time.monotonic / time.time that only moves when a test sets `now`"""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def fake_clock():
+    """A FakeClock to pass as the `clock` of rate limiters, caches and controllers"""
+    return FakeClock()
+
+@pytest.fixture
+def client():
+    """TestClient for the app; the lifespan is not run, so it is cheap to create per test"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+@pytest.fixture
+def reset_rate_limiter():
+    """The app's rate limiter with a fresh budget for every client; all TestClient requests share one client IP"""
+    from app.main import rate_limiter
+    rate_limiter.reset()
+    yield rate_limiter
+    rate_limiter.reset()
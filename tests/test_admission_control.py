@@ -0,0 +1,90 @@
+"""Tests for queue-depth and deadline based admission control"""
+
+import time
+
+import pytest
+
+from app.main import admission_controller, monitoring_service
+from app.services.admission_control import AdmissionController
+
+def shed_count(reason: str) -> float:
+    return monitoring_service.admission_shed.labels(reason=reason)._value.get()
+
+class TestAdmissionController:
+    """Test cases for AdmissionController"""
+
+    def test_admits_idle_queue(self, fake_clock):
+        """An empty queue admits requests, with or without a deadline"""
+        controller = AdmissionController(lambda: 0, clock=fake_clock)
+        assert controller.check() is None
+        assert controller.check(fake_clock.now + 1) is None
+
+    def test_queue_depth_limit(self):
+        """Requests are shed once the depth limit is reached"""
+        depth = [3]
+        controller = AdmissionController(lambda: depth[0], max_queue_depth=4)
+        assert controller.check() is None
+        depth[0] = 4
+        assert controller.check() == "queue_depth"
+
+    def test_estimated_wait(self):
+        """The wait grows with the rounds of jobs ahead of the request"""
+        depth = [0]
+        estimates = []
+        controller = AdmissionController(lambda: depth[0], concurrency=2, max_wait=0.1,
+                                         smoothing=0.5, on_estimate=estimates.append)
+        controller.record_service_time(0.02)
+        controller.record_service_time(0.04)
+        assert controller.service_time == pytest.approx(0.03)
+        assert estimates == pytest.approx([0.02, 0.03])
+
+        depth[0] = 5  # two full rounds ahead, then this request's own
+        assert controller.estimated_wait() == pytest.approx(0.09)
+        assert controller.check() is None
+        depth[0] = 6
+        assert controller.check() == "estimated_wait"
+
+    def test_deadlines(self, fake_clock):
+        """Expired deadlines and deadlines the estimate cannot meet are shed"""
+        controller = AdmissionController(lambda: 1, clock=fake_clock)
+        controller.record_service_time(0.05)
+        assert controller.check(fake_clock.now) == "deadline_expired"
+        assert controller.check(fake_clock.now + 0.08) == "deadline_unreachable"
+        assert controller.check(fake_clock.now + 0.2) is None
+
+class TestAdmissionControlMiddleware:
+    """Test cases for the 503 responses"""
+
+    def test_queue_full_returns_503(self, client, sample_landmarks, monkeypatch):
+        """Shed requests get 503 with Retry-After and are counted"""
+        monkeypatch.setattr(admission_controller, "max_queue_depth", 0)
+        before = shed_count("queue_depth")
+
+        for path in ("/predict", "/maze-control"):
+            response = client.post(path, json={"landmarks": sample_landmarks})
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "1"
+            assert response.json() == {"detail": "Request shed: queue depth"}
+        assert shed_count("queue_depth") == before + 2
+
+        # Batch scoring and health checks are not admission controlled
+        assert client.get("/health").status_code == 200
+
+    def test_deadline_header(self, client, sample_landmarks):
+        """A deadline in the past is shed; a distant one is served"""
+        before = shed_count("deadline_expired")
+        now_ms = time.time() * 1000
+        expired = client.post("/predict", json={"landmarks": sample_landmarks},
+                              headers={"X-Request-Deadline": str(int(now_ms - 1000))})
+        assert expired.status_code == 503
+        assert shed_count("deadline_expired") == before + 1
+
+        served = client.post("/predict", json={"landmarks": sample_landmarks},
+                             headers={"X-Request-Deadline": str(int(now_ms + 60000))})
+        assert served.status_code == 200
+
+    def test_malformed_deadline_ignored(self, client, sample_landmarks):
+        """A deadline that is not a number is treated as absent"""
+        response = client.post("/predict", json={"landmarks": sample_landmarks},
+                               headers={"X-Request-Deadline": "soon"})
+        assert response.status_code == 200
@@ -0,0 +1,64 @@
+"""Tests for vectorized batch preprocessing and the /predict/batch endpoint"""
+
+import numpy as np
+import pytest
+
+from app.main import gesture_service, settings
+from app.services.gesture_service import GestureService
+
+class TestBatchPredict:
+    """Test cases for GestureService.predict_batch and /predict/batch"""
+
+    def test_preprocess_batch_matches_single_frame(self, random_frames):
+        """Batch preprocessing gives the same features as the per-frame path"""
+        batch = gesture_service.preprocess_batch(random_frames)
+
+        assert batch.shape == (len(random_frames), 42)
+        for row, frame in zip(batch, random_frames):
+            np.testing.assert_allclose(row, gesture_service.preprocess_landmarks(frame), rtol=1e-6)
+
+    def test_preprocess_batch_wrong_shape(self):
+        """Frames that are not 63 values long are rejected"""
+        with pytest.raises(ValueError, match="Expected frames of 63 landmarks"):
+            gesture_service.preprocess_batch([[0.5] * 60])
+
+    def test_predict_batch_keeps_order(self, random_frames, sklearn_service):
+        """Each batch result matches the sklearn model's own result for that frame"""
+        results = gesture_service.predict_batch(random_frames)
+        features = gesture_service.preprocess_batch(random_frames)
+        labels = sklearn_service.model.predict(features)
+        proba = sklearn_service.model.predict_proba(features)
+
+        assert len(results) == len(random_frames)
+        for result, label, row in zip(results, labels, proba):
+            assert result['prediction_number'] == int(label)
+            assert result['confidence'] == pytest.approx(row.max())
+
+    def test_sklearn_batch_matches_single_frames(self, random_frames):
+        """Without the engine, batch labels come from model.predict like single-frame ones"""
+        service = GestureService(settings.MODEL_PATH, settings.ENCODER_PATH, use_engine=False)
+        frames = np.random.default_rng(7).uniform(0.0, 1.0, size=(200, 63))
+        assert service.engine is None
+
+        results = service.predict_batch(frames)
+        assert [r['prediction_number'] for r in results] == [
+            service.predict(frame)['prediction_number'] for frame in frames
+        ]
+
+    def test_batch_endpoint(self, client, sample_landmarks, random_frames):
+        """The endpoint returns one prediction per frame, in order"""
+        frames = [sample_landmarks] + random_frames[:3]
+        response = client.post("/predict/batch", json={"frames": frames})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == len(frames)
+        assert [p["gesture_name"] for p in data["predictions"]] == [
+            p["gesture_name"] for p in gesture_service.predict_batch(frames)
+        ]
+
+    def test_batch_endpoint_invalid_frame(self, client, sample_landmarks):
+        """A malformed frame fails validation for the whole batch"""
+        response = client.post("/predict/batch", json={"frames": [sample_landmarks, [0.5] * 60]})
+
+        assert response.status_code == 422
@@ -0,0 +1,85 @@
+"""Tests for the application/octet-stream landmark format"""
+
+import numpy as np
+import pytest
+
+from app.main import gesture_service
+from app.utils import binary_format
+
+BINARY_HEADERS = {"Content-Type": binary_format.BINARY_CONTENT_TYPE}
+
+class TestBinaryCodec:
+    """Test cases for decoding and encoding binary bodies"""
+
+    def test_decode_round_trip(self, random_frames):
+        """Frames packed by encode_frames decode to the same float32 values"""
+        frames = binary_format.decode_frames(binary_format.encode_frames(random_frames), max_frames=64)
+
+        assert frames.shape == (len(random_frames), 63)
+        np.testing.assert_array_equal(frames, np.asarray(random_frames, dtype=np.float32))
+
+    @pytest.mark.parametrize("body, message", [
+        (b"", "multiple of 252 bytes"),
+        (b"\x00" * 250, "multiple of 252 bytes"),
+        (np.full(63, 1.5, dtype="<f4").tobytes(), "normalized between 0 and 1"),
+        (np.full(63, np.nan, dtype="<f4").tobytes(), "normalized between 0 and 1"),
+        (np.zeros((3, 63), dtype="<f4").tobytes(), "at most 2 frames"),
+    ])
+    def test_decode_rejects_invalid_bodies(self, body, message):
+        """Size, frame count, range and NaN checks all raise ValueError"""
+        with pytest.raises(ValueError, match=message):
+            binary_format.decode_frames(body, max_frames=2)
+
+    def test_record_sizes(self):
+        """Each response record is 8 bytes"""
+        assert binary_format.PREDICTION_RECORD.itemsize == 8
+        assert binary_format.MAZE_RECORD.itemsize == 8
+
+class TestBinaryEndpoints:
+    """Test cases for binary /predict and /maze-control"""
+
+    def test_predict_single_frame(self, client, sample_landmarks):
+        """A 252-byte body returns one 8-byte record matching the JSON result"""
+        expected = client.post("/predict", json={"landmarks": sample_landmarks}).json()
+        response = client.post("/predict", content=binary_format.encode_frames([sample_landmarks]),
+                               headers=BINARY_HEADERS)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == binary_format.BINARY_CONTENT_TYPE
+        record = np.frombuffer(response.content, dtype=binary_format.PREDICTION_RECORD)
+        assert len(record) == 1
+        assert record['prediction_number'][0] == expected["prediction_number"]
+        assert binary_format.MAZE_ACTIONS[record['action_code'][0]] == expected["maze_action"]
+        assert record['confidence'][0] == pytest.approx(expected["confidence"], rel=1e-6)
+
+    def test_predict_several_frames(self, client, random_frames):
+        """Frames sent back to back are answered in order"""
+        frames = random_frames[:5]
+        response = client.post("/predict", content=binary_format.encode_frames(frames), headers=BINARY_HEADERS)
+
+        records = np.frombuffer(response.content, dtype=binary_format.PREDICTION_RECORD)
+        expected = gesture_service.predict_batch(np.asarray(frames, dtype=np.float32))
+        assert records['prediction_number'].tolist() == [p["prediction_number"] for p in expected]
+
+    def test_maze_control(self, client, sample_landmarks):
+        """Binary /maze-control returns the same decision as JSON"""
+        expected = client.post("/maze-control", json={"landmarks": sample_landmarks}).json()
+        response = client.post("/maze-control", content=binary_format.encode_frames([sample_landmarks]),
+                               headers=BINARY_HEADERS)
+
+        record = np.frombuffer(response.content, dtype=binary_format.MAZE_RECORD)[0]
+        assert binary_format.MAZE_ACTIONS[record['action_code']] == expected["action"]
+        assert bool(record['is_valid']) == expected["is_valid"]
+
+    def test_invalid_binary_body(self, client):
+        """A truncated body is a 422 like invalid JSON input"""
+        response = client.post("/predict", content=b"\x00" * 100, headers=BINARY_HEADERS)
+
+        assert response.status_code == 422
+
+    def test_binary_format_schema(self, client, sklearn_service):
+        """The layout endpoint lists gestures in prediction_number order"""
+        data = client.get("/binary-format").json()
+
+        assert data["frame"]["bytes"] == 252
+        assert data["gestures"] == list(sklearn_service.label_encoder.classes_)
@@ -0,0 +1,88 @@
+"""Tests for the offline bulk scoring CLI"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.main import gesture_service, settings
+from app.services.bulk_scoring import LANDMARK_COLUMNS, main, read_chunks, score_file, score_frames
+from app.services.gesture_service import GestureService
+
+@pytest.fixture
+def frames_csv(tmp_path, random_frames):
+    path = tmp_path / "frames.csv"
+    frame = pd.DataFrame(random_frames, columns=LANDMARK_COLUMNS)
+    frame.insert(0, "id", range(len(random_frames)))
+    frame.to_csv(path, index=False)
+    return path
+
+class TestBulkScoring:
+    """Test cases for score_file and the CLI"""
+
+    def test_csv_matches_predict_batch(self, tmp_path, frames_csv, random_frames):
+        """Chunked output keeps input order and matches one predict_batch call"""
+        output = tmp_path / "predictions.csv"
+        chunks = []
+        summary = score_file(gesture_service, str(frames_csv), str(output), chunk_size=5, keep=["id"],
+                             on_chunk=lambda rows, total: chunks.append(rows))
+
+        assert summary["rows"] == 32 and summary["chunks"] == 7
+        assert chunks == [5] * 6 + [2]
+
+        scored = pd.read_csv(output)
+        expected = gesture_service.predict_batch(random_frames)
+        assert scored["id"].tolist() == list(range(32))
+        assert scored["gesture_name"].tolist() == [result["gesture_name"] for result in expected]
+        assert scored["prediction_number"].tolist() == [result["prediction_number"] for result in expected]
+        np.testing.assert_allclose(scored["confidence"], [result["confidence"] for result in expected], rtol=1e-6)
+
+    def test_ndjson_landmarks_column(self, tmp_path, random_frames):
+        """NDJSON in the API's request shape, with one unusable frame"""
+        source = tmp_path / "frames.jsonl"
+        frames = [list(frame) for frame in random_frames[:4]]
+        frames[2][10] = None
+        source.write_text("".join(json.dumps({"landmarks": frame}) + "\n" for frame in frames))
+        output = tmp_path / "predictions.ndjson"
+
+        score_file(gesture_service, str(source), str(output), chunk_size=3)
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert len(records) == 4
+        assert records[2]["gesture_name"] is None and records[2]["prediction_number"] == -1
+        expected = gesture_service.predict_batch(random_frames[:4])
+        assert records[3]["gesture_name"] == expected[3]["gesture_name"]
+
+    def test_sklearn_fallback_masks_missing_rows(self, random_frames):
+        """Without the engine, unusable rows are blanked before predict_batch sees them"""
+        service = GestureService(settings.MODEL_PATH, settings.ENCODER_PATH, use_engine=False)
+        frames = np.array(random_frames[:4], dtype=np.float32)
+        frames[1, 3] = np.nan  # an x coordinate; z values are not model features
+
+        result = score_frames(service, frames)
+
+        assert result["prediction_number"].tolist()[1] == -1 and np.isnan(result["confidence"][1])
+        expected = service.predict_batch(random_frames[:4])
+        assert result["gesture_name"][3] == expected[3]["gesture_name"]
+
+    def test_cli(self, tmp_path, frames_csv, capsys):
+        output = tmp_path / "predictions.jsonl"
+        main([str(frames_csv), str(output), "--chunk-size", "10", "--keep", "id", "--decision-mode", "dag"])
+
+        assert json.loads(capsys.readouterr().out)["rows"] == 32
+        assert len(output.read_text().splitlines()) == 32
+
+    def test_unnamed_columns_are_rejected(self, tmp_path, random_frames):
+        """Columns are not guessed by position, so a leading numeric id is never scored as a coordinate"""
+        source = tmp_path / "frames.csv"
+        frame = pd.DataFrame(random_frames, columns=[f"c{i}" for i in range(63)])
+        frame.insert(0, "id", range(len(random_frames)))
+        frame.to_csv(source, index=False)
+
+        with pytest.raises(ValueError, match="x1,y1,z1 ... z21"):
+            score_file(gesture_service, str(source), str(tmp_path / "predictions.csv"))
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            next(read_chunks(str(tmp_path / "frames.txt"), 10))
@@ -0,0 +1,98 @@
+"""Tests for the raw Starlette /predict and /maze-control routes"""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.main import app, install_fast_routes
+from app.utils import fast_json
+
+@pytest.fixture
+def fast_routes():
+    """Install the fast routes for one test and restore the router afterwards"""
+    routes = list(app.router.routes)
+    install_fast_routes(app)
+    yield
+    app.router.routes[:] = routes
+
+class TestFastJson:
+    """Test cases for the Pydantic-free parser and serializer"""
+
+    def test_parse_landmarks(self, sample_landmarks):
+        """A valid body parses to a float32 array of 63 values"""
+        landmarks = fast_json.parse_landmarks(json.dumps({"landmarks": sample_landmarks}).encode())
+
+        assert landmarks.dtype == np.float32
+        np.testing.assert_array_equal(landmarks, np.asarray(sample_landmarks, dtype=np.float32))
+
+    @pytest.mark.parametrize("body, error_type", [
+        (b"{", "json_invalid"),
+        (b"{}", "missing"),
+        (b'{"landmarks": 1}', "list_type"),
+        (b'{"landmarks": [0.5]}', "too_short"),
+        (json.dumps({"landmarks": [0.5] * 64}).encode(), "too_long"),
+        (json.dumps({"landmarks": ["x"] * 63}).encode(), "float_parsing"),
+        (json.dumps({"landmarks": [1.5] * 63}).encode(), "value_error"),
+    ])
+    def test_parse_rejects_invalid_bodies(self, body, error_type):
+        """Each invalid body raises with the matching FastAPI error type"""
+        with pytest.raises(fast_json.LandmarkValidationError) as excinfo:
+            fast_json.parse_landmarks(body)
+        assert excinfo.value.errors[0]["type"] == error_type
+
+    def test_serializer_matches_json(self):
+        """Serialized responses decode to the same values as json.dumps"""
+        serializer = fast_json.ResponseSerializer()
+        prediction = {"gesture_name": "like", "maze_action": "UP", "confidence": 0.123456789, "prediction_number": 4}
+        decision = {"action": "UP", "gesture": "like", "confidence": 0.9, "is_valid": True, "threshold": 0.7}
+
+        assert json.loads(serializer.prediction(prediction)) == prediction
+        assert json.loads(serializer.maze(decision)) == decision
+
+class TestFastRoutes:
+    """Test cases for the installed fast routes"""
+
+    @pytest.mark.parametrize("path", ["/predict", "/maze-control", "/maze-control?calibrated=true"])
+    def test_same_body_as_fastapi_route(self, client, path, sample_landmarks, fast_routes):
+        """Fast routes return the same JSON as the FastAPI routes"""
+        payload = {"landmarks": sample_landmarks}
+        fast = client.post(path, json=payload)
+        app.router.routes[:2] = []  # fall back to the FastAPI routes
+        standard = client.post(path, json=payload)
+
+        assert fast.status_code == standard.status_code == 200
+        assert fast.json() == standard.json()
+
+    @pytest.mark.parametrize("body", [
+        b"",
+        b"{",
+        b"[]",
+        b"{}",
+        b'{"landmarks": 1}',
+        json.dumps({"landmarks": [0.5] * 10}).encode(),
+        json.dumps({"landmarks": [0.5] * 64}).encode(),
+        json.dumps({"landmarks": ["x"] * 63}).encode(),
+        json.dumps({"landmarks": [None] * 63}).encode(),
+        json.dumps({"landmarks": [[0.5]] * 63}).encode(),
+        json.dumps({"landmarks": [0.5] * 62 + [[0.5]]}).encode(),
+        json.dumps({"landmarks": [1.5] * 63}).encode(),
+        b'{"landmarks": [1' + b"0" * 400 + b", 0.5" * 62 + b"]}",
+    ])
+    def test_invalid_input_returns_422(self, client, body, fast_routes):
+        """Validation errors have the same status code and body as the FastAPI route"""
+        headers = {"content-type": "application/json"}
+        fast = client.post("/predict", content=body, headers=headers)
+        app.router.routes[:2] = []
+        standard = client.post("/predict", content=body, headers=headers)
+
+        assert fast.status_code == standard.status_code == 422
+        assert fast.json() == standard.json()
+
+    def test_nan_is_rejected(self, client, fast_routes):
+        """NaN, which GestureInput lets through, gets a value_error in the same shape"""
+        body = b'{"landmarks": [' + b"0.5," * 62 + b"NaN]}"
+        detail = client.post("/predict", content=body, headers={"content-type": "application/json"}).json()["detail"]
+
+        assert [error["type"] for error in detail] == ["value_error"]
+        assert set(detail[0]) == {"type", "loc", "msg", "input", "ctx"}
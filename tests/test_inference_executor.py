@@ -0,0 +1,125 @@
+"""Tests for running inference off the event loop"""
+
+import asyncio
+import time
+
+import pytest
+
+import app.services.inference_executor as inference_executor
+from app.main import gesture_service
+from app.services.inference_executor import InferenceExecutor
+
+class SlowService:
+    """Stand-in service whose batch call blocks like a long kernel evaluation"""
+    model_path = encoder_path = None
+
+    def predict_batch(self, frames, decision_mode="full"):
+        time.sleep(0.2)
+        return [{"frame": i} for i in range(len(frames))]
+
+class TestInferenceExecutor:
+    """Test cases for InferenceExecutor"""
+
+    def test_unknown_backend(self):
+        """Only the documented backends are accepted"""
+        with pytest.raises(ValueError, match="Unknown executor backend"):
+            InferenceExecutor(gesture_service, backend="gpu")
+
+    def test_event_loop_stays_responsive(self):
+        """A blocking inference does not stall other coroutines on the loop"""
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            executor = InferenceExecutor(SlowService(), backend="thread", max_workers=1)
+            started = time.monotonic()
+            results, _ = await asyncio.gather(executor.predict_batch([[0.5] * 63]), ticker())
+            executor.shutdown()
+            return started, results
+
+        started, results = asyncio.run(scenario())
+        assert results == [{"frame": 0}]
+        assert ticks[-1] - started < 0.15
+
+    def test_bounded_concurrency_reports_queue_wait(self):
+        """Jobs beyond max_concurrency wait, and that wait is reported"""
+        waits = []
+
+        async def scenario():
+            executor = InferenceExecutor(SlowService(), backend="thread", max_workers=2,
+                                         max_concurrency=1, on_queue_wait=waits.append)
+            await asyncio.gather(*(executor.predict_batch([[0.5] * 63]) for _ in range(2)))
+            executor.shutdown()
+
+        asyncio.run(scenario())
+        assert len(waits) == 2
+        assert max(waits) >= 0.15
+
+    @pytest.mark.parametrize("backend", ["inline", "thread", "process"])
+    def test_backends_match_service(self, backend, random_frames):
+        """Every backend returns the service's own batch predictions"""
+        frames = random_frames[:4]
+
+        async def scenario():
+            executor = InferenceExecutor(gesture_service, backend=backend, max_workers=1)
+            results = await executor.predict_batch(frames)
+            executor.shutdown()
+            return results
+
+        assert asyncio.run(scenario()) == gesture_service.predict_batch(frames)
+
+    def test_inline_reports_service_time(self):
+        """Inline calls feed admission control's service time, though nothing queues"""
+        service_times, waits = [], []
+
+        async def scenario():
+            executor = InferenceExecutor(SlowService(), backend="inline",
+                                         on_service_time=service_times.append, on_queue_wait=waits.append)
+            return await executor.predict_batch([[0.5] * 63])
+
+        assert asyncio.run(scenario()) == [{"frame": 0}]
+        assert len(service_times) == 1 and service_times[0] >= 0.15
+        assert waits == []
+
+def failing_init_worker(*args):
+    raise RuntimeError("model files are unreadable")
+
+class TestRecycle:
+    """Test cases for replacing worker processes after a model reload"""
+
+    def test_process_pool_swapped_once_loaded(self, random_frames):
+        """The new process pool is installed only after its workers have loaded the model"""
+        async def scenario():
+            executor = InferenceExecutor(gesture_service, backend="process", max_workers=2)
+            executor.start()
+            old = executor._pool
+            await executor.recycle()
+            new = executor._pool
+            started = len(new._processes)  # spawned before the swap
+            results = await executor.predict_batch(random_frames[:4])
+            executor.shutdown()
+            return old, new, started, results
+
+        old, new, started, results = asyncio.run(scenario())
+        assert new is not old and started == 2
+        assert results == gesture_service.predict_batch(random_frames[:4])
+
+    def test_failed_start_keeps_old_pool(self, monkeypatch, random_frames):
+        """When the new workers cannot load the model the old pool keeps serving"""
+        async def scenario():
+            executor = InferenceExecutor(gesture_service, backend="process", max_workers=1)
+            await executor.predict_batch(random_frames[:1])
+            old = executor._pool
+            monkeypatch.setattr(inference_executor, "_init_worker", failing_init_worker)
+            with pytest.raises(RuntimeError, match="failed to start"):
+                await executor.recycle(timeout=30)
+            assert executor._pool is old
+            results = await executor.predict_batch(random_frames[:4])
+            executor.shutdown()
+            return results
+
+        assert asyncio.run(scenario()) == gesture_service.predict_batch(random_frames[:4])
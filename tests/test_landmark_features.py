@@ -0,0 +1,103 @@
+"""Tests for the shared landmark feature kernel, pinned against the transforms it replaced"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.main import gesture_service
+from app.utils.landmark_features import SMALL_BATCH, PreprocessScratch, normalize_landmarks, thread_scratch
+from app.utils.preprocessing import process_hand_landmarks_frame, process_hand_landmarks_xy
+
+def legacy_training(row):
+    """app/utils/preprocessing.process_hand_landmarks_xy before the shared kernel"""
+    arr = np.array(row).reshape(21, 3)[:, :2].astype(float)
+    wrist = arr[0, :].copy()
+    arr = arr - wrist
+    scale = np.linalg.norm(arr[11, :].copy())
+    if scale == 0:
+        scale = 1.0
+    return (arr / scale).flatten()
+
+def legacy_single(landmarks):
+    """GestureService.preprocess_landmarks before the shared kernel"""
+    xy = np.array(landmarks, dtype=np.float32).reshape(21, 3)[:, :2]
+    rel = xy - xy[0, :]
+    scale = np.linalg.norm(rel[11, :])
+    if scale == 0:
+        scale = 1.0
+    return (rel / scale).flatten()
+
+def legacy_batch(frames):
+    """GestureService.preprocess_batch before the shared kernel"""
+    frames = np.asarray(frames, dtype=np.float32)
+    xy = frames.reshape(-1, 21, 3)[:, :, :2]
+    rel = xy - xy[:, :1, :]
+    scale = np.linalg.norm(rel[:, 11, :], axis=1)
+    scale[scale == 0] = 1.0
+    return (rel / scale[:, None, None]).reshape(len(frames), 42)
+
+@pytest.fixture(scope="module")
+def frames():
+    """Random frames plus a degenerate one whose mid-finger tip sits on the wrist"""
+    rng = np.random.default_rng(7)
+    frames = rng.uniform(0.0, 1.0, size=(2000, 63))
+    frames[0] = 0.5
+    return frames
+
+class TestParity:
+    """The kernel reproduces every previous implementation bit for bit"""
+
+    def test_training(self, frames):
+        columns = [f"{axis}{i}" for i in range(1, 22) for axis in "xyz"]
+        table = pd.DataFrame(frames, columns=columns)
+        expected = np.stack([legacy_training(row) for _, row in table.iterrows()])
+
+        per_row = np.stack([process_hand_landmarks_xy(row) for _, row in table.iterrows()])
+        assert per_row.dtype == np.float64
+        np.testing.assert_array_equal(per_row, expected)
+        np.testing.assert_array_equal(process_hand_landmarks_frame(table), expected)
+
+    def test_serving_single(self, frames):
+        for frame in frames[:500]:
+            features = gesture_service.preprocess_landmarks(frame.tolist())
+            assert features.dtype == np.float32 and features.shape == (42,)
+            np.testing.assert_array_equal(features, legacy_single(frame.tolist()))
+
+    def test_serving_batch(self, frames):
+        np.testing.assert_array_equal(gesture_service.preprocess_batch(frames), legacy_batch(frames))
+
+    @pytest.mark.parametrize("n", [1, 2, SMALL_BATCH, SMALL_BATCH + 1])
+    def test_every_batch_size_path(self, frames, n):
+        """Single frames, small batches and large batches take different routes to the same values"""
+        np.testing.assert_array_equal(normalize_landmarks(frames[:n]), legacy_batch(frames[:n]))
+        np.testing.assert_array_equal(normalize_landmarks(frames[:n], dtype=np.float64),
+                                      np.stack([legacy_training(frame) for frame in frames[:n]]))
+
+class TestKernel:
+    """Test cases for out= and scratch reuse"""
+
+    def test_writes_into_out(self, frames):
+        out = np.empty((10, 42), np.float32)
+        assert normalize_landmarks(frames[:10], out=out) is out
+        np.testing.assert_array_equal(out, legacy_batch(frames[:10]))
+
+    def test_rejects_bad_out(self, frames):
+        with pytest.raises(ValueError, match="C-contiguous"):
+            normalize_landmarks(frames[:10], out=np.empty((42, 10), np.float32).T)
+        with pytest.raises(ValueError, match="Scratch"):
+            normalize_landmarks(frames[:10], scratch=PreprocessScratch(np.float64))
+
+    def test_scratch_reused_and_per_thread(self, frames):
+        scratch = PreprocessScratch()
+        normalize_landmarks(frames[:100], scratch=scratch)
+        buffer = scratch.buffers(1)[0].base
+        normalize_landmarks(frames[:50], scratch=scratch)
+        assert scratch.buffers(1)[0].base is buffer
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(thread_scratch(np.dtype(np.float32))))
+        thread.start()
+        thread.join()
+        assert other[0] is not thread_scratch(np.dtype(np.float32))
@@ -0,0 +1,95 @@
+"""Tests for the queued, sampled logging pipeline"""
+
+import json
+import logging
+import queue
+import sys
+
+import pytest
+
+from app.utils import log_pipeline
+from app.utils.log_pipeline import ErrorRateLimitFilter, JSONFormatter, LogPipeline, NonBlockingQueueHandler
+
+def make_record(msg: str, level: int = logging.ERROR, name: str = "test") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, (), None)
+
+@pytest.fixture
+def sample_rates(monkeypatch):
+    rates = {}
+    monkeypatch.setattr(log_pipeline, "_sample_rates", rates)
+    return rates
+
+class TestSampling:
+    """Test cases for per-event sampling"""
+
+    def test_parse_sample_rates(self):
+        assert log_pipeline.parse_sample_rates("prediction=0.01, maze=0.5,") == {"prediction": 0.01, "maze": 0.5}
+        assert log_pipeline.parse_sample_rates("") == {}
+
+    def test_log_event_respects_rate(self, sample_rates, caplog):
+        """Events at rate 0 are skipped before a record exists; unknown events are always logged"""
+        logger = logging.getLogger("test.sampling")
+        sample_rates["noisy"] = 0.0
+        with caplog.at_level(logging.INFO, logger="test.sampling"):
+            log_pipeline.log_event(logger, "noisy", "dropped")
+            log_pipeline.log_event(logger, "rare", "kept %d", 1, detail="x")
+        assert [record.getMessage() for record in caplog.records] == ["kept 1"]
+        assert caplog.records[0].event == "rare" and caplog.records[0].detail == "x"
+
+class TestErrorRateLimitFilter:
+    """Test cases for rate-limited error logging"""
+
+    def test_limits_per_message(self, fake_clock):
+        """Repeats of one message are capped per interval; the next window reports the suppressed count"""
+        limiter = ErrorRateLimitFilter(max_per_interval=2, interval=60, clock=fake_clock)
+        assert [limiter.filter(make_record("boom %s")) for _ in range(4)] == [True, True, False, False]
+        assert limiter.filter(make_record("other"))
+        assert limiter.filter(make_record("boom %s", level=logging.INFO))
+
+        fake_clock.now += 60
+        record = make_record("boom %s")
+        assert limiter.filter(record)
+        assert record.suppressed == 2
+
+    def test_key_table_bounded(self, fake_clock):
+        limiter = ErrorRateLimitFilter(max_per_interval=1, max_keys=3, clock=fake_clock)
+        for i in range(10):
+            assert limiter.filter(make_record(f"unique {i}"))
+        assert len(limiter._windows) <= 3
+
+class TestQueueing:
+    """Test cases for the non-blocking handler and the listener thread"""
+
+    def test_full_queue_drops(self):
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        handler.handle(make_record("a"))
+        handler.handle(make_record("b"))
+        assert handler.dropped == 1
+        assert handler.queue.get_nowait().msg == "a"
+
+    def test_listener_writes_json(self, capsys):
+        """Records are formatted and written by the listener thread"""
+        pipeline = LogPipeline(fmt="json")
+        logger = logging.getLogger("test.listener")
+        logger.propagate = False
+        logger.addHandler(pipeline.handler)
+        try:
+            pipeline._start_listener()
+            logger.warning("hello %s", "world", extra={"event": "greeting"})
+            pipeline.stop()
+        finally:
+            logger.removeHandler(pipeline.handler)
+            logger.propagate = True
+
+        entry = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+        assert entry["msg"] == "hello world"
+        assert entry["level"] == "WARNING"
+        assert entry["event"] == "greeting"
+
+    def test_json_formatter_exception(self):
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            record = logging.LogRecord("test", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        entry = json.loads(JSONFormatter().format(record))
+        assert "ValueError: bad" in entry["exc_info"]
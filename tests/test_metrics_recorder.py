@@ -0,0 +1,89 @@
+"""Tests for pre-bound, batched counters and the cached /metrics exposition"""
+
+import asyncio
+from datetime import datetime
+
+from prometheus_client import CollectorRegistry, Counter
+
+from app.main import monitoring_service
+from app.services.monitoring_service import BoundCounter, MetricsExporter
+
+def make_counter() -> Counter:
+    return Counter("test_events_total", "Test events", ["kind"], registry=CollectorRegistry())
+
+def value(counter: Counter, kind: str) -> float:
+    return counter.labels(kind)._value.get()
+
+class TestBoundCounter:
+    """Test cases for BoundCounter"""
+
+    def test_known_values_bound_up_front(self):
+        """Known label values have a series before the first increment"""
+        counter = make_counter()
+        BoundCounter(counter, ["a", "b"])
+        samples = {sample.labels["kind"] for sample in counter.collect()[0].samples if sample.name.endswith("_total")}
+        assert samples == {"a", "b"}
+
+    def test_write_through(self):
+        counter = make_counter()
+        counts = BoundCounter(counter, ["a"])
+        counts.inc("a")
+        counts.inc("new")  # unknown values are bound on first use
+        assert value(counter, "a") == 1
+        assert value(counter, "new") == 1
+
+    def test_batched_until_flush(self):
+        """Batched increments reach Prometheus only when flushed"""
+        counter = make_counter()
+        counts = BoundCounter(counter, ["a"], batched=True)
+        for _ in range(3):
+            counts.inc("a")
+        counts.inc("b")
+        assert value(counter, "a") == 0
+
+        counts.flush()
+        assert value(counter, "a") == 3
+        assert value(counter, "b") == 1
+        counts.flush()
+        assert value(counter, "a") == 3
+
+class TestMetricsExporter:
+    """Test cases for the cached exposition"""
+
+    def test_cached_within_ttl(self, fake_clock):
+        exporter = MetricsExporter(ttl=5, clock=fake_clock)
+        assert exporter.expired()
+        body = exporter.render()
+        assert b"gesture_predictions_total" in body
+
+        monitoring_service.record_model_load("artifact", 0.123)
+        fake_clock.now += 1
+        assert not exporter.expired()
+        assert exporter.render() is body
+
+        fake_clock.now += 5
+        assert exporter.render() is not body
+
+class TestMonitoringService:
+    """Test cases for the application's MonitoringService"""
+
+    def test_batched_predictions_flushed(self):
+        """Per-request counters are batched in the app and applied by the flusher task"""
+        assert monitoring_service.batch_counters
+        monitoring_service.flush()
+        before = monitoring_service.gesture_predictions.labels("like")._value.get()
+        monitoring_service.increment_prediction("like")
+        monitoring_service.increment_prediction("like")
+        assert monitoring_service.gesture_predictions.labels("like")._value.get() == before
+
+        async def run():
+            flusher = asyncio.ensure_future(monitoring_service.flush_periodically(60))
+            await asyncio.sleep(0)
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+
+        asyncio.run(run())  # cancelling flushes one last time
+        assert monitoring_service.gesture_predictions.labels("like")._value.get() == before + 2
+
+    def test_timestamp_is_timezone_aware(self):
+        assert datetime.fromisoformat(monitoring_service.get_timestamp()).tzinfo is not None
@@ -0,0 +1,72 @@
+"""Tests for the micro-batching scheduler"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, gesture_service
+from app.services.batching_service import MicroBatcher
+
+class TestMicroBatcher:
+    """Test cases for MicroBatcher"""
+
+    def test_concurrent_requests_share_one_batch(self):
+        """Frames submitted together are scored in one call, each caller gets its own result"""
+        calls = []
+
+        def batch_fn(items):
+            calls.append(list(items))
+            return [item * 10 for item in items]
+
+        async def scenario():
+            batcher = MicroBatcher(batch_fn, max_batch_size=16, window_us=20_000)
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+            await batcher.stop()
+            return results
+
+        assert asyncio.run(scenario()) == [0, 10, 20, 30, 40]
+        assert calls == [[0, 1, 2, 3, 4]]
+
+    def test_flush_on_size_limit(self):
+        """A full batch is flushed without waiting for the window"""
+        sizes = []
+
+        async def scenario():
+            batcher = MicroBatcher(lambda items: items, max_batch_size=2,
+                                   window_us=10_000_000, on_flush=sizes.append)
+            results = await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1
+            )
+            await batcher.stop()
+            return results
+
+        assert asyncio.run(scenario()) == [0, 1, 2, 3]
+        assert sizes == [2, 2]
+
+    def test_batch_failure_reaches_every_caller(self):
+        """An error in the batch function is raised to all callers in that batch"""
+        def batch_fn(items):
+            raise RuntimeError("boom")
+
+        async def scenario():
+            batcher = MicroBatcher(batch_fn, window_us=1_000)
+            results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_invalid_batch_size(self):
+        """A batch size below one is rejected"""
+        with pytest.raises(ValueError):
+            MicroBatcher(lambda items: items, max_batch_size=0)
+
+    def test_predict_endpoint_through_batcher(self, sample_landmarks):
+        """/predict answers through the scheduler with the batch model result"""
+        with TestClient(app) as client:
+            response = client.post("/predict", json={"landmarks": sample_landmarks})
+
+        assert response.status_code == 200
+        assert response.json() == gesture_service.predict_batch([sample_landmarks])[0]
@@ -0,0 +1,54 @@
+"""Tests for the precompiled, memory-mapped model artifact"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from app.main import gesture_service, settings
+from app.services import model_artifact
+from app.services.gesture_service import GestureService
+
+class TestModelArtifact:
+    """Test cases for compiling and loading the model artifact"""
+
+    def test_artifact_matches_pickled_model(self, tmp_path, random_frames):
+        """The artifact engine returns the same labels and confidences as the pickle-compiled one"""
+        path = model_artifact.ensure_artifact(settings.MODEL_PATH, settings.ENCODER_PATH, str(tmp_path))
+        engine = model_artifact.load_artifact(path, gesture_service.gesture_to_action)
+        reference = GestureService(settings.MODEL_PATH, settings.ENCODER_PATH).engine
+
+        features = gesture_service.preprocess_batch(random_frames)
+        labels, confidences = engine.predict(features)
+        expected_labels, expected_confidences = reference.predict(features)
+
+        np.testing.assert_array_equal(labels, expected_labels)
+        np.testing.assert_allclose(confidences, expected_confidences, rtol=0, atol=1e-12)
+        assert engine.class_actions == reference.class_actions
+        assert isinstance(np.load(os.path.join(path, "support_vectors.npy"), mmap_mode="r"), np.memmap)
+
+    def test_artifact_cached_by_source_hash(self, tmp_path):
+        """A second run reuses the compiled artifact for the same pickles"""
+        first = model_artifact.ensure_artifact(settings.MODEL_PATH, settings.ENCODER_PATH, str(tmp_path))
+        manifest = os.path.join(first, model_artifact.MANIFEST_NAME)
+        mtime = os.stat(manifest).st_mtime_ns
+        second = model_artifact.ensure_artifact(settings.MODEL_PATH, settings.ENCODER_PATH, str(tmp_path))
+
+        assert first == second
+        assert os.stat(manifest).st_mtime_ns == mtime
+        assert os.path.basename(first).startswith(model_artifact.source_hash(settings.MODEL_PATH, settings.ENCODER_PATH)[:16])
+
+    def test_load_does_not_import_sklearn(self, tmp_path):
+        """Loading from a compiled artifact skips sklearn entirely"""
+        model_artifact.ensure_artifact(settings.MODEL_PATH, settings.ENCODER_PATH, str(tmp_path))
+        code = (
+            "import sys\n"
+            "from app.services.gesture_service import GestureService\n"
+            f"service = GestureService({settings.MODEL_PATH!r}, {settings.ENCODER_PATH!r}, artifact_dir={str(tmp_path)!r})\n"
+            "service.predict([0.5] * 63)\n"
+            "assert service.load_source == 'artifact', service.load_source\n"
+            "assert 'sklearn' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
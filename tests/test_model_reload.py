@@ -0,0 +1,199 @@
+"""Tests for hot-reloading the model: GestureService.reload, the file watcher and /admin/reload-model"""
+
+import asyncio
+import shutil
+import threading
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.svm import SVC
+
+import app.main as main
+from app.main import settings
+from app.services.gesture_service import GestureService, ModelReloadError
+from app.services.model_reloader import ModelReloader, ReloadInProgress
+
+@pytest.fixture
+def model_files(tmp_path):
+    """Copies of the model and encoder pickles that a test may replace"""
+    model_path, encoder_path = tmp_path / "model.pkl", tmp_path / "encoder.pkl"
+    shutil.copy(settings.MODEL_PATH, model_path)
+    shutil.copy(settings.ENCODER_PATH, encoder_path)
+    return model_path, encoder_path
+
+@pytest.fixture
+def service(model_files, tmp_path):
+    model_path, encoder_path = model_files
+    return GestureService(str(model_path), str(encoder_path), artifact_dir=str(tmp_path / "compiled"))
+
+def write_new_version(model_path):
+    """The same estimator pickled differently: a new version that predicts like the old one"""
+    joblib.dump(joblib.load(settings.MODEL_PATH), model_path, compress=3)
+
+class TestGestureServiceReload:
+    """Test cases for GestureService.reload"""
+
+    def test_unchanged_files_are_not_reloaded(self, service):
+        loaded = service._loaded
+        assert not service.reload()
+        assert service._loaded is loaded
+
+    def test_swaps_in_new_version(self, service, model_files, random_frames):
+        before = service.predict_batch(random_frames)
+        old_version = service.model_version
+        write_new_version(model_files[0])
+
+        assert service.reload()
+        assert service.model_version != old_version
+        assert service.load_source == "artifact"
+        assert service.predict_batch(random_frames) == before
+
+    def test_rejects_wrong_feature_count(self, service, model_files, sample_landmarks):
+        rng = np.random.default_rng(0)
+        model = SVC(probability=True).fit(rng.normal(size=(60, 10)), np.arange(60) % 3)
+        joblib.dump(model, model_files[0])
+        loaded = service._loaded
+
+        with pytest.raises(ModelReloadError, match="expects 10 features"):
+            service.reload()
+        assert service._loaded is loaded
+        assert service.predict(sample_landmarks)["gesture_name"]
+
+    def test_rejects_unloadable_files(self, service, model_files):
+        model_files[0].write_bytes(b"not a pickle")
+        version = service.model_version
+
+        with pytest.raises(ModelReloadError, match="could not be loaded"):
+            service.reload()
+        assert service.model_version == version
+
+    def test_in_flight_call_finishes_on_old_model(self, service, model_files, random_frames):
+        """A call that started before the swap keeps the engine it started with"""
+        started, release = threading.Event(), threading.Event()
+        engines = []
+
+        class BlockingScorer:
+            def score(self, call, features):
+                engines.append(call.keywords["engine"])
+                started.set()
+                release.wait(5)
+                return call(features)
+
+        old_engine = service.engine
+        service.scorer = BlockingScorer()
+        results = []
+        worker = threading.Thread(target=lambda: results.append(service.predict_batch(random_frames)))
+        worker.start()
+        assert started.wait(5)
+
+        write_new_version(model_files[0])
+        service.scorer = None  # the warm-up runs unblocked
+        assert service.reload()
+        release.set()
+        worker.join(5)
+
+        assert engines[0] is old_engine and service.engine is not old_engine
+        assert len(results[0]) == len(random_frames)
+
+class TestModelReloader:
+    """Test cases for reload coordination and the file watcher"""
+
+    def test_reports_outcomes(self, service, model_files):
+        outcomes = []
+        swaps = []
+
+        async def on_swap():
+            swaps.append(service.model_version)
+
+        reloader = ModelReloader(service, on_swap=on_swap, on_reload=lambda outcome, _: outcomes.append(outcome))
+        assert asyncio.run(reloader.reload())["outcome"] == "unchanged"
+
+        write_new_version(model_files[0])
+        summary = asyncio.run(reloader.reload())
+        assert summary["outcome"] == "swapped"
+        assert summary["previous_version"] != summary["version"] == swaps[0]
+
+        model_files[0].write_bytes(b"not a pickle")
+        with pytest.raises(ModelReloadError):
+            asyncio.run(reloader.reload())
+        assert outcomes == ["unchanged", "swapped", "rejected"]
+        assert reloader.last_reload["version"] == swaps[0]
+
+    def test_one_reload_at_a_time(self, service):
+        reloader = ModelReloader(service)
+        reloader._reloading = True
+        with pytest.raises(ReloadInProgress):
+            asyncio.run(reloader.reload())
+
+    def test_watcher_reloads_changed_files(self, service, model_files):
+        old_version = service.model_version
+
+        async def scenario():
+            reloader = ModelReloader(service, interval=0.02)
+            reloader.start()
+            await asyncio.sleep(0.05)
+            write_new_version(model_files[0])
+            for _ in range(200):
+                await asyncio.sleep(0.02)
+                if reloader.last_reload is not None:
+                    break
+            await reloader.stop()
+            return reloader.last_reload
+
+        last_reload = asyncio.run(scenario())
+        assert last_reload["trigger"] == "watch"
+        assert last_reload["outcome"] == "swapped"
+        assert service.model_version != old_version
+
+class TestModelVersionMetric:
+    """Test cases for the active model version gauge"""
+
+    def test_replaced_version_set_to_zero(self):
+        monitoring = main.monitoring_service
+        gauge = monitoring.model_version_info
+        try:
+            monitoring.set_model_version("aaaa", "artifact")
+            monitoring.set_model_version("bbbb", "artifact")
+            assert gauge.labels("aaaa", "artifact")._value.get() == 0
+            assert gauge.labels("bbbb", "artifact")._value.get() == 1
+        finally:
+            monitoring.set_model_version(main.gesture_service.model_version, main.gesture_service.load_source)
+
+class TestReloadEndpoint:
+    """Test cases for /admin/reload-model and /admin/model"""
+
+    def test_disabled_without_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+        assert client.post("/admin/reload-model").status_code == 404
+
+    def test_rejects_wrong_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        assert client.post("/admin/reload-model", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+    def test_unchanged_reload(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        response = client.post("/admin/reload-model", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 200
+        assert response.json()["outcome"] == "unchanged"
+        status = client.get("/admin/model", headers={"X-Admin-Token": "secret"}).json()
+        assert status["version"] == main.gesture_service.model_version
+        assert status["last_reload"]["trigger"] == "admin"
+
+    def test_conflict_while_reloading(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(main.model_reloader, "_reloading", True)
+        assert client.post("/admin/reload-model", headers={"X-Admin-Token": "secret"}).status_code == 409
+
+    def test_rejected_model_keeps_serving(self, client, monkeypatch, sample_landmarks):
+        def reject():
+            raise ModelReloadError("The new model expects 10 features, preprocessing produces 42")
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(main.gesture_service, "reload", reject)
+        response = client.post("/admin/reload-model", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 422
+        assert "10 features" in response.json()["detail"]
+        assert client.post("/predict", json={"landmarks": sample_landmarks}).status_code == 200
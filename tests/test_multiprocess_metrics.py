@@ -0,0 +1,47 @@
+"""Tests for Prometheus multiprocess mode across workers"""
+
+import os
+import subprocess
+import sys
+
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+
+from app.services.monitoring_service import MonitoringService
+
+WORKER = (
+    "from app.services.monitoring_service import MonitoringService\n"
+    "monitoring = MonitoringService()\n"
+    "for _ in range(3):\n"
+    "    monitoring.increment_prediction('like')\n"
+    "monitoring.websocket_opened()\n"
+)
+
+class TestMultiprocessMetrics:
+    """Test cases for MonitoringService with PROMETHEUS_MULTIPROC_DIR"""
+
+    def test_counters_add_up_across_workers(self, tmp_path, monkeypatch):
+        """Counters from separate worker processes are summed, dead workers' live gauges dropped"""
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        pids = []
+        for _ in range(2):
+            worker = subprocess.Popen([sys.executable, "-c", WORKER], env=env)
+            assert worker.wait() == 0
+            pids.append(worker.pid)
+
+        def scrape():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+            return generate_latest(registry).decode()
+
+        output = scrape()
+        assert 'gesture_predictions_total{gesture_name="like"} 6.0' in output
+        assert "websocket_connections 2.0" in output
+        assert "hand_gesture_api_info{" in output
+
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        for pid in pids:
+            MonitoringService.mark_process_dead(pid)
+
+        output = scrape()
+        assert 'gesture_predictions_total{gesture_name="like"} 6.0' in output
+        assert "websocket_connections 2.0" not in output
@@ -0,0 +1,76 @@
+"""Tests for chunked, multi-threaded batch scoring"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from app.main import gesture_service
+from app.services.parallel_scorer import ParallelScorer
+
+def row_ids(features):
+    """Fake predict: the first feature as the label, tagged with the scoring thread"""
+    row_ids.threads.add(threading.current_thread().name)
+    return features[:, 0].astype(np.intp), features[:, 1].copy()
+
+@pytest.fixture
+def features():
+    ids = np.arange(1000, dtype=np.float64)
+    return np.column_stack([ids, ids / 1000.0])
+
+@pytest.fixture
+def scorer():
+    scorer = ParallelScorer(threads=4, chunk_rows=64)
+    yield scorer
+    scorer.shutdown()
+
+class TestParallelScorer:
+    """Test cases for ParallelScorer"""
+
+    def test_chunks_cover_rows_in_order(self, scorer):
+        chunks = scorer.chunks(1000)
+        assert [c.start for c in chunks] == list(range(0, 1000, 64))
+        assert chunks[-1].stop == 1000
+        # Small batches are still split across every thread
+        assert len(scorer.chunks(200)) == 4
+
+    def test_results_in_input_order(self, scorer, features):
+        row_ids.threads = set()
+        labels, confidences = scorer.score(row_ids, features)
+
+        np.testing.assert_array_equal(labels, np.arange(1000))
+        np.testing.assert_array_equal(confidences, features[:, 1])
+        assert all(name.startswith("scorer") for name in row_ids.threads)
+
+    def test_small_batches_stay_on_caller(self, scorer, features):
+        row_ids.threads = set()
+        scorer.score(row_ids, features[:100])  # under min_rows: serial chunks
+        assert row_ids.threads == {threading.current_thread().name}
+
+    def test_chunk_errors_propagate(self, scorer, features):
+        def failing(chunk):
+            if chunk[0, 0] >= 500:
+                raise ValueError("bad chunk")
+            return row_ids(chunk)
+
+        with pytest.raises(ValueError, match="bad chunk"):
+            scorer.score(failing, features)
+
+    def test_new_pool_after_fork(self, scorer, features):
+        scorer.score(row_ids, features)
+        pool = scorer._pool
+        scorer._pool_pid = -1  # as seen from a forked child
+        scorer.score(row_ids, features)
+        assert scorer._pool is not pool
+        pool.shutdown()
+
+    @pytest.mark.parametrize("mode", ["full", "dag"])
+    def test_engine_matches_single_call(self, scorer, random_frames, mode):
+        """Chunked scoring gives the same predictions as one engine call"""
+        frames = np.tile(np.asarray(random_frames), (10, 1))  # 320 rows, 5 chunks
+        features = gesture_service.preprocess_batch(frames)
+        expected = gesture_service._engine_call(features, mode)
+
+        labels, confidences = scorer.score(lambda chunk: gesture_service._engine_call(chunk, mode), features)
+        np.testing.assert_array_equal(labels, expected[0])
+        np.testing.assert_allclose(confidences, expected[1], rtol=1e-9)
@@ -0,0 +1,126 @@
+"""Tests for the quantized prediction cache"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.main import gesture_service, monitoring_service, prediction_cache
+from app.services.prediction_cache import PredictionCache
+
+class TestPredictionCache:
+    """Test cases for PredictionCache"""
+
+    def test_same_pose_shares_a_key(self, sample_landmarks):
+        """Translating and scaling the hand does not change the key"""
+        cache = PredictionCache(resolution=0.01)
+        frame = np.asarray(sample_landmarks).reshape(21, 3)
+        moved = frame.copy()
+        moved[:, :2] = (frame[:, :2] - frame[0, :2]) * 0.5 + [0.3, 0.4]
+
+        keys = [cache.key(features) for features in gesture_service.preprocess_batch([frame.ravel(), moved.ravel()])]
+        assert keys[0] == keys[1]
+        assert cache.key(gesture_service.preprocess_batch([frame.ravel()])[0], "dag") != keys[0]
+
+    def test_hit_miss_and_lru_eviction(self):
+        """Results are reused, and the least recently used entry is evicted first"""
+        counts = {"hit": 0, "miss": 0, "eviction": 0}
+        cache = PredictionCache(
+            max_entries=2,
+            on_hit=lambda: counts.__setitem__("hit", counts["hit"] + 1),
+            on_miss=lambda: counts.__setitem__("miss", counts["miss"] + 1),
+            on_eviction=lambda: counts.__setitem__("eviction", counts["eviction"] + 1),
+        )
+
+        async def value(v):
+            return v
+
+        async def scenario():
+            for key in ["a", "b", "a", "c"]:  # "b" is the least recently used when "c" arrives
+                await cache.get_or_compute(key, lambda: value(key))
+            return await cache.get_or_compute("b", lambda: value("b2"))
+
+        assert asyncio.run(scenario()) == "b2"
+        assert counts == {"hit": 1, "miss": 4, "eviction": 2}
+        assert len(cache) == 2
+
+    def test_concurrent_lookups_compute_once(self):
+        """Identical lookups in flight at the same time share one computation"""
+        cache = PredictionCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def scenario():
+            return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+        assert asyncio.run(scenario()) == ["result"] * 5
+        assert len(calls) == 1
+
+    def test_failure_reaches_waiters_and_is_not_cached(self):
+        """A failed computation is raised to every waiter and retried next time"""
+        cache = PredictionCache()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        async def ok():
+            return "ok"
+
+        async def scenario():
+            results = await asyncio.gather(*(cache.get_or_compute("k", fail) for _ in range(3)),
+                                           return_exceptions=True)
+            return results, await cache.get_or_compute("k", ok)
+
+        results, retried = asyncio.run(scenario())
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert retried == "ok"
+
+    def test_computation_straddling_clear_is_not_stored(self):
+        """A result computed before clear() answers its callers but does not refill the cache"""
+        cache = PredictionCache()
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def old_model():
+            started.set()
+            await release.wait()
+            return "old"
+
+        async def new_model():
+            return "new"
+
+        async def scenario():
+            in_flight = asyncio.ensure_future(cache.get_or_compute("k", old_model))
+            await started.wait()
+            cache.clear()
+            after_clear = await cache.get_or_compute("k", new_model)
+            release.set()
+            return await in_flight, after_clear, await cache.get_or_compute("k", old_model)
+
+        assert asyncio.run(scenario()) == ("old", "new", "new")
+        assert len(cache) == 1
+
+    @pytest.mark.parametrize("kwargs", [{"max_entries": 0}, {"resolution": 0}])
+    def test_invalid_configuration(self, kwargs):
+        with pytest.raises(ValueError):
+            PredictionCache(**kwargs)
+
+class TestCachedEndpoints:
+    """Test cases for the cache behind /predict"""
+
+    def test_repeated_frame_hits_cache(self, client, sample_landmarks):
+        """The second identical request is served from the cache with the same body"""
+        prediction_cache.clear()
+        hits = monitoring_service.prediction_cache_hits._value.get()
+        first = client.post("/predict", json={"landmarks": sample_landmarks})
+        size = len(prediction_cache)
+        second = client.post("/predict", json={"landmarks": sample_landmarks})
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert size == len(prediction_cache) == 1
+        assert monitoring_service.prediction_cache_hits._value.get() == hits + 1
@@ -0,0 +1,97 @@
+"""Tests for the on-demand profiler and the /admin/profile endpoint"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import app.main as main
+from app.main import settings
+from app.services.profiler import Profiler, ProfilerUnavailable, StackSampler
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(main, "profiler", Profiler(max_seconds=1, cooldown=60, sample_interval=0.002))
+
+class TestStackSampler:
+    """Test cases for StackSampler"""
+
+    def test_samples_running_threads(self, busy_thread):
+        """Busy threads show up in collapsed stacks, rooted at the thread name"""
+        sampler = StackSampler(interval=0.002)
+        sampler.start()
+        time.sleep(0.2)
+        sampler.stop()
+
+        assert sampler.samples > 0
+        busy = [line for line in sampler.collapsed().splitlines() if line.startswith("busy;")]
+        assert busy and "test_profiler.py:busy_loop" in busy[0]
+        assert any(entry["function"] == "test_profiler.py:busy_loop" for entry in sampler.top())
+
+class TestProfiler:
+    """Test cases for session bounds and cooldown"""
+
+    def test_cooldown(self, fake_clock):
+        profiler = Profiler(max_seconds=0.01, cooldown=30, clock=fake_clock)
+        asyncio.run(profiler.sample(5))  # capped at max_seconds
+
+        with pytest.raises(ProfilerUnavailable) as error:
+            asyncio.run(profiler.sample(0.01))
+        assert error.value.retry_after == pytest.approx(30)
+
+        fake_clock.now += 30
+        asyncio.run(profiler.sample(0.01))
+
+    def test_cprofile_report(self):
+        report = asyncio.run(Profiler(cooldown=0).cprofile(0.01))
+        assert "function calls" in report
+
+class TestProfileEndpoint:
+    """Test cases for /admin/profile"""
+
+    def test_disabled_without_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+        assert client.post("/admin/profile?seconds=0.1", headers=TOKEN).status_code == 404
+
+    def test_rejects_wrong_token(self, client, admin):
+        assert client.post("/admin/profile?seconds=0.1").status_code == 401
+        assert client.post("/admin/profile?seconds=0.1", headers={"X-Admin-Token": "nope"}).status_code == 401
+
+    def test_collapsed_then_cooldown(self, client, admin, busy_thread):
+        """A session returns collapsed stacks; the next one within the cooldown gets 429"""
+        response = client.post("/admin/profile?seconds=0.2", headers=TOKEN)
+        assert response.status_code == 200
+        assert "busy;" in response.text
+
+        again = client.post("/admin/profile?seconds=0.2", headers=TOKEN)
+        assert again.status_code == 429
+        assert int(again.headers["retry-after"]) > 0
+
+    def test_stats_output(self, client, admin, busy_thread):
+        body = client.post("/admin/profile?seconds=0.2&output=stats", headers=TOKEN).json()
+        assert body["samples"] > 0
+        assert {"function", "self", "total"} <= set(body["functions"][0])
+
+    def test_cprofile_needs_stats(self, client, admin):
+        response = client.post("/admin/profile?seconds=0.1&mode=cprofile", headers=TOKEN)
+        assert response.status_code == 422
+        response = client.post("/admin/profile?seconds=0.1&mode=cprofile&output=stats", headers=TOKEN)
+        assert response.status_code == 200
+        assert "function calls" in response.text
@@ -0,0 +1,98 @@
+"""Tests for the per-client token-bucket rate limiter"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, monitoring_service
+from app.services.rate_limiter import RateLimitMiddleware, TokenBucketLimiter, client_key, parse_api_keys
+
+@pytest.fixture
+def limited_client(reset_rate_limiter):
+    """The app behind the rate limiter as main.py installs it with ENABLE_RATE_LIMIT=true, with API key k1"""
+    limited = RateLimitMiddleware(
+        app,
+        limiter=reset_rate_limiter,
+        paths=["/predict", "/predict/batch", "/maze-control"],
+        api_keys=parse_api_keys("k1, k2"),
+        on_reject=monitoring_service.increment_rate_limited,
+    )
+    return TestClient(limited)
+
+class TestTokenBucketLimiter:
+    """Test cases for TokenBucketLimiter"""
+
+    def test_burst_then_refill(self, fake_clock):
+        """A full bucket allows `burst` requests, then one per interval"""
+        limiter = TokenBucketLimiter(60, burst=3, clock=fake_clock)
+
+        assert [limiter.acquire("a")[0] for _ in range(4)] == [True, True, True, False]
+        allowed, retry_after = limiter.acquire("a")
+        assert not allowed and retry_after == pytest.approx(1.0)
+
+        fake_clock.now += 1.0
+        assert limiter.acquire("a") == (True, 0.0)
+        assert limiter.acquire("b")[0]  # other clients have their own bucket
+
+    def test_idle_buckets_evicted(self, fake_clock):
+        """Buckets that have refilled completely are forgotten"""
+        limiter = TokenBucketLimiter(60, burst=2, clock=fake_clock)
+        limiter.acquire("a")
+        limiter.acquire("b")
+        assert len(limiter) == 2
+
+        fake_clock.now += 5
+        limiter.acquire("c")
+        assert len(limiter) == 1
+
+    def test_max_clients(self, fake_clock):
+        """The least recently seen client is dropped when the table is full"""
+        limiter = TokenBucketLimiter(60, max_clients=2, clock=fake_clock)
+        for key in "abc":
+            limiter.acquire(key)
+        assert len(limiter) == 2
+
+class TestClientKey:
+    """Test cases for choosing the bucket of a request"""
+
+    def test_known_api_key(self):
+        scope = {"headers": [(b"x-api-key", b"k1")], "client": ("10.0.0.1", 1234)}
+        assert client_key(scope, frozenset({"k1"})) == ("api_key", "key:k1")
+
+    def test_unknown_api_key_uses_ip(self):
+        """Made-up keys do not get a bucket of their own"""
+        scope = {"headers": [(b"x-api-key", b"random")], "client": ("10.0.0.1", 1234)}
+        assert client_key(scope, frozenset({"k1"})) == ("ip", "10.0.0.1")
+        assert client_key(scope) == ("ip", "10.0.0.1")
+
+    def test_forwarded_only_when_trusted(self):
+        scope = {"headers": [(b"x-forwarded-for", b"1.2.3.4, 10.0.0.2")], "client": ("10.0.0.1", 1234)}
+        assert client_key(scope) == ("ip", "10.0.0.1")
+        assert client_key(scope, trust_forwarded=True) == ("ip", "1.2.3.4")
+
+class TestRateLimitMiddleware:
+    """Test cases for the 429 responses"""
+
+    def test_over_limit_returns_429(self, limited_client, reset_rate_limiter, sample_landmarks):
+        """Requests past the burst are rejected with Retry-After and counted"""
+        rejected = monitoring_service.rate_limited_requests.labels(key_type="ip")._value.get()
+        for _ in range(reset_rate_limiter.burst):
+            assert limited_client.post("/predict", json={"landmarks": sample_landmarks}).status_code == 200
+
+        response = limited_client.post("/predict", json={"landmarks": sample_landmarks})
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        assert monitoring_service.rate_limited_requests.labels(key_type="ip")._value.get() == rejected + 1
+
+        # Invalid bodies are turned away before validation too
+        assert limited_client.post("/maze-control", json={}).status_code == 429
+        # Unlimited paths and configured API keys are unaffected
+        assert limited_client.get("/health").status_code == 200
+        response = limited_client.post("/predict", json={"landmarks": sample_landmarks}, headers={"X-API-Key": "k1"})
+        assert response.status_code == 200
+        # An unknown key shares the IP's bucket
+        response = limited_client.post("/predict", json={"landmarks": sample_landmarks}, headers={"X-API-Key": "other"})
+        assert response.status_code == 429
+
+    def test_disabled_by_default(self):
+        """The app does not limit unless ENABLE_RATE_LIMIT is set; 60 FPS clients would be throttled"""
+        assert not any(middleware.cls is RateLimitMiddleware for middleware in app.user_middleware)
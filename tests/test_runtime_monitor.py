@@ -0,0 +1,72 @@
+"""Tests for event-loop lag and GC pause monitoring"""
+
+import asyncio
+import gc
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app, monitoring_service
+from app.services.runtime_monitor import RuntimeMonitor, freeze_long_lived
+
+class TestRuntimeMonitor:
+    """Test cases for RuntimeMonitor"""
+
+    def test_blocked_loop_reports_lag(self):
+        """A blocking call on the loop shows up as lag of about its duration"""
+        lags = []
+        monitor = RuntimeMonitor(interval=0.01, on_loop_lag=lags.append)
+
+        async def run():
+            monitor.start()
+            await asyncio.sleep(0.03)
+            time.sleep(0.1)  # block the loop
+            await asyncio.sleep(0.03)
+            await monitor.stop()
+
+        asyncio.run(run())
+        assert lags
+        assert max(lags) >= 0.08
+        assert monitor.max_lag == max(lags)
+
+    def test_gc_pauses_reported(self):
+        """Collections are timed by generation and reported from the loop"""
+        pauses = []
+        monitor = RuntimeMonitor(interval=0.01, on_gc_pause=lambda *pause: pauses.append(pause))
+
+        async def run():
+            monitor.start()
+            gc.collect(1)
+            gc.collect()
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(run())
+        generations = [generation for generation, _, _ in pauses]
+        assert 1 in generations and 2 in generations
+        assert all(seconds >= 0 and collected >= 0 for _, seconds, collected in pauses)
+        assert monitor._gc_callback not in gc.callbacks
+
+    def test_freeze_long_lived(self):
+        try:
+            assert freeze_long_lived() > 0
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+class TestRuntimeMetrics:
+    """Test cases for the exported runtime metrics"""
+
+    def test_lifespan_starts_monitor(self):
+        """The app's lifespan runs the monitor, whose samples land in the histograms"""
+        with TestClient(app) as client:
+            gc.collect()
+            time.sleep(0.3)  # the test thread blocks, the loop thread keeps ticking
+            assert client.get("/health").status_code == 200
+
+        lag_count = [sample.value for sample in monitoring_service.event_loop_lag.collect()[0].samples
+                     if sample.name == "event_loop_lag_seconds_count"][0]
+        gc_count = [sample.value for sample in monitoring_service.gc_pause_seconds.collect()[0].samples
+                    if sample.name == "gc_pause_seconds_count" and sample.labels["generation"] == "2"][0]
+        assert lag_count > 0
+        assert gc_count > 0
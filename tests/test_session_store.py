@@ -0,0 +1,79 @@
+"""Tests for per-session delta gating on /maze-control"""
+
+import numpy as np
+import pytest
+
+from app.main import session_store
+from app.services.session_store import SessionStore
+
+class TestSessionStore:
+    """Test cases for SessionStore"""
+
+    def test_skip_within_epsilon(self):
+        """A frame close to the stored one reuses the stored result, a distant one does not"""
+        store = SessionStore(epsilon=0.05)
+        features = np.zeros(42, dtype=np.float32)
+        store.store("s", features, "result")
+
+        assert store.lookup("s", features + 0.005) == "result"
+        assert store.lookup("s", features + 0.1) is None
+        assert store.lookup("other", features) is None
+        assert store.skip_rate == pytest.approx(1 / 3)
+
+    def test_ttl_eviction(self, fake_clock):
+        """Sessions idle for longer than the TTL are dropped"""
+        store = SessionStore(ttl_seconds=10, clock=fake_clock)
+        features = np.zeros(42, dtype=np.float32)
+        store.store("idle", features, "a")
+        fake_clock.now += 5
+        store.store("active", features, "b")
+        fake_clock.now += 7
+
+        assert store.lookup("idle", features) is None
+        assert store.lookup("active", features) == "b"
+        assert len(store) == 1
+
+    def test_capacity_and_growth(self):
+        """The store grows up to max_sessions rows, then drops the least recently seen"""
+        store = SessionStore(max_sessions=100)
+        empty = store.memory_bytes
+        for i in range(150):
+            store.store(i, np.full(42, i, dtype=np.float32), i)
+
+        assert len(store) == 100
+        assert store.memory_bytes > empty
+        assert store.lookup(0, np.zeros(42, dtype=np.float32)) is None
+        assert store.lookup(149, np.full(42, 149, dtype=np.float32)) == 149
+
+    def test_store_after_clear_is_dropped(self):
+        """A prediction that started before clear() is not stored"""
+        store = SessionStore()
+        features = np.zeros(42, dtype=np.float32)
+        generation = store.generation
+        store.clear()
+        store.store("s", features, "old", generation)
+        assert store.lookup("s", features) is None
+
+        store.store("s", features, "new", store.generation)
+        assert store.lookup("s", features) == "new"
+
+class TestGatedMazeControl:
+    """Test cases for /maze-control?session_id="""
+
+    def test_repeated_frame_skips_inference(self, client, sample_landmarks):
+        """The second frame of a session is answered from the store with the same decision"""
+        skips = session_store.skips
+        first = client.post("/maze-control?session_id=player-1", json={"landmarks": sample_landmarks})
+        second = client.post("/maze-control?session_id=player-1", json={"landmarks": sample_landmarks})
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert session_store.skips == skips + 1
+
+    def test_without_session_id_is_not_gated(self, client, sample_landmarks):
+        """Requests without a session ID never touch the store"""
+        lookups = session_store.lookups
+        response = client.post("/maze-control", json={"landmarks": sample_landmarks})
+
+        assert response.status_code == 200
+        assert session_store.lookups == lookups
@@ -0,0 +1,127 @@
+"""Tests for the shared-memory ring buffer inference pool"""
+
+import asyncio
+import os
+import signal
+
+import numpy as np
+import pytest
+
+from app.main import gesture_service
+from app.services.inference_executor import InferenceExecutor
+from app.services.shm_pool import RingInferencePool, RingLayout
+
+@pytest.fixture(scope="module")
+def ring_executor():
+    """Executor on the shm backend with two spawned workers, shared by the tests below"""
+    executor = InferenceExecutor(gesture_service, backend="shm", max_workers=2,
+                                 max_concurrency=2, ring_rows_per_job=16)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+def assert_same_results(results, expected):
+    assert len(results) == len(expected)
+    for result, reference in zip(results, expected):
+        assert result["prediction_number"] == reference["prediction_number"]
+        assert result["gesture_name"] == reference["gesture_name"]
+        assert result["confidence"] == pytest.approx(reference["confidence"], abs=1e-12)
+
+class TestRingLayout:
+    """Test cases for the shared-memory layout"""
+
+    def test_views_do_not_overlap(self):
+        """Each array gets its own 8-byte aligned region of the block"""
+        layout = RingLayout(n_jobs=3, rows_per_job=5)
+        buffer = bytearray(layout.size)
+        views = layout.views(buffer)
+        for value, view in enumerate(views.values(), start=1):
+            view[...] = value
+
+        for value, (name, view) in enumerate(views.items(), start=1):
+            assert layout.offsets[name] % 8 == 0
+            assert np.all(view == value)
+
+class TestRingInferencePool:
+    """Test cases for the shm executor backend"""
+
+    def test_batch_matches_in_process(self, ring_executor, random_frames):
+        """A batch larger than one job slot is split, scored by the workers and returned in order"""
+        results = asyncio.run(ring_executor.predict_batch(random_frames))
+
+        assert_same_results(results, gesture_service.predict_batch(random_frames))
+
+    def test_concurrent_single_frames(self, ring_executor, random_frames):
+        """More concurrent jobs than ring slots queue for a free slot"""
+        async def scenario():
+            return await asyncio.gather(*(ring_executor.predict(frame) for frame in random_frames[:10]))
+
+        assert_same_results(asyncio.run(scenario()), gesture_service.predict_batch(random_frames[:10]))
+
+    def test_dag_mode(self, ring_executor, random_frames):
+        """The decision mode is passed through the ring"""
+        results = asyncio.run(ring_executor.predict_batch(random_frames[:4], "dag"))
+
+        assert_same_results(results, gesture_service.predict_batch(random_frames[:4], "dag"))
+
+    def test_recycle_finishes_in_flight_jobs(self, ring_executor, random_frames):
+        """After a model reload new jobs go to new workers; the old ones finish what they were given"""
+        async def scenario():
+            old_pool = ring_executor._ring_pool
+            in_flight = asyncio.ensure_future(ring_executor.predict_batch(random_frames))
+            await asyncio.sleep(0)  # handed to the old pool
+            await ring_executor.recycle()
+            assert ring_executor._ring_pool is not old_pool and not old_pool.started
+            assert all(worker.ready for worker in ring_executor._ring_pool._workers)
+            return await in_flight, await ring_executor.predict_batch(random_frames[:4])
+
+        results, after = asyncio.run(scenario())
+        assert_same_results(results, gesture_service.predict_batch(random_frames))
+        assert_same_results(after, gesture_service.predict_batch(random_frames[:4]))
+
+class TestSlotHandOver:
+    """Test cases for queueing on a full ring"""
+
+    def test_cancel_after_hand_over_returns_the_slot(self):
+        """A waiter cancelled between receiving a slot and resuming gives the slot back"""
+        pool = RingInferencePool(gesture_service, workers=1, n_jobs=1, rows_per_job=1)
+        slot = pool._free.pop()
+
+        async def scenario():
+            waiting = asyncio.ensure_future(pool._acquire_slot())
+            await asyncio.sleep(0)  # queued for a slot
+            pool._release_slot(slot)
+            await asyncio.sleep(0)  # _hand_over sets the result; the waiter has not resumed yet
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+
+        asyncio.run(scenario())
+        assert pool._free == [slot] and not pool._slot_waiters
+
+class TestWorkerFailure:
+    """Test cases for workers that die"""
+
+    def test_dead_worker_fails_its_job_and_is_replaced(self, random_frames):
+        """A job held by a killed worker fails instead of hanging, and a new worker takes over"""
+        pool = RingInferencePool(gesture_service, workers=1, n_jobs=2, rows_per_job=16)
+        pool.start()
+        try:
+            worker = pool._workers[0]
+
+            async def scenario():
+                await asyncio.wait_for(pool.predict_batch(random_frames[:2]), 60)  # the worker is up
+                os.kill(worker.process.pid, signal.SIGSTOP)
+                held = asyncio.ensure_future(pool.predict_batch(random_frames[:2]))
+                await asyncio.sleep(0.05)  # sent to the stopped worker
+                os.kill(worker.process.pid, signal.SIGKILL)
+                with pytest.raises(RuntimeError, match="exited"):
+                    await asyncio.wait_for(held, 10)
+                return await asyncio.wait_for(pool.predict_batch(random_frames[:4]), 60)
+
+            results = asyncio.run(scenario())
+            assert pool.restarts == 1 and pool._workers[0] is not worker
+            assert_same_results(results[1], gesture_service.predict_batch(random_frames[:4]))
+        finally:
+            pool.shutdown()
+        assert not pool.started
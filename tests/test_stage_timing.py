@@ -0,0 +1,103 @@
+"""Tests for per-stage request timing and the Server-Timing header"""
+
+import pytest
+
+from app.main import monitoring_service, settings, stage_sampler
+from app.utils import stage_timer
+from app.utils.stage_timer import StageSampler, StageTimer
+
+def stage_names(response):
+    return [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+
+def stage_count(stage: str) -> float:
+    for metric in monitoring_service.request_stage_seconds.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels.get("stage") == stage:
+                return sample.value
+    return 0.0
+
+@pytest.fixture
+def sample_all(monkeypatch):
+    monkeypatch.setattr(stage_sampler, "rate", 1.0)
+
+class TestStageTimer:
+    """Test cases for StageTimer"""
+
+    def test_marks_partition_time(self):
+        """Each stage runs from the previous mark; the total is their sum"""
+        timer = StageTimer()
+        timer.mark("a")
+        timer.mark("b")
+        assert [stage for stage, _ in timer.stages] == ["a", "b"]
+        assert sum(seconds for _, seconds in timer.stages) == pytest.approx(timer.total)
+
+        header = timer.server_timing()
+        assert header.startswith("a;dur=") and ", b;dur=" in header and header.split(", ")[-1].startswith("total;dur=")
+
+    def test_mark_without_timer_is_noop(self):
+        """Code outside a sampled request can call mark freely"""
+        assert stage_timer.current() is None
+        stage_timer.mark("anything")
+
+    def test_absorb_shared_stages(self):
+        """Work timed on a shared timer is appended after the time spent waiting for it"""
+        timer = StageTimer()
+        timer.mark("validate")
+        shared = StageTimer()
+        shared.mark("svm")
+        timer.absorb(shared)
+        timer.mark("serialize")
+
+        assert [stage for stage, _ in timer.stages] == ["validate", "batch_wait", "svm", "serialize"]
+        assert sum(seconds for _, seconds in timer.stages) == pytest.approx(timer.total)
+
+    def test_sampler_rates(self):
+        assert StageSampler(1.0)()
+        assert not StageSampler(0.0)()
+
+class TestStageTimingMiddleware:
+    """Test cases for the Server-Timing header and stage histograms"""
+
+    def test_predict_stages(self, client, sample_landmarks, sample_all):
+        """A sampled /predict lists its stages in order and records them"""
+        before = stage_count("validate")
+        response = client.post("/predict", json={"landmarks": sample_landmarks})
+        assert response.status_code == 200
+
+        stages = stage_names(response)
+        assert stages[:2] == ["receive", "validate"]
+        assert "inference" in stages
+        assert stages[-2:] == ["serialize", "total"]
+        assert response.headers["timing-allow-origin"] == "*"
+        assert stage_count("validate") == before + 1
+
+    def test_batch_reports_model_stages(self, client, random_frames, sample_all):
+        """The thread executor runs the model in the request's context"""
+        response = client.post("/predict/batch", json={"frames": random_frames[:4]})
+        assert response.status_code == 200
+        stages = stage_names(response)
+        for stage in ("preprocess", "svm", "decode", "inference"):
+            assert stage in stages
+
+    @pytest.mark.parametrize("path", ["/predict", "/maze-control"])
+    def test_micro_batched_requests_report_model_stages(self, client, path, sample_landmarks, sample_all,
+                                                        monkeypatch):
+        """The stages of a micro-batch flush are copied to each request that waited on it"""
+        monkeypatch.setattr(settings, "ENABLE_MICRO_BATCHING", True)
+        monkeypatch.setattr(settings, "ENABLE_PREDICTION_CACHE", False)
+        response = client.post(path, json={"landmarks": sample_landmarks})
+        assert response.status_code == 200
+
+        stages = stage_names(response)
+        waited = stages.index("batch_wait")
+        assert stages[waited:waited + 5] == ["batch_wait", "queue", "preprocess", "svm", "decode"]
+        assert stages[waited + 5:] == ["inference", "serialize", "total"]
+
+    def test_unsampled_requests_have_no_header(self, client, sample_landmarks, monkeypatch):
+        monkeypatch.setattr(stage_sampler, "rate", 0.0)
+        response = client.post("/predict", json={"landmarks": sample_landmarks})
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_other_paths_untimed(self, client, sample_all):
+        assert "server-timing" not in client.get("/health").headers
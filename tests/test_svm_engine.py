@@ -0,0 +1,156 @@
+"""Parity tests for the compiled NumPy SVM engine against sklearn"""
+
+import numpy as np
+import pytest
+
+from app.main import gesture_service
+from app.services.gesture_service import GestureService
+from app.services.svm_engine import SVMEngine
+
+@pytest.fixture(scope="module")
+def features():
+    """Preprocessed features for random frames plus a few degenerate poses"""
+    rng = np.random.default_rng(7)
+    frames = rng.uniform(0.0, 1.0, size=(500, 63))
+    frames[0] = 0.5  # all landmarks on the wrist
+    return gesture_service.preprocess_batch(frames)
+
+@pytest.fixture(scope="module")
+def engine():
+    assert gesture_service.engine is not None
+    return gesture_service.engine
+
+class TestSVMEngine:
+    """Test cases for SVMEngine"""
+
+    def test_production_model_is_supported(self, sklearn_service):
+        """The shipped pipeline compiles into the engine"""
+        assert SVMEngine.supports(sklearn_service.model)
+
+    def test_decision_values_match_sklearn(self, engine, features, sklearn_service):
+        """1-vs-1 decision values match SVC.decision_function(ovo)"""
+        scaler, svc = sklearn_service.model.steps[0][1], sklearn_service.model.steps[-1][1]
+        shape = svc.decision_function_shape
+        svc.decision_function_shape = 'ovo'
+        try:
+            expected = svc.decision_function(scaler.transform(features))
+        finally:
+            svc.decision_function_shape = shape
+
+        np.testing.assert_allclose(engine.decision_values(features), expected, atol=1e-9)
+
+    def test_labels_identical_to_sklearn(self, engine, features, sklearn_service):
+        """Voted labels are identical to SVC.predict"""
+        labels, _ = engine.predict(features)
+        expected = sklearn_service.model.predict(features)
+
+        np.testing.assert_array_equal(np.asarray(engine.class_numbers)[labels], expected)
+
+    def test_probabilities_match_sklearn(self, engine, features, sklearn_service):
+        """Coupled Platt probabilities match SVC.predict_proba"""
+        expected = sklearn_service.model.predict_proba(features)
+
+        np.testing.assert_allclose(engine.predict_proba(features), expected, atol=1e-9)
+        _, confidences = engine.predict(features)
+        np.testing.assert_allclose(confidences, expected.max(axis=1), atol=1e-9)
+
+    def test_index_tables(self, engine, sklearn_service):
+        """Class names and maze actions come from the label encoder and action map"""
+        assert engine.class_names == list(sklearn_service.label_encoder.classes_)
+        assert engine.class_actions == [
+            gesture_service.gesture_to_action.get(name, 'WAIT') for name in engine.class_names
+        ]
+
+    def test_wrong_feature_count(self, engine):
+        """Inputs with the wrong number of features are rejected"""
+        with pytest.raises(ValueError, match="Expected 42 features"):
+            engine.decision_values(np.zeros((1, 40)))
+
+    def test_service_engine_matches_sklearn_path(self, sample_landmarks):
+        """GestureService gives the same result with and without the engine"""
+        sklearn_service = GestureService(gesture_service.model_path, gesture_service.encoder_path,
+                                         use_engine=False)
+        with_engine = gesture_service.predict(sample_landmarks)
+        without_engine = sklearn_service.predict(sample_landmarks)
+
+        assert with_engine['gesture_name'] == without_engine['gesture_name']
+        assert with_engine['prediction_number'] == without_engine['prediction_number']
+        assert with_engine['confidence'] == pytest.approx(without_engine['confidence'], abs=1e-9)
+
+class TestDecisionDAG:
+    """Test cases for the decision-DAG evaluation mode"""
+
+    def test_dag_evaluates_one_pair_per_eliminated_class(self, engine, features):
+        """The DAG walk needs n_classes - 1 comparisons, and its confident winners are predict()'s"""
+        assert engine.n_classes - 1 < len(engine.pairs)
+
+        decision = engine.class_decision_values(engine.kernel(engine.transform(features)))
+        labels, _, margins = engine.dag_walk(decision)
+        full_labels, _ = engine.predict(features)
+        confident = margins >= 0.25
+        assert confident.sum() >= 50
+        np.testing.assert_array_equal(labels[confident], full_labels[confident])
+
+    def test_class_decision_values_match_dense(self, engine, features):
+        """The per-class products give the dense pair_coef product's decision values"""
+        kernel = engine.kernel(engine.transform(features))
+        np.testing.assert_allclose(engine.class_decision_values(kernel), engine.decision_values(features),
+                                   rtol=1e-9, atol=1e-9)
+
+    def test_scalar_walk_matches_lockstep_walk(self, engine, features):
+        """Small batches walk row by row; both walks give the same results"""
+        decision = engine.class_decision_values(engine.kernel(engine.transform(features[:50])))
+        lockstep = engine.dag_walk(decision)
+        rows = engine._dag_walk_rows(decision)
+        for expected, actual in zip(lockstep, rows):
+            np.testing.assert_array_equal(actual, expected)
+
+    def test_dag_follows_reference_walk(self, engine, features):
+        """Without fallback, the DAG winner matches a walk over the full decision matrix"""
+        labels, confidences = engine.predict_dag(features[:100], min_margin=0.0)
+        decision = engine.decision_values(features[:100])
+
+        for row in range(len(labels)):
+            lo, hi = 0, engine.n_classes - 1
+            while lo < hi:
+                if decision[row, engine.pair_index[lo, hi]] > 0:
+                    hi -= 1
+                else:
+                    lo += 1
+            assert labels[row] == lo
+            assert 0.0 < confidences[row] <= 1.0
+
+    def test_dag_matches_full_labels_with_margin(self, engine, features):
+        """Rows with a small margin fall back, so labels almost always match predict()"""
+        full_labels, _ = engine.predict(features)
+        dag_labels, _ = engine.predict_dag(features, min_margin=0.5)
+
+        assert (dag_labels == full_labels).mean() > 0.98
+
+    def test_infinite_margin_is_full_evaluation(self, engine, features):
+        """A margin no comparison can reach sends every row through predict()"""
+        full_labels, full_conf = engine.predict(features[:20])
+        dag_labels, dag_conf = engine.predict_dag(features[:20], min_margin=np.inf)
+
+        np.testing.assert_array_equal(dag_labels, full_labels)
+        np.testing.assert_allclose(dag_conf, full_conf)
+
+    def test_maze_control_calibrated(self, client, sample_landmarks):
+        """calibrated=true returns the full-evaluation confidence"""
+        response = client.post("/maze-control?calibrated=true", json={"landmarks": sample_landmarks})
+
+        assert response.status_code == 200
+        assert response.json()["confidence"] == pytest.approx(
+            gesture_service.predict(sample_landmarks)["confidence"]
+        )
+
+    def test_dag_mode_has_own_threshold(self, client, sample_landmarks, monkeypatch):
+        """DAG confidences are compared to DAG_MIN_CONFIDENCE_THRESHOLD"""
+        from app.main import settings
+
+        monkeypatch.setattr(settings, "MAZE_DECISION_MODE", "dag")
+        monkeypatch.setattr(settings, "DAG_MIN_CONFIDENCE_THRESHOLD", 0.95)
+
+        assert client.post("/maze-control", json={"landmarks": sample_landmarks}).json()["threshold"] == 0.95
+        calibrated = client.post("/maze-control?calibrated=true", json={"landmarks": sample_landmarks}).json()
+        assert calibrated["threshold"] == settings.MIN_CONFIDENCE_THRESHOLD
@@ -0,0 +1,70 @@
+"""Tests for the thread budget and the /admin/threads endpoint"""
+
+import numpy as np  # noqa: F401  loads the BLAS pool threadpoolctl controls
+import pytest
+from threadpoolctl import threadpool_info, threadpool_limits
+
+import app.services.thread_budget as thread_budget
+from app.main import settings
+from app.services.thread_budget import NATIVE_THREAD_ENV_VARS, ThreadBudget
+
+@pytest.fixture
+def restore_native_threads(monkeypatch):
+    """Undo apply(): environment variables and the loaded pools' thread counts"""
+    for name in NATIVE_THREAD_ENV_VARS:
+        monkeypatch.delenv(name, raising=False)
+    original = threadpool_info()
+    yield
+    threadpool_limits(limits=original)
+
+class TestThreadBudget:
+    """Test cases for the ThreadBudget plan"""
+
+    def test_divides_cores(self):
+        budget = ThreadBudget(cores=8, http_workers=2, inference_workers=2, max_concurrency=2)
+        assert budget.cores_per_worker == 4
+        assert budget.native_callers == 2
+        assert budget.native_threads == 2
+        assert budget.planned_threads == 8
+
+    def test_scoring_threads_fill_worker_share(self):
+        budget = ThreadBudget(cores=8, http_workers=2, scoring_threads=0)
+        assert budget.scoring_threads == 4
+        assert budget.native_threads == 1
+
+    def test_process_workers_are_callers(self):
+        budget = ThreadBudget(cores=8, inference_backend="shm", inference_workers=4, max_concurrency=8)
+        assert budget.native_callers == 4
+        assert budget.native_threads == 2
+
+    def test_explicit_oversubscription_is_reported(self):
+        budget = ThreadBudget(cores=4, http_workers=4, native_threads=4)
+        assert budget.native_threads == 4
+        assert budget.report()["oversubscribed"]
+
+    def test_cores_capped_by_cgroup_quota(self, monkeypatch):
+        monkeypatch.setattr(thread_budget, "cgroup_cpu_limit", lambda: 0.5)
+        assert thread_budget.available_cores() == 1
+        assert ThreadBudget().cores_source == "detected"
+
+    def test_apply_limits_loaded_pools(self, restore_native_threads):
+        budget = ThreadBudget(cores=6, max_concurrency=2)
+        assert budget.apply() == "threadpoolctl"
+
+        assert all(pool["num_threads"] == 3 for pool in threadpool_info())
+        assert all(budget.report()["env"][name] == "3" for name in NATIVE_THREAD_ENV_VARS)
+
+class TestThreadsEndpoint:
+    """Test cases for /admin/threads"""
+
+    def test_disabled_without_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+        assert client.get("/admin/threads").status_code == 404
+
+    def test_reports_allocation(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        report = client.get("/admin/threads", headers={"X-Admin-Token": "secret"}).json()
+
+        assert report["cores"] >= 1
+        assert report["scorer_threads"] == report["scoring_threads"]
+        assert {"native_threads", "native_pools", "executor_threads", "http_workers"} <= set(report)
@@ -0,0 +1,94 @@
+"""Tests for the /ws/maze-control streaming endpoint"""
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app, gesture_service, settings
+from app.services.rate_limiter import TokenBucketLimiter
+from app.utils import binary_format
+
+class TestMazeControlStream:
+    """Test cases for the maze control WebSocket"""
+
+    def test_stream_replies_per_frame(self, sample_landmarks):
+        """Each frame sent and awaited gets a MazeControlResponse with its seq"""
+        expected = gesture_service.predict(sample_landmarks)
+
+        with TestClient(app) as client, client.websocket_connect("/ws/maze-control") as ws:
+            for seq in range(3):
+                ws.send_json({"landmarks": sample_landmarks, "seq": seq})
+                reply = ws.receive_json()
+
+                assert reply["seq"] == seq
+                assert reply["gesture"] == expected["gesture_name"]
+                assert set(reply) == {"action", "gesture", "confidence", "is_valid", "threshold", "seq"}
+
+    def test_invalid_frame_keeps_connection_open(self, sample_landmarks):
+        """A malformed frame gets an error reply and the stream continues"""
+        with TestClient(app) as client, client.websocket_connect("/ws/maze-control") as ws:
+            ws.send_json({"landmarks": [0.5] * 10, "seq": 1})
+            error = ws.receive_json()
+            ws.send_text("not json")
+            garbage = ws.receive_json()
+            ws.send_json({"landmarks": sample_landmarks, "seq": 2})
+            reply = ws.receive_json()
+
+        assert error["seq"] == 1 and "error" in error
+        assert garbage["seq"] is None and "error" in garbage
+        assert reply["seq"] == 2 and "action" in reply
+
+    def test_superseded_frames_are_dropped(self, sample_landmarks):
+        """A burst of frames is answered in order and always ends with the newest frame"""
+        with TestClient(app) as client, client.websocket_connect("/ws/maze-control") as ws:
+            for seq in range(50):
+                ws.send_json({"landmarks": sample_landmarks, "seq": seq})
+            ws.send_json({"landmarks": sample_landmarks, "seq": "last"})
+
+            replies = []
+            while not replies or replies[-1]["seq"] != "last":
+                replies.append(ws.receive_json())
+
+        seqs = [reply["seq"] for reply in replies]
+        assert seqs == sorted(seqs[:-1], key=int) + ["last"]
+
+    def test_binary_frames(self, sample_landmarks):
+        """A binary frame is scored like a JSON one; a malformed one gets an error reply"""
+        expected = gesture_service.predict(sample_landmarks)
+
+        with TestClient(app) as client, client.websocket_connect("/ws/maze-control") as ws:
+            ws.send_bytes(b"\x00" * 10)
+            error = ws.receive_json()
+            ws.send_bytes(binary_format.encode_frames([sample_landmarks]))
+            reply = ws.receive_json()
+
+        assert error["seq"] is None and "error" in error
+        assert reply["seq"] is None and reply["gesture"] == expected["gesture_name"]
+
+    def test_messages_are_rate_limited(self, sample_landmarks, monkeypatch):
+        """Each message takes a token; over-limit frames get an error reply instead of a prediction"""
+        monkeypatch.setattr(settings, "ENABLE_RATE_LIMIT", True)
+        monkeypatch.setattr(main, "rate_limiter", TokenBucketLimiter(1, burst=2))
+
+        with TestClient(app) as client, client.websocket_connect("/ws/maze-control") as ws:
+            replies = []
+            for seq in range(3):
+                ws.send_json({"landmarks": sample_landmarks, "seq": seq})
+                replies.append(ws.receive_json())
+
+        assert [("action" in reply) for reply in replies] == [True, True, False]
+        assert replies[2] == {"error": "Rate limit exceeded", "seq": 2}
+
+    def test_frames_are_admission_controlled(self, sample_landmarks, monkeypatch):
+        """A frame the admission controller sheds gets an error reply and the stream continues"""
+        monkeypatch.setattr(settings, "ENABLE_ADMISSION_CONTROL", True)
+        monkeypatch.setattr(main.admission_controller, "max_queue_depth", 0)
+
+        with TestClient(app) as client, client.websocket_connect("/ws/maze-control") as ws:
+            ws.send_json({"landmarks": sample_landmarks, "seq": 1})
+            shed = ws.receive_json()
+            monkeypatch.setattr(main.admission_controller, "max_queue_depth", 1000)
+            ws.send_json({"landmarks": sample_landmarks, "seq": 2})
+            reply = ws.receive_json()
+
+        assert shed == {"error": "Request shed: queue depth", "seq": 1}
+        assert reply["seq"] == 2 and "action" in reply